@@ -0,0 +1,89 @@
+import numpy as np
+
+# Limites do que cada gráfico envia ao navegador, qualquer que seja o tamanho do histórico
+MAX_PONTOS_LINHA = 2000
+MAX_BARRAS = 200
+MAX_CELULAS_MAPA = 40000
+# A partir de quantos pontos as linhas usam traços WebGL (scattergl) em vez de SVG
+LIMITE_WEBGL = 1000
+
+
+# Redução de uma série para `limite` pontos pelo Largest-Triangle-Three-Buckets: o primeiro e o
+# último ponto ficam, e de cada balde intermediário fica o ponto que forma o maior triângulo com o
+# ponto escolhido no balde anterior e a média do balde seguinte. Retorna os índices mantidos.
+def lttb(x, y, limite=MAX_PONTOS_LINHA):
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # limite - 2 baldes entre o primeiro e o último ponto; médias de cada balde pela soma acumulada
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    soma_x = np.concatenate([[0.0], np.cumsum(x)])
+    soma_y = np.concatenate([[0.0], np.cumsum(y)])
+    tamanhos = np.diff(bordas)
+    medias_x = np.append((soma_x[bordas[1:]] - soma_x[bordas[:-1]]) / tamanhos, x[-1])
+    medias_y = np.append((soma_y[bordas[1:]] - soma_y[bordas[:-1]]) / tamanhos, y[-1])
+
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = bordas[balde], bordas[balde + 1]
+        ax, ay = x[anterior], y[anterior]
+        cx, cy = medias_x[balde + 1], medias_y[balde + 1]
+        areas = np.abs((ax - cx) * (y[inicio:fim] - ay) - (ax - x[inicio:fim]) * (cy - ay))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+# Posições de início dos baldes consecutivos que reduzem `n` itens a no máximo `max_baldes`
+def inicios_baldes(n, max_baldes):
+    tamanho = max(1, -(-n // max_baldes))
+    return np.arange(0, n, tamanho)
+
+
+# Soma dos valores em baldes consecutivos ao longo do eixo; retorna (início de cada balde, somas)
+def agrupar_baldes(valores, max_baldes=MAX_BARRAS, eixo=0):
+    valores = np.asarray(valores)
+    inicios = inicios_baldes(valores.shape[eixo], max_baldes)
+    if len(inicios) == valores.shape[eixo]:
+        return inicios, valores
+    return inicios, np.add.reduceat(valores, inicios, axis=eixo)
+
+
+# Média dos valores em baldes consecutivos, com os mesmos baldes de agrupar_baldes
+def media_baldes(valores, max_baldes=MAX_BARRAS):
+    valores = np.asarray(valores, dtype=np.float64)
+    inicios, somas = agrupar_baldes(valores, max_baldes)
+    return inicios, somas / np.diff(np.append(inicios, len(valores)))
+
+
+# Matriz reduzida a no máximo `max_celulas` somando blocos de linhas e colunas vizinhas,
+# preservando a proporção. Retorna (matriz, início de cada bloco de linhas, de colunas).
+def reduzir_mapa(z, max_celulas=MAX_CELULAS_MAPA):
+    linhas, colunas = z.shape
+    if linhas * colunas <= max_celulas:
+        return z, np.arange(linhas), np.arange(colunas)
+    fator = np.sqrt(linhas * colunas / max_celulas)
+    inicios_linhas = inicios_baldes(linhas, max(1, int(linhas / fator)))
+    inicios_colunas = inicios_baldes(colunas, max(1, max_celulas // len(inicios_linhas)))
+    reduzida = np.add.reduceat(np.add.reduceat(z, inicios_linhas, axis=0), inicios_colunas, axis=1)
+    return reduzida, inicios_linhas, inicios_colunas
+
+
+# Quantidade (ou soma dos valores) por mês; datas inválidas (NaT) são ignoradas.
+# Retorna (meses em datetime64[M], totais).
+def agrupar_por_mes(datas, valores=None):
+    meses = np.asarray(datas, dtype="datetime64[M]")
+    validas = ~np.isnat(meses)
+    meses = meses[validas]
+    if len(meses) == 0:
+        return meses, np.zeros(0, dtype=np.int64)
+    posicoes = (meses - meses.min()).astype(np.int64)
+    pesos = None if valores is None else np.asarray(valores)[validas]
+    totais = np.bincount(posicoes, weights=pesos)
+    presentes = np.flatnonzero(np.bincount(posicoes))
+    return meses.min() + presentes.astype("timedelta64[M]"), totais[presentes]
@@ -1,17 +1,21 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from itertools import combinations
-import random
-import json
 import requests
 from datetime import datetime
-import time
+
+from agregacao import agrupar_por_mes
+from backtest import backtest, meses_sorteados, resumo_faixas, walk_forward
+from carregador import CarregadorLoterias
+from espaco import LOTERIAS_ENUMERAVEIS, EspacoCombinacoes
+from geracao import gerar_lote
+from graficos import grafico_barras, grafico_frequencia, grafico_linha, mapa_calor_posicoes, mapa_coocorrencia
+from instrumentacao import (
+    contar, gravar_metricas, iniciar_execucao, medido, medir, resumo_execucao, servir_metricas, totais
+)
+from loterias import COLUNAS_NUMEROS, ESPECIFICACOES, LOTERIAS, MESES, numeros_meses
+from mascaras import codificar, em_comum
+from restricoes import MAX_NUMEROS_FILTRO_HISTORICO, TEMPO_LIMITE, FiltrosBilhete, gerar_filtrados
 
 # Configuração da página com tema escuro e layout amplo
 st.set_page_config(
@@ -114,20 +118,6 @@ st.markdown("""
 <link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700&display=swap" rel="stylesheet">
 """, unsafe_allow_html=True)
 
-# Lista de loterias disponíveis
-LOTERIAS = [
-    "megasena",
-    "maismilionaria",
-    "lotofacil",
-    "quina",
-    "lotomania",
-    "timemania",
-    "duplasena",
-    "federal",
-    "diadesorte",
-    "supersete"
-]
-
 # Função para exibir mensagem de carregamento
 def loading_message(message="Carregando dados..."):
     with st.spinner(message):
@@ -145,175 +135,56 @@ def loading_message(message="Carregando dados..."):
 
 
 
-# Função para carregar dados da API com cache
-@st.cache_data(ttl=3600)
+# Carregador compartilhado entre as sessões, que mantém todas as loterias sincronizadas em segundo plano
+@st.cache_resource
+def obter_carregador():
+    return CarregadorLoterias().iniciar()
+
+# Armazém de sorteios da loteria, sincronizado de forma incremental
+def obter_armazem(loteria):
+    return obter_carregador().armazem(loteria)
+
+# DataFrame dos concursos em cache pelo último concurso do armazém: quando o carregador em segundo
+# plano sincroniza um concurso novo, a chave muda e o DataFrame acompanha os índices
+@st.cache_data(max_entries=16, show_spinner=False)
+def dataframe_concursos(loteria, ultimo_concurso):
+    contar("carregar_dados", "falha")
+    return obter_armazem(loteria).dataframe()
+
+# Função para carregar os dados da loteria, sincronizando antes se preciso
 def carregar_dados(loteria="maismilionaria"):
-    loading = loading_message(f"Buscando dados da {loteria.upper()}...")
-    
-    url = f"https://loteriascaixa-api.herokuapp.com/api/{loteria}"
+    carregador = obter_carregador()
+    armazem = carregador.armazem(loteria)
+    loading = loading_message(f"Buscando dados da {loteria.upper()}...") if armazem.vazio else st.empty()
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Verifica se houve erros na requisição
-        data = response.json()
-        
-        if isinstance(data, list):
-            df = pd.json_normalize(data)
-            
-            # Verifica e trata colunas específicas para cada tipo de loteria
-            if loteria == "maismilionaria":
-                colunas = ["concurso", "dezenas", "trevos"]
-                df = df[colunas]
-                df = df.dropna()
-                df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                df["trevos"] = df["trevos"].apply(lambda x: list(map(int, x)))
-            
-            elif loteria in ["megasena", "lotofacil", "quina", "lotomania"]:
-                colunas = ["concurso", "data", "dezenas"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "dezenas"])
-                    df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                    # Converter data para datetime
-                    df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            elif loteria == "timemania":
-                colunas = ["concurso", "data", "dezenas", "time"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "dezenas"])
-                    df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                    df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            elif loteria == "duplasena":
-                colunas = ["concurso", "dezenas", "dezenas_2"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "dezenas"])
-                    df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                    df["dezenas_2"] = df["dezenas_2"].apply(lambda x: list(map(int, x)))
-                    #df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            elif loteria == "federal":
-                colunas = ["concurso", "data", "premios"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "premios"])
-                    df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            elif loteria == "diadesorte":
-                colunas = ["concurso", "data", "dezenas", "mes"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "dezenas"])
-                    df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                    df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            elif loteria == "supersete":
-                colunas = ["concurso", "data", "dezenas"]
-                if all(col in df.columns for col in colunas):
-                    df = df[colunas]
-                    df = df.dropna(subset=["concurso", "dezenas"])
-                    df["dezenas"] = df["dezenas"].apply(lambda x: list(map(int, x)))
-                    df["data"] = pd.to_datetime(df["data"], errors='coerce')
-            
-            loading.empty()
-            return df
-        else:
-            loading.error(f"Erro: Estrutura inesperada na resposta da API para {loteria}.")
-            return pd.DataFrame()
-            
+        # Busca apenas os concursos novos, se o carregador em segundo plano ainda não o fez
+        armazem.sincronizar_se_necessario(carregador.intervalo)
+        loading.empty()
     except requests.exceptions.RequestException as e:
         loading.error(f"Erro ao conectar com a API para {loteria}: {str(e)}")
-        return pd.DataFrame()
     except ValueError as e:
         loading.error(f"Erro ao processar os dados de {loteria}: {str(e)}")
-        return pd.DataFrame()
     except Exception as e:
         loading.error(f"Erro inesperado ao carregar dados de {loteria}: {str(e)}")
-        return pd.DataFrame()
-
-# Função para criar gráfico interativo de frequência
-def criar_grafico_frequencia(freq_series, titulo, color_scale, height=400):
-    fig = px.bar(
-        x=freq_series.index.astype(str),
-        y=freq_series.values,
-        labels={'x': 'Número', 'y': 'Frequência'},
-        title=titulo,
-        color=freq_series.values,
-        color_continuous_scale=color_scale,
-        height=height
-    )
-    
-    fig.update_layout(
-        template="plotly_dark",
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        title_font={"family": "Orbitron", "size": 24, "color": "#00ccff"},
-        font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-        title_x=0.5,
-        xaxis_title_font={"size": 16, "color": "#00ccff"},
-        yaxis_title_font={"size": 16, "color": "#00ccff"},
-        margin=dict(l=40, r=40, t=70, b=40),
-        hovermode="closest"
-    )
-    
-    # Adiciona efeito de brilho nas barras
-    fig.update_traces(
-        marker_line_color="#00ffcc",
-        marker_line_width=1.5,
-        opacity=0.9
-    )
-    
-    # Adiciona grade horizontal
-    fig.update_yaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor="rgba(255, 255, 255, 0.1)"
-    )
-    
-    return fig
 
-# Função para criar o gráfico de calor de frequência por posição
-def criar_mapa_calor(df, coluna_dezenas, titulo, max_num, height=500):
-    # Criar matriz para armazenar frequências por posição
-    num_posicoes = len(df[coluna_dezenas].iloc[0])
-    matriz_freq = np.zeros((max_num + 1, num_posicoes))
-    
-    # Calcular frequências
-    for _, row in df.iterrows():
-        for pos, num in enumerate(row[coluna_dezenas]):
-            matriz_freq[num, pos] += 1
-    
-    # Remover linha de índice 0 (não existe número 0 em loterias)
-    matriz_freq = matriz_freq[1:, :]
-    
-    # Criar figura com mapa de calor
-    fig = go.Figure(data=go.Heatmap(
-        z=matriz_freq,
-        x=[f"Posição {i+1}" for i in range(num_posicoes)],
-        y=list(range(1, max_num + 1)),
-        colorscale="Viridis",
-        showscale=True,
-        hovertemplate="Número: %{y}<br>%{x}<br>Frequência: %{z}<extra></extra>"
-    ))
-    
-    fig.update_layout(
-        title=titulo,
-        height=height,
-        template="plotly_dark",
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        title_font={"family": "Orbitron", "size": 24, "color": "#00ccff"},
-        font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-        title_x=0.5,
-        xaxis_title="Posição do Sorteio",
-        yaxis_title="Número",
-        xaxis_title_font={"size": 16, "color": "#00ccff"},
-        yaxis_title_font={"size": 16, "color": "#00ccff"},
-        margin=dict(l=40, r=40, t=70, b=40)
-    )
-    
-    return fig
+    # Em caso de falha, mantém os dados já sincronizados anteriormente
+    return dataframe_concursos(loteria, armazem.ultimo_concurso)
+
+# Função para calcular a frequência por posição, em cache por (loteria, último concurso, janela)
+@st.cache_data(max_entries=64)
+def calcular_mapa_calor(loteria, ultimo_concurso, janela=None, coluna_dezenas="dezenas"):
+    armazem = obter_armazem(loteria)
+    matriz = armazem.matrizes()[coluna_dezenas]
+    if janela is None or matriz.linhas_janela(janela) == (0, len(matriz)):
+        # Histórico completo: a contagem por posição já está no índice de estatísticas
+        indice = armazem.indices()[coluna_dezenas]
+        return indice.posicoes.copy(), indice.numeros
+    return matriz.frequencia_por_posicao(janela), matriz.numeros
+
+# Espaço de combinações da loteria, construído uma vez em disco e atualizado a cada concurso novo
+@st.cache_resource(max_entries=3)
+def obter_espaco(loteria, ultimo_concurso):
+    return EspacoCombinacoes.abrir(loteria, obter_armazem(loteria).matrizes()["dezenas"])
 
 # Função para exibir números em formato de bolinha
 def exibir_numeros(numeros, classe="number-highlight"):
@@ -324,113 +195,538 @@ def exibir_numeros(numeros, classe="number-highlight"):
     return html
 
 # Função para gerar combinações inteligentes
-def gerar_combinacoes_inteligentes(df, coluna_dezenas, loteria, num_combinacoes=5):
-    # Extrair números únicos do dataframe
-    numeros = df[coluna_dezenas].explode()
-    freq_numeros = numeros.value_counts().sort_values(ascending=False)
+# `frequencias` (ex.: janela recente ou pontuação quente/frio) substitui as frequências do histórico completo
+def gerar_combinacoes_inteligentes(indices, loteria, num_combinacoes=5, semente=None, frequencias=None):
+    especificacao = ESPECIFICACOES.get(loteria)
     
-    # Definir parâmetros específicos por loteria
-    params = {
-        "maismilionaria": {"qtd_nums": 6, "max_num": 50, "tem_trevos": True, "qtd_trevos": 2, "max_trevo": 6},
-        "megasena": {"qtd_nums": 6, "max_num": 60, "tem_trevos": False},
-        "lotofacil": {"qtd_nums": 15, "max_num": 25, "tem_trevos": False},
-        "quina": {"qtd_nums": 5, "max_num": 80, "tem_trevos": False},
-        "lotomania": {"qtd_nums": 20, "max_num": 100, "tem_trevos": False},
-        "timemania": {"qtd_nums": 7, "max_num": 80, "tem_trevos": False},
-        "duplasena": {"qtd_nums": 6, "max_num": 50, "tem_trevos": False},
-        "federal": {"qtd_nums": 0, "max_num": 0, "tem_trevos": False},  # Federal não tem dezenas
-        "diadesorte": {"qtd_nums": 7, "max_num": 31, "tem_trevos": True, "qtd_trevos": 1, "max_trevo": 12},
-        "supersete": {"qtd_nums": 7, "max_num": 10, "tem_trevos": False}
-    }
-    
-    if loteria not in params:
+    if especificacao is None or "dezenas" not in indices:
         return []
     
-    qtd_nums = params[loteria]["qtd_nums"]
-    if qtd_nums == 0:  # Para loterias como Federal que não têm dezenas
+    if not especificacao.tem_dezenas:  # Para loterias como Federal que não têm dezenas
         return []
     
-    # Estratégias para geração inteligente de combinações
-    combinacoes = []
-    
-    # Estratégia 1: Top números mais frequentes
-    top_nums = freq_numeros.head(int(qtd_nums * 2.5)).index.tolist()
-    
-    # Estratégia 2: Mistura de frequentes e menos frequentes
-    mid_freq = freq_numeros.iloc[len(freq_numeros)//3:2*len(freq_numeros)//3].index.tolist()
-    
-    # Estratégia 3: Números que não saem há mais tempo
-    recentes = df.sort_values('concurso', ascending=False).head(10)
-    nums_recentes = set()
-    for _, row in recentes.iterrows():
-        nums_recentes.update(row[coluna_dezenas])
-    nums_atrasados = [n for n in range(1, params[loteria]["max_num"] + 1) if n not in nums_recentes]
-    
-    # Gerar combinações com diferentes estratégias
-    for _ in range(num_combinacoes):
-        estrategia = random.randint(1, 4)
-        
-        if estrategia == 1:  # Mais frequentes
-            pool = top_nums.copy()
-            random.shuffle(pool)
-            comb = sorted(pool[:qtd_nums])
-        
-        elif estrategia == 2:  # Mistura equilibrada
-            n_freq = qtd_nums // 2
-            n_mid = qtd_nums - n_freq
-            
-            pool_freq = top_nums.copy()
-            pool_mid = mid_freq.copy()
-            
-            random.shuffle(pool_freq)
-            random.shuffle(pool_mid)
-            
-            comb = sorted(pool_freq[:n_freq] + pool_mid[:n_mid])
-        
-        elif estrategia == 3:  # Números atrasados
-            n_atr = min(qtd_nums // 2, len(nums_atrasados))
-            n_freq = qtd_nums - n_atr
-            
-            pool_atr = nums_atrasados.copy()
-            pool_freq = top_nums.copy()
-            
-            random.shuffle(pool_atr)
-            random.shuffle(pool_freq)
-            
-            comb = sorted(pool_atr[:n_atr] + pool_freq[:n_freq])
-        
-        else:  # Completamente aleatória com números válidos
-            comb = sorted(random.sample(range(1, params[loteria]["max_num"] + 1), qtd_nums))
-        
-        combinacoes.append(comb)
+    # Todas as combinações de uma vez, com as quatro estratégias como perfis de peso
+    dezenas, trevos = gerar_lote(indices, loteria, num_combinacoes, semente=semente, frequencias=frequencias)
+    combinacoes = dezenas.tolist()
     
     # Para loterias com trevos/meses adicionais
-    if params[loteria]["tem_trevos"]:
-        trevos_combinacoes = []
-        
-        if loteria == "maismilionaria":
-            trevos = df["trevos"].explode()
-            freq_trevos = trevos.value_counts().sort_values(ascending=False)
-            
-            for _ in range(num_combinacoes):
-                trevos_list = freq_trevos.head(params[loteria]["max_trevo"]).index.tolist()
-                random.shuffle(trevos_list)
-                trevos_combinacoes.append(sorted(trevos_list[:params[loteria]["qtd_trevos"]]))
-        
-        elif loteria == "diadesorte":
-            meses = df["mes"].value_counts().sort_values(ascending=False)
-            
-            for _ in range(num_combinacoes):
-                # Para DiadeSorte, apenas um mês é sorteado
-                mes_idx = random.randint(1, 12)  # Meses de 1 a 12
-                trevos_combinacoes.append([mes_idx])
-        
-        return combinacoes, trevos_combinacoes
+    if especificacao.tem_trevos:
+        return combinacoes, trevos.tolist()
     
     return combinacoes
 
+# Último concurso da loteria, usado como parte da chave dos artefatos em cache
+def ultimo_concurso_indice(indices):
+    return int(indices["dezenas"].concursos_por_linha[-1])
+
+# Gráfico de frequência: contagem no histórico, numa janela recente ou quentes e frios (meia-vida)
+def figura_frequencia(loteria, modo, parametro=None):
+    indice = obter_armazem(loteria).indices()["dezenas"]
+    if modo == "Quentes e frios":
+        freq_numeros = indice.serie_quentes(parametro).round(2)
+        titulo_freq = f"Números Quentes e Frios (meia-vida de {parametro} concursos)"
+    elif parametro is not None and parametro < indice.total_concursos:
+        freq_numeros = indice.serie_janela(parametro)
+        titulo_freq = f"Frequência nos Últimos {parametro} Concursos"
+    else:
+        freq_numeros = indice.serie_frequencias()
+        titulo_freq = "Frequência dos Números Sorteados"
+    return grafico_frequencia(freq_numeros, titulo_freq)
+
+# Concursos por mês e por dia da semana, em cache por (loteria, último concurso)
+@st.cache_data(max_entries=16, show_spinner=False)
+def series_temporais(loteria, ultimo_concurso, _df):
+    datas = _df["data"]
+    meses, contagem_mensal = agrupar_por_mes(datas.to_numpy())
+
+    # Sazonalidade por dia da semana só faz sentido com dados suficientes
+    contagem_dias = None
+    if len(datas) > 30:
+        contagem_dias = datas.dt.dayofweek.value_counts().reindex(range(7), fill_value=0)
+        contagem_dias.index = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
+    return pd.Series(contagem_mensal, index=np.datetime_as_string(meses)), contagem_dias
+
+# Soma das dezenas de cada concurso, na ordem do histórico
+def soma_por_concurso(loteria):
+    matriz = obter_armazem(loteria).matrizes()["dezenas"]
+    return matriz.concursos, np.where(matriz.validos, matriz.dezenas, 0).sum(axis=1, dtype=np.int64)
+
+# Seções executadas como fragmentos: uma interação dentro da seção refaz só a seção, não a página
+fragmento = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda funcao: funcao)
+
+# Seção de frequência dos números (contagem, janela recente ou quentes e frios)
+def secao_frequencia(loteria_selecionada, df, indices):
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    total_linhas = indices["dezenas"].total_concursos
+    col_modo_freq, col_janela_freq = st.columns(2)
+    with col_modo_freq:
+        modo_freq = st.radio("Frequência", ["Contagem", "Quentes e frios"], horizontal=True)
+    with col_janela_freq:
+        if modo_freq == "Contagem":
+            # Janela recente: subtração de duas linhas da soma acumulada, sem reprocessar o histórico.
+            # Com um concurso só não há janela a escolher (o slider exige mínimo menor que o máximo).
+            parametro_freq = total_linhas
+            if total_linhas > 1:
+                parametro_freq = st.slider("Últimos concursos", 1, total_linhas, total_linhas)
+        else:
+            parametro_freq = st.slider("Meia-vida (concursos)", 1, 200, 20)
+
+    # Gráfico de frequência interativo
+    fig_freq = figura_frequencia(loteria_selecionada, modo_freq, parametro_freq)
+    st.plotly_chart(fig_freq, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Seção do mapa de calor por posição, com intervalo de concursos
+def secao_mapa_calor(loteria_selecionada, df, indices):
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    concursos = indices["dezenas"].concursos_por_linha
+    janela = None
+    if len(concursos) > 1:
+        janela = st.slider(
+            "Intervalo de concursos",
+            int(concursos[0]), int(concursos[-1]),
+            (int(concursos[0]), int(concursos[-1]))
+        )
+
+    # Mapa de calor de números por posição
+    matriz_freq, numeros_mapa = calcular_mapa_calor(loteria_selecionada, int(concursos[-1]), janela)
+    fig_heatmap = mapa_calor_posicoes(matriz_freq, numeros_mapa, "Frequência por Posição do Sorteio")
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Seção de análise temporal: concursos por mês e por dia da semana
+def secao_temporal(loteria_selecionada, df, indices):
+    # Verificar se temos coluna de data para análise temporal
+    if "data" in df.columns and df["data"].notna().any():
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        contagem_mensal, contagem_dias = series_temporais(loteria_selecionada, ultimo_concurso_indice(indices), df)
+
+        # Tendência dos últimos 24 meses
+        ultimos_meses = contagem_mensal.tail(24)
+        fig_temporal = grafico_linha(
+            ultimos_meses.index.to_numpy(), ultimos_meses.to_numpy(),
+            "Tendência de Concursos por Mês", "Período", "Quantidade de Concursos"
+        )
+        st.plotly_chart(fig_temporal, use_container_width=True)
+
+        # Série por concurso do histórico inteiro: reduzida no servidor antes de ir para o navegador
+        concursos_soma, somas = soma_por_concurso(loteria_selecionada)
+        fig_somas = grafico_linha(concursos_soma, somas, "Soma das Dezenas por Concurso", "Concurso", "Soma")
+        st.plotly_chart(fig_somas, use_container_width=True)
+        if contagem_dias is not None:
+            st.markdown("<h3>Sazonalidade por Dia da Semana</h3>", unsafe_allow_html=True)
+            fig_dias = grafico_barras(
+                contagem_dias.index.to_numpy(), contagem_dias.to_numpy(),
+                "Distribuição de Sorteios por Dia da Semana", "Dia da Semana", "Quantidade de Sorteios",
+                cor=contagem_dias.to_numpy()
+            )
+            st.plotly_chart(fig_dias, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+    else:
+        st.info("Dados temporais não disponíveis para esta loteria.")
+
+# Seção de coocorrência de pares e trios
+def secao_coocorrencia(loteria_selecionada, df, indices):
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    motor = indices["dezenas"].coocorrencia
+
+    # Mapa de calor dos pares, com a diagonal zerada para não ofuscar os pares
+    pares = motor.pares.copy()
+    np.fill_diagonal(pares, 0)
+    fig_pares = mapa_coocorrencia(pares, motor.numeros, "Números que Saem Juntos")
+    st.plotly_chart(fig_pares, use_container_width=True)
+
+    col_pares, col_trios = st.columns(2)
+    with col_pares:
+        st.markdown("<h3>Pares Mais Frequentes</h3>", unsafe_allow_html=True)
+        st.dataframe(
+            pd.DataFrame(motor.top_pares(10), columns=["Número 1", "Número 2", "Concursos"]),
+            use_container_width=True
+        )
+    with col_trios:
+        st.markdown("<h3>Trios Mais Frequentes</h3>", unsafe_allow_html=True)
+        st.dataframe(
+            pd.DataFrame(motor.top_trios(10), columns=["Número 1", "Número 2", "Número 3", "Concursos"]),
+            use_container_width=True
+        )
+
+    # Parceiros de um número escolhido
+    numero_escolhido = st.selectbox("Parceiros do número", options=motor.numeros.tolist())
+    parceiros = motor.parceiros(numero_escolhido, 6)
+    st.markdown(exibir_numeros([num for num, _ in parceiros]), unsafe_allow_html=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Seção de atrasos entre aparições dos números
+def secao_atrasos(loteria_selecionada, df, indices):
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    indice_atrasos = indices["dezenas"]
+    # Atraso atual de cada número, colorido pela razão entre atraso atual e atraso médio
+    fig_atrasos = grafico_barras(
+        indice_atrasos.numeros.astype(str), indice_atrasos.atrasos.atuais(), "Atraso Atual dos Números",
+        "Número", "Concursos sem sair", cor=indice_atrasos.atrasos.pontuacao(), escala="Turbo",
+        titulo_cor="Atual / Médio", tamanho_titulo=24
+    )
+    st.plotly_chart(fig_atrasos, use_container_width=True)
+    st.dataframe(
+        indice_atrasos.tabela_atrasos().sort_values("Atraso atual", ascending=False).reset_index(drop=True),
+        use_container_width=True
+    )
+
+    numero_atraso = st.selectbox("Distribuição de atrasos do número", options=indice_atrasos.numeros.tolist())
+    # Distribuição completa dos intervalos entre aparições do número
+    distribuicao_atrasos = indice_atrasos.atrasos.distribuicao(numero_atraso)
+    fig_distribuicao = grafico_barras(
+        np.arange(len(distribuicao_atrasos)), distribuicao_atrasos,
+        f"Intervalos entre Aparições do Número {numero_atraso}", "Concursos sem sair", "Ocorrências"
+    )
+    st.plotly_chart(fig_distribuicao, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Títulos dos campos extras no card do último concurso
+TITULOS_EXTRAS = {"trevos": "Trevos", "dezenas_2": "Segundo Sorteio", "time": "Time do Coração", "mes": "Mês da Sorte"}
+# Rótulo do valor mais sorteado de cada campo de texto no card de status
+MAIS_SORTEADOS = {"time": "Time mais sorteado", "mes": "Mês mais sorteado"}
+
+# Seções de análise, na ordem do seletor; só a escolhida é calculada
+SECOES_ANALISE = {
+    "Frequência dos Números": secao_frequencia,
+    "Mapa de Calor": secao_mapa_calor,
+    "Análise Temporal": secao_temporal,
+    "Coocorrência": secao_coocorrencia,
+    "Atrasos": secao_atrasos,
+}
+
+@fragmento
+def secao_analises(loteria_selecionada, df, indices):
+    secao = st.radio("Seção de análise", list(SECOES_ANALISE), horizontal=True, label_visibility="collapsed")
+    with medir(f"secao.{secao}"):
+        SECOES_ANALISE[secao](loteria_selecionada, df, indices)
+
+# Previsões e combinações inteligentes
+@fragmento
+@medido("secao.previsoes")
+def secao_previsoes(loteria_selecionada, indices):
+    st.markdown("<h2 style='margin-top:40px;'>🔮 Previsões Inteligentes</h2>", unsafe_allow_html=True)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+
+    # Verificar se a loteria atual suporta geração de combinações
+    especificacao = ESPECIFICACOES[loteria_selecionada]
+    if especificacao.tem_dezenas and "dezenas" in indices:
+        # Base dos números frequentes: histórico completo ou pontuação quente/frio
+        base_geracao = st.radio("Base dos números frequentes", ["Histórico completo", "Quentes e frios"], horizontal=True)
+        frequencias_geracao = None
+        if base_geracao == "Quentes e frios":
+            meia_vida_geracao = st.slider("Meia-vida da pontuação (concursos)", 1, 200, 20, key="meia_vida_geracao")
+            frequencias_geracao = indices["dezenas"].janelas.pontuacao(meia_vida_geracao)
+
+        # Gerar combinações inteligentes
+        combinacoes_resultado = gerar_combinacoes_inteligentes(
+            indices, loteria_selecionada, 5, frequencias=frequencias_geracao
+        )
+
+        # Verifica se o resultado é uma tupla (no caso de loterias com trevos)
+        if isinstance(combinacoes_resultado, tuple):
+            combinacoes = combinacoes_resultado[0]
+            trevos_combinacoes = combinacoes_resultado[1]
+
+            # Exibir combinações geradas
+            st.markdown("<h3>Combinações Sugeridas</h3>", unsafe_allow_html=True)
+
+            for i, (comb, trevos) in enumerate(zip(combinacoes, trevos_combinacoes), 1):
+                st.markdown(f"<h4>Combinação {i}</h4>", unsafe_allow_html=True)
+                st.markdown(exibir_numeros(comb), unsafe_allow_html=True)
+
+                if especificacao.rotulo_trevo == "mes":
+                    st.markdown(f"<h5>Mês da Sorte: <span style='color:#00ffcc;'>{MESES[int(trevos[0]) - 1]}</span></h5>", unsafe_allow_html=True)
+                else:
+                    st.markdown("<h5>Trevos</h5>", unsafe_allow_html=True)
+                    st.markdown(exibir_numeros(trevos), unsafe_allow_html=True)
+
+                st.markdown("<hr style='border-color:rgba(0,204,255,0.2);margin:20px 0;'>", unsafe_allow_html=True)
+        else:
+            combinacoes = combinacoes_resultado
+
+            # Exibir combinações geradas
+            st.markdown("<h3>Combinações Sugeridas</h3>", unsafe_allow_html=True)
+
+            for i, comb in enumerate(combinacoes, 1):
+                st.markdown(f"<h4>Combinação {i}</h4>", unsafe_allow_html=True)
+                st.markdown(exibir_numeros(comb), unsafe_allow_html=True)
+
+                st.markdown("<hr style='border-color:rgba(0,204,255,0.2);margin:20px 0;'>", unsafe_allow_html=True)
+
+        # Metodologia de geração
+        with st.expander("Metodologia de Geração"):
+            st.markdown("""
+            <p style="color:#e0e0e0;">
+                As combinações são geradas usando um algoritmo avançado que considera:
+            </p>
+            <ul style="color:#e0e0e0;">
+                <li>Frequência histórica dos números</li>
+                <li>Padrões de sorteios recentes</li>
+                <li>Números que não são sorteados há muito tempo</li>
+                <li>Balanceamento entre números quentes e frios</li>
+                <li>Distribuição de paridade (números pares e ímpares)</li>
+            </ul>
+            <p style="color:#e0e0e0;font-style:italic;">
+                Nota: As previsões são baseadas apenas em análises estatísticas e não garantem resultados.
+            </p>
+            """, unsafe_allow_html=True)
+
+        # Geração de muitas combinações de uma vez (bolões)
+        with st.expander("Gerar Combinações em Lote"):
+            col_qtd, col_semente = st.columns(2)
+            with col_qtd:
+                qtd_lote = st.number_input("Quantidade de combinações", 1, 1_000_000, 10_000, step=1_000)
+            with col_semente:
+                semente_lote = st.number_input("Semente", 0, 2**32 - 1, 0)
+
+            if st.button("Gerar lote"):
+                dezenas_lote, trevos_lote = gerar_lote(
+                    indices, loteria_selecionada, int(qtd_lote), semente=int(semente_lote), frequencias=frequencias_geracao
+                )
+                lote = pd.DataFrame(dezenas_lote, columns=[f"n{j + 1}" for j in range(dezenas_lote.shape[1])])
+                if trevos_lote is not None:
+                    nome = especificacao.rotulo_trevo
+                    for j in range(trevos_lote.shape[1]):
+                        lote[f"{nome}{j + 1}"] = trevos_lote[:, j]
+
+                st.write(f"{len(lote):,} combinações distintas geradas.".replace(",", "."))
+                st.dataframe(lote.head(100), use_container_width=True)
+                st.download_button(
+                    "Baixar CSV",
+                    lote.to_csv(index=False).encode("utf-8"),
+                    file_name=f"{loteria_selecionada}_lote_{int(semente_lote)}.csv",
+                    mime="text/csv",
+                )
+
+        # Geração com filtros de paridade, soma, dezenas, consecutivos e histórico
+        with st.expander("Gerar Combinações com Filtros"):
+            qtd_nums = especificacao.qtd_nums
+            numeros_possiveis = indices["dezenas"].numeros.tolist()
+            ordenados = sorted(numeros_possiveis)
+            if especificacao.posicional:
+                # Um número por coluna, com repetição
+                soma_min, soma_max = ordenados[0] * qtd_nums, ordenados[-1] * qtd_nums
+            else:
+                soma_min, soma_max = sum(ordenados[:qtd_nums]), sum(ordenados[-qtd_nums:])
+
+            col_pares, col_soma = st.columns(2)
+            with col_pares:
+                faixa_pares = st.slider("Quantidade de números pares", 0, qtd_nums, (0, qtd_nums))
+            with col_soma:
+                faixa_soma = st.slider("Soma dos números", soma_min, soma_max, (soma_min, soma_max))
+            col_dezena, col_consecutivos, col_acertos = st.columns(3)
+            with col_dezena:
+                # Na Super Sete todos os números estão na mesma dezena
+                max_por_dezena = qtd_nums
+                if not especificacao.posicional:
+                    max_por_dezena = st.number_input("Máximo por dezena", 1, qtd_nums, qtd_nums)
+            with col_consecutivos:
+                max_consecutivos = st.number_input("Máximo de consecutivos", 1, qtd_nums, qtd_nums)
+            with col_acertos:
+                max_acertos = qtd_nums
+                if qtd_nums <= MAX_NUMEROS_FILTRO_HISTORICO:
+                    max_acertos = st.number_input("Máximo de acertos com concursos passados", 0, qtd_nums, qtd_nums)
+            fixos = st.multiselect("Números fixos", numeros_possiveis, max_selections=qtd_nums)
+            excluidos = st.multiselect("Números excluídos", [n for n in numeros_possiveis if n not in fixos])
+            qtd_filtrados = st.number_input("Quantidade de combinações filtradas", 1, 10_000, 10)
+
+            if st.button("Gerar com filtros"):
+                filtros = FiltrosBilhete(
+                    pares=faixa_pares,
+                    soma=faixa_soma,
+                    max_por_dezena=int(max_por_dezena) if max_por_dezena < qtd_nums else None,
+                    max_consecutivos=int(max_consecutivos),
+                    excluidos=excluidos,
+                    fixos=fixos,
+                    max_acertos_historico=int(max_acertos) if max_acertos < qtd_nums else None,
+                )
+                matriz = obter_armazem(loteria_selecionada).matrizes()["dezenas"]
+                try:
+                    dezenas_filtradas, trevos_filtrados, busca_completa = gerar_filtrados(
+                        loteria_selecionada, int(qtd_filtrados), filtros, matriz
+                    )
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    if not busca_completa:
+                        st.warning(
+                            f"A busca foi interrompida após {TEMPO_LIMITE:.0f} segundos; mostrando só as combinações "
+                            "encontradas até então. Afrouxe os filtros para resultados completos."
+                        )
+                    if len(dezenas_filtradas) == 0:
+                        if busca_completa:
+                            st.warning("Nenhuma combinação satisfaz os filtros escolhidos.")
+                    else:
+                        st.write(f"{len(dezenas_filtradas):,} combinações encontradas.".replace(",", "."))
+                        filtradas = pd.DataFrame(
+                            dezenas_filtradas, columns=[f"n{j + 1}" for j in range(dezenas_filtradas.shape[1])]
+                        )
+                        if trevos_filtrados is not None:
+                            nome = especificacao.rotulo_trevo
+                            for j in range(trevos_filtrados.shape[1]):
+                                filtradas[f"{nome}{j + 1}"] = trevos_filtrados[:, j]
+                        st.dataframe(filtradas, use_container_width=True)
+
+        # Consultas sobre todas as combinações possíveis, nas loterias pequenas
+        if loteria_selecionada in LOTERIAS_ENUMERAVEIS:
+            with st.expander("Espaço de Combinações"):
+                if st.checkbox("Carregar todas as combinações possíveis"):
+                    espaco = obter_espaco(loteria_selecionada, int(indices["dezenas"].concursos_por_linha[-1]))
+                    qtd_nums = especificacao.qtd_nums
+                    soma_min_esp, soma_max_esp = int(espaco.atributos["soma"].min()), int(espaco.atributos["soma"].max())
+                    col_soma_esp, col_pares_esp, col_acertos_esp = st.columns(3)
+                    with col_soma_esp:
+                        faixa_soma_esp = st.slider("Soma", soma_min_esp, soma_max_esp, (soma_min_esp, soma_max_esp))
+                    with col_pares_esp:
+                        faixa_pares_esp = st.slider("Números pares", 0, qtd_nums, (0, qtd_nums), key="pares_espaco")
+                    with col_acertos_esp:
+                        faixa_acertos_esp = st.slider("Máximo de acertos no histórico", 0, qtd_nums, (0, qtd_nums))
+                    total_espaco = espaco.contar(soma=faixa_soma_esp, pares=faixa_pares_esp, max_acertos=faixa_acertos_esp)
+                    st.write(f"{total_espaco:,} de {len(espaco):,} combinações possíveis.".replace(",", "."))
+
+                    consulta = st.text_input("Esta combinação já saiu? (números separados por espaço)")
+                    if consulta:
+                        partes = consulta.replace(",", " ").split()
+                        try:
+                            if not all(parte.isdigit() for parte in partes):
+                                raise ValueError("Use só números inteiros.")
+                            sorteada = espaco.ja_sorteada([int(parte) for parte in partes])
+                        except ValueError as e:
+                            st.warning(f"Informe {qtd_nums} números válidos. {e}")
+                        else:
+                            st.write("Já foi sorteada." if sorteada else "Nunca foi sorteada.")
+
+        # Desempenho das estratégias contra todos os concursos já sorteados
+        with st.expander("Backtest das Estratégias"):
+            armazem = obter_armazem(loteria_selecionada)
+            matrizes = armazem.matrizes()
+            # Dia de Sorte: o mês gerado é pontuado contra o mês de cada concurso
+            meses_bt = None
+            if "mes" in especificacao.campos:
+                meses_bt = meses_sorteados(armazem.tabela, matrizes["dezenas"].concursos)
+            col_qtd_bt, col_modo_bt = st.columns(2)
+            with col_qtd_bt:
+                qtd_backtest = st.number_input("Combinações por geração", 1, 100_000, 10_000, step=1_000)
+            with col_modo_bt:
+                modo_backtest = st.radio("Avaliação", ["Histórico completo", "Walk-forward"], horizontal=True)
+            if modo_backtest == "Walk-forward":
+                total_linhas = len(matrizes["dezenas"])
+                col_ultimos, col_passo = st.columns(2)
+                with col_ultimos:
+                    concursos_avaliados = st.number_input("Concursos avaliados", 1, max(total_linhas - 1, 1), min(100, max(total_linhas - 1, 1)))
+                with col_passo:
+                    passo_backtest = st.number_input("Concursos por geração", 1, 100, 10)
+
+            if st.button("Executar backtest"):
+                if modo_backtest == "Walk-forward":
+                    distribuicao, _ = walk_forward(
+                        loteria_selecionada, matrizes, total_linhas - int(concursos_avaliados),
+                        int(passo_backtest), int(qtd_backtest), meses=meses_bt
+                    )
+                else:
+                    dezenas_bt, trevos_bt = gerar_lote(indices, loteria_selecionada, int(qtd_backtest), semente=0)
+                    distribuicao = backtest(loteria_selecionada, matrizes, dezenas_bt, trevos_bt, meses_bt)
+
+                if distribuicao is None:
+                    st.info("Histórico insuficiente para o backtest.")
+                else:
+                    faixas = resumo_faixas(loteria_selecionada, distribuicao)
+                    st.dataframe(
+                        pd.DataFrame(
+                            [("+".join(map(str, f)) if isinstance(f, tuple) else TITULOS_EXTRAS.get(f, str(f)), q)
+                             for f, q in faixas],
+                            columns=["Acertos", "Ocorrências"]
+                        ),
+                        use_container_width=True
+                    )
+    else:
+        st.info("Geração de combinações não disponível para esta loteria.")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Histórico dos concursos recentes e conferência de combinações
+@fragmento
+@medido("secao.historico")
+def secao_historico(loteria_selecionada, df, indices):
+    st.markdown("<h2 style='margin-top:40px;'>📜 Histórico de Concursos</h2>", unsafe_allow_html=True)
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+
+    # Seleção de número de concursos para exibir
+    num_concursos = st.slider("Quantidade de concursos para exibir", 5, 20, 10)
+
+    # Preparar colunas para exibição
+    colunas_exibir = ["concurso"]
+    if "data" in df.columns:
+        colunas_exibir.append("data")
+    if "dezenas" in df.columns:
+        colunas_exibir.append("dezenas")
+    especificacao = ESPECIFICACOES[loteria_selecionada]
+    colunas_exibir += [c for c in especificacao.extras if c in df.columns]
+
+    # Exibir tabela com histórico de concursos
+    df_exibir = df[colunas_exibir].sort_values(by="concurso", ascending=False).head(num_concursos).reset_index(drop=True)
+
+    # Formatação de data, se disponível
+    if "data" in df_exibir.columns:
+        df_exibir["data"] = df_exibir["data"].dt.strftime("%d/%m/%Y")
+
+    st.dataframe(df_exibir, use_container_width=True)
+
+    # Conferência de uma combinação contra todo o histórico, por popcount das máscaras de bits
+    if "dezenas" in indices and not especificacao.posicional:
+        with st.expander("Conferir Combinação no Histórico"):
+            matriz = obter_armazem(loteria_selecionada).matrizes()["dezenas"]
+            conferir = st.multiselect(
+                "Números da combinação", matriz.numeros.tolist(),
+                max_selections=especificacao.qtd_nums
+            )
+            if conferir:
+                acertos = em_comum(codificar([conferir], matriz.max_num, matriz.numero_inicial)[0], matriz.mascaras)
+                maximo = int(acertos.max())
+                concursos_maximo = matriz.concursos[acertos == maximo][::-1][:20].tolist()
+                st.markdown(
+                    f"<p>Máximo de acertos em um concurso: <span style='color:#00ffcc;font-weight:bold;'>{maximo}</span></p>"
+                    f"<p>Concursos com {maximo} acertos: {', '.join(map(str, concursos_maximo))}</p>",
+                    unsafe_allow_html=True
+                )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Endpoint /metrics, iniciado uma vez por processo se LOTERIAS_METRICAS_PORTA estiver definida
+@st.cache_resource
+def iniciar_servidor_metricas():
+    return servir_metricas()
+
+# Painel de depuração na barra lateral: trechos medidos nesta execução da página, aninhados,
+# com barra proporcional ao tempo total, e os contadores de cache acumulados no processo
+def painel_desempenho():
+    trechos = resumo_execucao()
+    if not trechos:
+        return
+    total = sum(ms for profundidade, _, ms in trechos if profundidade == 0) or 1
+    with st.sidebar.expander("⏱️ Desempenho desta execução"):
+        linhas = [
+            f'<div style="margin-left:{12 * profundidade}px;font-size:12px;color:#e0e0e0;">{nome} '
+            f'<b style="color:#00ffcc;">{ms:.1f} ms</b>'
+            f'<div style="height:4px;width:{min(100, 100 * ms / total):.0f}%;background:#00ccff;"></div></div>'
+            for profundidade, nome, ms in trechos
+        ]
+        st.markdown("".join(linhas), unsafe_allow_html=True)
+        _, eventos, quantidades = totais()
+        if eventos:
+            st.dataframe(
+                pd.DataFrame([(nome, evento, n) for (nome, evento), n in sorted(eventos.items())],
+                             columns=["Cache", "Evento", "Quantidade"]),
+                use_container_width=True, hide_index=True
+            )
+        for origem, quantidade in sorted(quantidades.items()):
+            st.markdown(f"<p style='font-size:12px;'>{origem}: {quantidade / 1024:.1f} KiB</p>", unsafe_allow_html=True)
+
 # Layout principal da aplicação
 def main():
+    iniciar_execucao()
+    iniciar_servidor_metricas()
     # Barra lateral
     with st.sidebar:
         st.markdown("""
@@ -480,12 +776,19 @@ def main():
     """, unsafe_allow_html=True)
 
     # Carregamento de dados
-    df = carregar_dados(loteria_selecionada)
+    contar("carregar_dados", "chamada")
+    with medir("pagina.carregar_dados"):
+        df = carregar_dados(loteria_selecionada)
+    # Índice único de estatísticas lido por todas as seções da página
+    with medir("pagina.indices"):
+        indices = obter_armazem(loteria_selecionada).indices()
     
     if df.empty:
         st.error(f"Não foi possível carregar dados para {loteria_selecionada.upper()}. Tente novamente mais tarde ou selecione outra loteria.")
         return
 
+    especificacao = ESPECIFICACOES[loteria_selecionada]
+
     # Exibição do último concurso
     ultimo_concurso = df.sort_values("concurso", ascending=False).iloc[0]
     
@@ -507,19 +810,15 @@ def main():
             st.markdown("<h3>Números Sorteados</h3>", unsafe_allow_html=True)
             st.markdown(exibir_numeros(ultimo_concurso["dezenas"]), unsafe_allow_html=True)
         
-        if loteria_selecionada == "maismilionaria" and "trevos" in df.columns:
-            st.markdown("<h3>Trevos</h3>", unsafe_allow_html=True)
-            st.markdown(exibir_numeros(ultimo_concurso["trevos"], "number-highlight"), unsafe_allow_html=True)
-        
-        if loteria_selecionada == "duplasena" and "dezenas_2" in df.columns:
-            st.markdown("<h3>Segundo Sorteio</h3>", unsafe_allow_html=True)
-            st.markdown(exibir_numeros(ultimo_concurso["dezenas_2"]), unsafe_allow_html=True)
-        
-        if loteria_selecionada == "timemania" and "time" in df.columns:
-            st.markdown(f"<h3>Time do Coração</h3><p style='color:#00ffcc;font-size:18px;text-align:center;'>{ultimo_concurso['time']}</p>", unsafe_allow_html=True)
-        
-        if loteria_selecionada == "diadesorte" and "mes" in df.columns:
-            st.markdown(f"<h3>Mês da Sorte</h3><p style='color:#00ffcc;font-size:18px;text-align:center;'>{ultimo_concurso['mes']}</p>", unsafe_allow_html=True)
+        # Sorteios e campos extras da loteria: números em destaque, textos em parágrafo
+        for campo in especificacao.extras:
+            if campo not in df.columns:
+                continue
+            if campo in COLUNAS_NUMEROS:
+                st.markdown(f"<h3>{TITULOS_EXTRAS[campo]}</h3>", unsafe_allow_html=True)
+                st.markdown(exibir_numeros(ultimo_concurso[campo]), unsafe_allow_html=True)
+            else:
+                st.markdown(f"<h3>{TITULOS_EXTRAS[campo]}</h3><p style='color:#00ffcc;font-size:18px;text-align:center;'>{ultimo_concurso[campo]}</p>", unsafe_allow_html=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
     
@@ -530,9 +829,8 @@ def main():
         num_concursos = len(df)
         
         # Métricas específicas por tipo de loteria
-        if "dezenas" in df.columns:
-            numeros = df["dezenas"].explode()
-            num_mais_comum = numeros.value_counts().idxmax()
+        if "dezenas" in indices:
+            num_mais_comum = indices["dezenas"].mais_frequente()
             st.markdown(f"""
             <p>Total de concursos: <span style="color:#00ffcc;font-weight:bold;">{num_concursos}</span></p>
             <p>Número mais frequente: <span style="color:#00ffcc;font-weight:bold;">{num_mais_comum}</span></p>
@@ -540,18 +838,14 @@ def main():
             
             """, unsafe_allow_html=True)
         # Métricas adicionais específicas
-        if loteria_selecionada == "maismilionaria" and "trevos" in df.columns:
-            trevos = df["trevos"].explode()
-            trevo_mais_comum = trevos.value_counts().idxmax()
+        if "trevos" in indices:
+            trevo_mais_comum = indices["trevos"].mais_frequente()
             st.markdown(f"<p>Trevo mais frequente: <span style='color:#00ffcc;font-weight:bold;'>{trevo_mais_comum}</span></p>", unsafe_allow_html=True)
         
-        if loteria_selecionada == "timemania" and "time" in df.columns:
-            time_mais_comum = df["time"].value_counts().idxmax()
-            st.markdown(f"<p>Time mais sorteado: <span style='color:#00ffcc;font-weight:bold;'>{time_mais_comum}</span></p>", unsafe_allow_html=True)
-        
-        if loteria_selecionada == "diadesorte" and "mes" in df.columns:
-            mes_mais_comum = df["mes"].value_counts().idxmax()
-            st.markdown(f"<p>Mês mais sorteado: <span style='color:#00ffcc;font-weight:bold;'>{mes_mais_comum}</span></p>", unsafe_allow_html=True)
+        for campo in ("time", "mes"):
+            if campo in especificacao.extras and campo in df.columns:
+                mais_comum = df[campo].value_counts().idxmax()
+                st.markdown(f"<p>{MAIS_SORTEADOS[campo]}: <span style='color:#00ffcc;font-weight:bold;'>{mais_comum}</span></p>", unsafe_allow_html=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -559,314 +853,58 @@ def main():
     st.markdown("<h2 style='margin-top:40px;'>📈 Análises Estatísticas Avançadas</h2>", unsafe_allow_html=True)
     
     # Verifica se a loteria tem dezenas para análise
-    if "dezenas" in df.columns:
-        numeros = df["dezenas"].explode()
-        freq_numeros = numeros.value_counts().sort_index()
-        
-        tabs = st.tabs(["Frequência dos Números", "Mapa de Calor", "Análise Temporal"])
-        
-        with tabs[0]:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            # Gráfico de frequência interativo
-            fig_freq = criar_grafico_frequencia(freq_numeros, "Frequência dos Números Sorteados", "Viridis")
-            st.plotly_chart(fig_freq, use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[1]:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            # Definir o número máximo para cada loteria
-            max_nums = {
-                "maismilionaria": 50, "megasena": 60, "lotofacil": 25, 
-                "quina": 80, "lotomania": 100, "timemania": 80, 
-                "duplasena": 50, "diadesorte": 31, "supersete": 10
-            }
-            
-            max_num = max_nums.get(loteria_selecionada, 60)
-            
-            # Mapa de calor de números por posição
-            fig_heatmap = criar_mapa_calor(df, "dezenas", "Frequência por Posição do Sorteio", max_num)
-            st.plotly_chart(fig_heatmap, use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[2]:
-            # Verificar se temos coluna de data para análise temporal
-            if "data" in df.columns and df["data"].notna().any():
-                st.markdown('<div class="card">', unsafe_allow_html=True)
-                
-                # Preparar dados temporais
-                df_temporal = df.copy()
-                df_temporal["ano_mes"] = df_temporal["data"].dt.strftime("%Y-%m")
-                
-                # Agrupamento por mês
-                contagem_mensal = df_temporal.groupby("ano_mes").size().reset_index(name="contagem")
-                contagem_mensal.columns = ["Mês", "Quantidade"]
-                
-                # Gráfico de tendência
-                fig_temporal = px.line(
-                    contagem_mensal.tail(24),  # Últimos 24 meses
-                    x="Mês",
-                    y="Quantidade",
-                    markers=True,
-                    title="Tendência de Concursos por Mês",
-                    line_shape="spline"
-                )
-                
-                fig_temporal.update_layout(
-                    template="plotly_dark",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    title_font={"family": "Orbitron", "size": 24, "color": "#00ccff"},
-                    font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-                    title_x=0.5,
-                    xaxis_title="Período",
-                    yaxis_title="Quantidade de Concursos",
-                    xaxis_title_font={"size": 16, "color": "#00ccff"},
-                    yaxis_title_font={"size": 16, "color": "#00ccff"},
-                    margin=dict(l=40, r=40, t=70, b=40)
-                )
-                
-                # Adiciona efeito de brilho na linha
-                fig_temporal.update_traces(
-                    line=dict(width=3, color="#00ffcc"),
-                    marker=dict(size=8, line=dict(width=2, color="#00ffcc"))
-                )
-                
-                st.plotly_chart(fig_temporal, use_container_width=True)
-                
-                # Análise de sazonalidade (dias da semana)
-                if len(df_temporal) > 30:  # Só faz sentido com dados suficientes
-                    st.markdown("<h3>Sazonalidade por Dia da Semana</h3>", unsafe_allow_html=True)
-                    
-                    df_temporal["dia_semana"] = df_temporal["data"].dt.day_name()
-                    ordem_dias = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                    nomes_dias = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
-                    
-                    # Mapeamento de inglês para português
-                    df_temporal["dia_semana"] = df_temporal["dia_semana"].map(dict(zip(ordem_dias, nomes_dias)))
-                    
-                    # Contagem por dia da semana
-                    contagem_dias = df_temporal["dia_semana"].value_counts().reindex(nomes_dias).fillna(0)
-                    
-                    # Gráfico de barras para dias da semana
-                    fig_dias = px.bar(
-                        x=contagem_dias.index,
-                        y=contagem_dias.values,
-                        labels={"x": "Dia da Semana", "y": "Quantidade de Sorteios"},
-                        title="Distribuição de Sorteios por Dia da Semana",
-                        color=contagem_dias.values,
-                        color_continuous_scale="Viridis"
-                    )
-                    
-                    fig_dias.update_layout(
-                        template="plotly_dark",
-                        plot_bgcolor="rgba(0,0,0,0)",
-                        paper_bgcolor="rgba(0,0,0,0)",
-                        title_font={"family": "Orbitron", "size": 20, "color": "#00ccff"},
-                        font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-                        title_x=0.5,
-                        xaxis_title_font={"size": 16, "color": "#00ccff"},
-                        yaxis_title_font={"size": 16, "color": "#00ccff"},
-                        margin=dict(l=40, r=40, t=70, b=40)
-                    )
-                    
-                    st.plotly_chart(fig_dias, use_container_width=True)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-            else:
-                st.info("Dados temporais não disponíveis para esta loteria.")
+    if "dezenas" in indices:
+        secao_analises(loteria_selecionada, df, indices)
     
     # Análise específica para +Milionária e outras loterias com elementos adicionais
-    if loteria_selecionada == "maismilionaria" and "trevos" in df.columns:
+    if "trevos" in indices:
         st.markdown("<h2 style='margin-top:40px;'>🍀 Análise dos Trevos</h2>", unsafe_allow_html=True)
         
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        trevos = df["trevos"].explode()
-        freq_trevos = trevos.value_counts().sort_index()
+        freq_trevos = indices["trevos"].serie_frequencias()
         
         # Gráfico de frequência dos trevos
-        fig_trevos = criar_grafico_frequencia(freq_trevos, "Frequência dos Trevos da Sorte", "Turbo", height=300)
+        fig_trevos = grafico_frequencia(freq_trevos, "Frequência dos Trevos da Sorte", "Turbo", altura=300)
         st.plotly_chart(fig_trevos, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Análise específica para Timemania
-    elif loteria_selecionada == "timemania" and "time" in df.columns:
+    elif "time" in especificacao.extras and "time" in df.columns:
         st.markdown("<h2 style='margin-top:40px;'>⚽ Times do Coração</h2>", unsafe_allow_html=True)
         
         st.markdown('<div class="card">', unsafe_allow_html=True)
         # Top 10 times mais sorteados
         top_times = df["time"].value_counts().head(10)
         
-        fig_times = px.bar(
-            x=top_times.index,
-            y=top_times.values,
-            labels={"x": "Time", "y": "Frequência"},
-            title="Top 10 Times do Coração Mais Sorteados",
-            color=top_times.values,
-            color_continuous_scale="Viridis"
-        )
-        
-        fig_times.update_layout(
-            template="plotly_dark",
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            title_font={"family": "Orbitron", "size": 20, "color": "#00ccff"},
-            font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-            title_x=0.5,
-            xaxis_title_font={"size": 16, "color": "#00ccff"},
-            yaxis_title_font={"size": 16, "color": "#00ccff"},
-            margin=dict(l=40, r=40, t=70, b=40),
-            xaxis_tickangle=-45
+        fig_times = grafico_barras(
+            top_times.index.to_numpy(), top_times.to_numpy(), "Top 10 Times do Coração Mais Sorteados",
+            "Time", "Frequência", cor=top_times.to_numpy(), inclinacao_x=-45
         )
         
         st.plotly_chart(fig_times, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Análise específica para Dia de Sorte
-    elif loteria_selecionada == "diadesorte" and "mes" in df.columns:
+    elif "mes" in especificacao.extras and "mes" in df.columns:
         st.markdown("<h2 style='margin-top:40px;'>🗓️ Meses da Sorte</h2>", unsafe_allow_html=True)
         
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        # Frequência dos meses
-        freq_meses = df["mes"].value_counts().sort_index()
-        
-        # Mapeamento de número para nome do mês
-        meses_nomes = {
-            1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril",
-            5: "Maio", 6: "Junho", 7: "Julho", 8: "Agosto",
-            9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-        }
-        
-        # Garantir que todos os meses estejam presentes
-        todos_meses = pd.Series(index=range(1, 13), data=[0]*12)
-        freq_meses = freq_meses.add(todos_meses, fill_value=0)
+        # Frequência de todos os meses, na ordem do calendário (o mês vem da API pelo nome ou pelo número)
+        freq_meses = np.bincount(numeros_meses(df["mes"]), minlength=13)[1:]
         
-        # Substituir índices numéricos pelos nomes dos meses
-        freq_meses.index = [meses_nomes.get(m, m) for m in freq_meses.index]
-        
-        fig_meses = px.bar(
-            x=freq_meses.index,
-            y=freq_meses.values,
-            labels={"x": "Mês", "y": "Frequência"},
-            title="Frequência dos Meses da Sorte",
-            color=freq_meses.values,
-            color_continuous_scale="Viridis"
-        )
-        
-        fig_meses.update_layout(
-            template="plotly_dark",
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            title_font={"family": "Orbitron", "size": 20, "color": "#00ccff"},
-            font={"family": "Arial", "size": 14, "color": "#e0e0e0"},
-            title_x=0.5,
-            xaxis_title_font={"size": 16, "color": "#00ccff"},
-            yaxis_title_font={"size": 16, "color": "#00ccff"},
-            margin=dict(l=40, r=40, t=70, b=40)
+        fig_meses = grafico_barras(
+            np.asarray(MESES), freq_meses, "Frequência dos Meses da Sorte", "Mês", "Frequência", cor=freq_meses
         )
         
         st.plotly_chart(fig_meses, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Previsões e combinações inteligentes
-    st.markdown("<h2 style='margin-top:40px;'>🔮 Previsões Inteligentes</h2>", unsafe_allow_html=True)
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    
-    # Verificar se a loteria atual suporta geração de combinações
-    if loteria_selecionada != "federal" and "dezenas" in df.columns:
-        # Gerar combinações inteligentes
-        combinacoes_resultado = gerar_combinacoes_inteligentes(df, "dezenas", loteria_selecionada, 5)
-        
-        # Verifica se o resultado é uma tupla (no caso de loterias com trevos)
-        if isinstance(combinacoes_resultado, tuple):
-            combinacoes = combinacoes_resultado[0]
-            trevos_combinacoes = combinacoes_resultado[1]
-            
-            # Exibir combinações geradas
-            st.markdown("<h3>Combinações Sugeridas</h3>", unsafe_allow_html=True)
-            
-            for i, (comb, trevos) in enumerate(zip(combinacoes, trevos_combinacoes), 1):
-                st.markdown(f"<h4>Combinação {i}</h4>", unsafe_allow_html=True)
-                st.markdown(exibir_numeros(comb), unsafe_allow_html=True)
-                
-                if loteria_selecionada == "maismilionaria":
-                    st.markdown("<h5>Trevos</h5>", unsafe_allow_html=True)
-                    st.markdown(exibir_numeros(trevos), unsafe_allow_html=True)
-                
-                elif loteria_selecionada == "diadesorte":
-                    mes_nome = {
-                        1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril",
-                        5: "Maio", 6: "Junho", 7: "Julho", 8: "Agosto",
-                        9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-                    }
-                    st.markdown(f"<h5>Mês da Sorte: <span style='color:#00ffcc;'>{mes_nome.get(trevos[0], trevos[0])}</span></h5>", unsafe_allow_html=True)
-                
-                st.markdown("<hr style='border-color:rgba(0,204,255,0.2);margin:20px 0;'>", unsafe_allow_html=True)
-        else:
-            combinacoes = combinacoes_resultado
-            
-            # Exibir combinações geradas
-            st.markdown("<h3>Combinações Sugeridas</h3>", unsafe_allow_html=True)
-            
-            for i, comb in enumerate(combinacoes, 1):
-                st.markdown(f"<h4>Combinação {i}</h4>", unsafe_allow_html=True)
-                st.markdown(exibir_numeros(comb), unsafe_allow_html=True)
-                
-                st.markdown("<hr style='border-color:rgba(0,204,255,0.2);margin:20px 0;'>", unsafe_allow_html=True)
-    
-        # Metodologia de geração
-        with st.expander("Metodologia de Geração"):
-            st.markdown("""
-            <p style="color:#e0e0e0;">
-                As combinações são geradas usando um algoritmo avançado que considera:
-            </p>
-            <ul style="color:#e0e0e0;">
-                <li>Frequência histórica dos números</li>
-                <li>Padrões de sorteios recentes</li>
-                <li>Números que não são sorteados há muito tempo</li>
-                <li>Balanceamento entre números quentes e frios</li>
-                <li>Distribuição de paridade (números pares e ímpares)</li>
-            </ul>
-            <p style="color:#e0e0e0;font-style:italic;">
-                Nota: As previsões são baseadas apenas em análises estatísticas e não garantem resultados.
-            </p>
-            """, unsafe_allow_html=True)
-    else:
-        st.info("Geração de combinações não disponível para esta loteria.")
-    
-    st.markdown("</div>", unsafe_allow_html=True)
+    secao_previsoes(loteria_selecionada, indices)
     
     # Concursos recentes
-    st.markdown("<h2 style='margin-top:40px;'>📜 Histórico de Concursos</h2>", unsafe_allow_html=True)
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    
-    # Seleção de número de concursos para exibir
-    num_concursos = st.slider("Quantidade de concursos para exibir", 5, 20, 10)
-    
-    # Preparar colunas para exibição
-    colunas_exibir = ["concurso"]
-    if "data" in df.columns:
-        colunas_exibir.append("data")
-    if "dezenas" in df.columns:
-        colunas_exibir.append("dezenas")
-    if loteria_selecionada == "maismilionaria" and "trevos" in df.columns:
-        colunas_exibir.append("trevos")
-    if loteria_selecionada == "timemania" and "time" in df.columns:
-        colunas_exibir.append("time")
-    if loteria_selecionada == "diadesorte" and "mes" in df.columns:
-        colunas_exibir.append("mes")
-    if loteria_selecionada == "duplasena" and "dezenas_2" in df.columns:
-        colunas_exibir.append("dezenas_2")
-    
-    # Exibir tabela com histórico de concursos
-    df_exibir = df[colunas_exibir].sort_values(by="concurso", ascending=False).head(num_concursos).reset_index(drop=True)
-    
-    # Formatação de data, se disponível
-    if "data" in df_exibir.columns:
-        df_exibir["data"] = df_exibir["data"].dt.strftime("%d/%m/%Y")
-    
-    st.dataframe(df_exibir, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-    
+    secao_historico(loteria_selecionada, df, indices)
+
     # Rodapé com informações adicionais
     st.markdown("""
     <div style="margin-top:50px;padding:20px;text-align:center;background:linear-gradient(145deg,#121928,#0d131e);border-radius:15px;border:1px solid rgba(0,204,255,0.1);">
@@ -879,6 +917,9 @@ def main():
     </div>
     """.format(data_atual=datetime.now().strftime("%d/%m/%Y %H:%M")), unsafe_allow_html=True)
 
+    painel_desempenho()
+    gravar_metricas()
+
 # Executar a aplicação
 if __name__ == "__main__":
     main()
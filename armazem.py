@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+
+import cache_disco
+from compartilhado import ATIVO as COMPARTILHADO_ATIVO, CacheCompartilhado
+from estatisticas import IndiceEstatisticas
+from instrumentacao import medir, registrar_bytes
+from loterias import faixa_numeros
+from matrizes import MatrizSorteios
+from processamento import iterar_registros, processar_registros
+
+# URL base da API; aponte para um espelho local (espelho.py) para não depender do servidor público
+URL_API = os.environ.get("LOTERIAS_API_URL", "https://loteriascaixa-api.herokuapp.com/api")
+# Com o espelho, busca a tabela colunar já processada em vez do JSON dos concursos
+API_COMPACTA = os.environ.get("LOTERIAS_API_COMPACTA", "") not in ("", "0")
+# Tamanho dos blocos lidos da resposta do histórico completo
+TAMANHO_BLOCO = 64 * 1024
+
+
+# Repassa os blocos da resposta somando o tamanho recebido nas métricas
+def _contar_bytes(blocos):
+    for bloco in blocos:
+        registrar_bytes("api", len(bloco))
+        yield bloco
+
+
+# Armazém local dos sorteios de uma loteria, sincronizado de forma incremental
+class ArmazemSorteios:
+    def __init__(self, loteria, url_base=URL_API, sessao=None, timeout=(5, 30), diretorio_cache=None,
+                 compacto=API_COMPACTA, compartilhado=COMPARTILHADO_ATIVO):
+        self.loteria = loteria
+        self.compacto = compacto
+        # Matrizes e índices mapeados de arquivos compartilhados com os outros processos
+        self.compartilhado = CacheCompartilhado(diretorio_cache) if compartilhado else None
+        # ETag da última resposta compacta, para pedidos condicionais ao espelho
+        self.etag = None
+        self.url_base = url_base.rstrip("/")
+        self.sessao = sessao or requests.Session()
+        self.timeout = timeout
+        self.diretorio_cache = diretorio_cache
+        self._lock = threading.RLock()
+        self._matrizes = None
+        self._indices = None
+        self.sincronizado_em = None
+        # Tabela colunar (números em colunas uint8 de largura fixa), a mesma gravada em disco.
+        # Parte do cache em disco, se houver, para não depender da rede na partida
+        self.tabela, self.metadados = cache_disco.carregar(loteria, diretorio_cache)
+
+    @property
+    def vazio(self):
+        return self.metadados is None or len(self.tabela) == 0
+
+    @property
+    def ultimo_concurso(self):
+        if self.vazio:
+            return 0
+        return self.metadados["ultimo_concurso"]
+
+    # Tabela colunar e metadados atuais, lidos juntos
+    def tabela_colunar(self):
+        with self._lock:
+            return self.tabela, self.metadados
+
+    # DataFrame com as listas de números de cada concurso, usado na exibição
+    def dataframe(self):
+        with self._lock:
+            if self.vazio:
+                return pd.DataFrame()
+            return cache_disco.de_colunar(self.tabela, self.metadados)
+
+    def _buscar(self, caminho=""):
+        with medir("api.buscar"):
+            response = self.sessao.get(f"{self.url_base}/{self.loteria}{caminho}", timeout=self.timeout)
+            response.raise_for_status()  # Verifica se houve erros na requisição
+            registrar_bytes("api", len(response.content))
+            return response.json()
+
+    # Baixa o histórico completo processando a resposta em blocos, registro a registro
+    def _buscar_historico(self):
+        url = f"{self.url_base}/{self.loteria}"
+        with medir("api.historico"), self.sessao.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            return processar_registros(self.loteria, iterar_registros(_contar_bytes(response.iter_content(TAMANHO_BLOCO))))
+
+    # Sincroniza só se a última sincronização tiver mais de `idade_maxima` segundos
+    def sincronizar_se_necessario(self, idade_maxima):
+        with self._lock:
+            recente = self.sincronizado_em is not None and time.monotonic() - self.sincronizado_em < idade_maxima
+            if recente and not self.vazio:
+                return 0
+            return self.sincronizar()
+
+    # Busca apenas os concursos posteriores ao último já sincronizado
+    # e retorna a quantidade de concursos novos
+    def sincronizar(self):
+        with self._lock:
+            novos = self._sincronizar()
+            self.sincronizado_em = time.monotonic()
+            return novos
+
+    # Sincronização pelo espelho: pede só os concursos posteriores ao último local, já na tabela
+    # colunar, com If-None-Match para nem receber corpo quando não há concurso novo
+    def _sincronizar_compacto(self):
+        cabecalhos = {"If-None-Match": self.etag} if self.etag and not self.vazio else {}
+        with medir("api.compacto"):
+            response = self.sessao.get(
+                f"{self.url_base}/{self.loteria}/compacto", params={"desde": self.ultimo_concurso},
+                headers=cabecalhos, timeout=self.timeout
+            )
+            if response.status_code == 304:
+                return 0
+            response.raise_for_status()
+            registrar_bytes("api", len(response.content))
+            novos, metadados_novos = cache_disco.de_bytes(response.content)
+        self.etag = response.headers.get("ETag")
+        if len(novos) == 0:
+            return 0
+        self._anexar(novos, metadados_novos)
+        self._salvar()
+        return len(novos)
+
+    def _sincronizar(self):
+        if self.compacto:
+            return self._sincronizar_compacto()
+        if not self.vazio:
+            ultimo = self._buscar("/latest")
+            if not isinstance(ultimo, dict) or "concurso" not in ultimo:
+                raise ValueError(f"Estrutura inesperada na resposta da API para {self.loteria}.")
+
+            concurso_atual = int(ultimo["concurso"])
+            if concurso_atual == self.ultimo_concurso:
+                return 0
+
+            if concurso_atual > self.ultimo_concurso:
+                # Concursos intermediários que ainda não foram sincronizados
+                novos = [self._buscar(f"/{n}") for n in range(self.ultimo_concurso + 1, concurso_atual)]
+                novos.append(ultimo)
+                self._anexar(*processar_registros(self.loteria, novos))
+                self._salvar()
+                return len(novos)
+
+            # Cache à frente da API: o histórico local não é confiável, recarrega do zero
+            self.tabela, self.metadados = pd.DataFrame(), None
+            cache_disco.remover(self.loteria, self.diretorio_cache)
+
+        # Primeira carga: histórico completo
+        self._anexar(*self._buscar_historico())
+        self._salvar()
+        return len(self.tabela)
+
+    def _anexar(self, novos, metadados_novos):
+        if len(novos) == 0:
+            return
+        apenas_ao_final = not self.vazio and int(novos["concurso"].min()) > self.ultimo_concurso
+        inicio = len(self.tabela)
+        self.tabela, self.metadados = cache_disco.juntar(self.tabela, self.metadados, novos, metadados_novos)
+
+        if apenas_ao_final and self.compartilhado is None:
+            # Concursos novos ao final: estende matrizes e índices só com as linhas novas
+            self._estender_matrizes(novos, metadados_novos, inicio)
+        else:
+            # As versões compartilhadas são só de leitura: a do concurso novo é aberta (ou calculada
+            # por um único processo) no próximo acesso
+            self._matrizes = None
+            self._indices = None
+
+    # Monta matrizes e índices novos e só então os troca, ainda sob a trava: as sessões que já
+    # obtiveram os anteriores continuam lendo objetos que não mudam
+    def _estender_matrizes(self, novos, metadados_novos, inicio):
+        if self._matrizes is None:
+            return
+        concursos = novos["concurso"].to_numpy()
+        matrizes = {
+            coluna: matriz.anexar(concursos, cache_disco.matriz_coluna(novos, metadados_novos, coluna))
+            for coluna, matriz in self._matrizes.items()
+        }
+        indices = None
+        if self._indices is not None:
+            indices = {coluna: indice.estendido(matrizes[coluna], inicio) for coluna, indice in self._indices.items()}
+        self._matrizes, self._indices = matrizes, indices
+
+    def _construir_matrizes(self):
+        matrizes = {}
+        if not self.vazio:
+            concursos = self.tabela["concurso"].to_numpy()
+            for coluna in self.metadados["larguras"]:
+                max_num, numero_inicial = faixa_numeros(self.loteria, coluna)
+                matrizes[coluna] = MatrizSorteios(
+                    concursos, cache_disco.matriz_coluna(self.tabela, self.metadados, coluna),
+                    max_num, numero_inicial
+                )
+        return matrizes
+
+    def _construir_tudo(self):
+        matrizes = self._construir_matrizes()
+        return matrizes, {coluna: IndiceEstatisticas.de_matriz(matriz) for coluna, matriz in matrizes.items()}
+
+    # Com o cache compartilhado, matrizes e índices vêm juntos da versão do último concurso
+    def _abrir_compartilhado(self):
+        self._matrizes, self._indices = self.compartilhado.obter(
+            self.loteria, self.ultimo_concurso, self._construir_tudo
+        )
+
+    # Matrizes densas de cada coluna de números, construídas uma vez e estendidas a cada concurso novo
+    def matrizes(self):
+        with self._lock:
+            if self._matrizes is None:
+                if self.compartilhado is not None and not self.vazio:
+                    self._abrir_compartilhado()
+                else:
+                    self._matrizes = self._construir_matrizes()
+            return self._matrizes
+
+    # Índices de estatísticas de cada coluna de números, atualizados junto com as matrizes
+    def indices(self):
+        with self._lock:
+            if self._indices is None:
+                if self.compartilhado is not None and not self.vazio:
+                    self._abrir_compartilhado()
+                else:
+                    self._indices = {
+                        coluna: IndiceEstatisticas.de_matriz(matriz) for coluna, matriz in self.matrizes().items()
+                    }
+            return self._indices
+
+    def _salvar(self):
+        if self.vazio:
+            return
+        try:
+            cache_disco.salvar(self.loteria, self.tabela, self.metadados, self.diretorio_cache)
+        except OSError:
+            # Sem permissão de escrita o armazém continua funcionando só em memória
+            pass
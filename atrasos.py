@@ -0,0 +1,81 @@
+import numpy as np
+
+
+# Motor de atrasos: para cada número, a série completa de intervalos (em concursos) entre aparições
+# consecutivas, acumulada em histograma a cada concurso novo
+class MotorAtrasos:
+    def __init__(self, max_num, numero_inicial=1):
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+        self.total_concursos = 0
+        # Linha (ordem do concurso no histórico) em que cada número saiu pela última vez; -1 se nunca saiu
+        self.ultima_linha = np.full(max_num, -1, dtype=np.int64)
+        # histograma[n, g]: quantas vezes o número n ficou g concursos sem sair entre duas aparições
+        self.histograma = np.zeros((max_num, 1), dtype=np.int64)
+
+    @property
+    def numeros(self):
+        return np.arange(self.max_num) + self.numero_inicial
+
+    # Incorpora os concursos da matriz a partir da linha `inicio`, numa única passada pela incidência
+    def atualizar(self, matriz, inicio=None):
+        inicio = self.total_concursos if inicio is None else inicio
+        if inicio >= len(matriz):
+            return
+
+        # Aparições agrupadas por número, em ordem de concurso dentro de cada número
+        numeros, linhas = np.nonzero(matriz.incidencia[inicio:].T)
+        linhas = linhas + inicio
+        anteriores = np.empty_like(linhas)
+        anteriores[1:] = linhas[:-1]
+        primeiros = np.ones(len(numeros), dtype=bool)
+        primeiros[1:] = numeros[1:] != numeros[:-1]
+        anteriores[primeiros] = self.ultima_linha[numeros[primeiros]]
+        com_anterior = anteriores >= 0
+        atrasos = linhas[com_anterior] - anteriores[com_anterior] - 1
+        # Arrays novas em vez de alterar as atuais, que podem ser compartilhadas com outro índice
+        histograma = self.histograma
+        if len(atrasos) and atrasos.max() >= histograma.shape[1]:
+            extra = np.zeros((self.max_num, atrasos.max() + 1 - histograma.shape[1]), dtype=np.int64)
+            histograma = np.hstack([histograma, extra])
+        self.histograma = histograma + np.bincount(
+            numeros[com_anterior] * histograma.shape[1] + atrasos, minlength=histograma.size
+        ).reshape(histograma.shape)
+        ultimos = np.ones(len(numeros), dtype=bool)
+        ultimos[:-1] = numeros[1:] != numeros[:-1]
+        ultima_linha = self.ultima_linha.copy()
+        ultima_linha[numeros[ultimos]] = linhas[ultimos]
+        self.ultima_linha = ultima_linha
+
+        self.total_concursos = len(matriz)
+
+    # Concursos desde a última aparição de cada número (total de concursos se nunca saiu)
+    def atuais(self):
+        return np.where(self.ultima_linha >= 0, self.total_concursos - 1 - self.ultima_linha, self.total_concursos)
+
+    # Quantidade de intervalos fechados (entre duas aparições) de cada número
+    def intervalos(self):
+        return self.histograma.sum(axis=1)
+
+    # Maior atraso de cada número, contando também o atraso em aberto
+    def maximos(self):
+        fechados = self.histograma > 0
+        maior_fechado = np.where(fechados.any(axis=1), self.histograma.shape[1] - 1 - np.argmax(fechados[:, ::-1], axis=1), 0)
+        return np.maximum(maior_fechado, self.atuais())
+
+    # Atraso médio entre aparições de cada número (nan se saiu menos de duas vezes)
+    def medios(self):
+        total = self.histograma @ np.arange(self.histograma.shape[1])
+        intervalos = self.intervalos()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(intervalos > 0, total / intervalos, np.nan)
+
+    # Atraso atual dividido pelo atraso médio: acima de 1, o número está mais atrasado que o normal
+    def pontuacao(self):
+        medios = self.medios()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(medios > 0, self.atuais() / medios, 0.0)
+
+    # Distribuição dos atrasos de um número: vetor em que a posição g conta os intervalos de g concursos
+    def distribuicao(self, numero):
+        return self.histograma[(numero - self.numero_inicial) % self.max_num]
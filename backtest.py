@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from cache_disco import VAZIO
+from estatisticas import IndiceEstatisticas
+from geracao import gerar_lote
+from loterias import ESPECIFICACOES, faixa_numeros, numeros_meses
+from mascaras import BITS_POR_PALAVRA, codificar, para_booleanos
+
+# Limite de pares (bilhete, concurso) comparados de uma vez, para limitar a memória temporária
+PARES_POR_BLOCO = 1 << 23
+
+
+# Incidência float32 (linhas, bits) das máscaras, para contar acertos por produto de matrizes
+def _incidencia(mascaras):
+    return para_booleanos(mascaras, mascaras.shape[1] * BITS_POR_PALAVRA).astype(np.float32)
+
+
+# Acrescenta a `contagem` quantas vezes cada valor aparece em `chaves`. Os valores são poucos, e
+# uma comparação por valor até o maior presente sai bem mais barata que np.bincount.
+def _contar_valores(chaves, contagem):
+    contados = 0
+    for valor in range(1, int(chaves.max()) + 1):
+        quantidade = np.count_nonzero(chaves == valor)
+        contagem[valor] += quantidade
+        contados += quantidade
+    contagem[0] += chaves.size - contados
+
+
+# Quantidade de pares (bilhete, concurso) por número de acertos. Com trevos, retorna a matriz
+# (acertos nas dezenas, acertos nos trevos). Os acertos de um bloco de bilhetes com todos os
+# concursos saem de um produto das incidências (exato em float32 para contagens tão pequenas).
+def distribuicao_acertos(bilhetes, sorteios, max_acertos, bilhetes_trevos=None, sorteios_trevos=None,
+                         max_trevos=0):
+    largura = max_trevos + 1
+    contagem = np.zeros((max_acertos + 1) * largura, dtype=np.int64)
+    if len(bilhetes) == 0 or len(sorteios) == 0:
+        return contagem.reshape(max_acertos + 1, largura) if bilhetes_trevos is not None else contagem
+
+    tipo = np.min_scalar_type(len(contagem))
+    incidencia = _incidencia(sorteios).T
+    incidencia_trevos = _incidencia(sorteios_trevos).T if bilhetes_trevos is not None else None
+    tamanho = max(1, PARES_POR_BLOCO // len(sorteios))
+    for inicio in range(0, len(bilhetes), tamanho):
+        chaves = (_incidencia(bilhetes[inicio:inicio + tamanho]) @ incidencia).astype(tipo)
+        if bilhetes_trevos is not None:
+            chaves *= largura
+            chaves += (_incidencia(bilhetes_trevos[inicio:inicio + tamanho]) @ incidencia_trevos).astype(tipo)
+        _contar_valores(chaves, contagem)
+    return contagem.reshape(max_acertos + 1, largura) if bilhetes_trevos is not None else contagem
+
+
+# Quantidade de pares (bilhete, concurso) em cada faixa de premiação: lista de (faixa, quantidade).
+# No Dia de Sorte as faixas de dezenas valem com qualquer mês, e o mês é premiado à parte, como
+# a faixa rotulo_trevo ("mes").
+def resumo_faixas(loteria, distribuicao):
+    especificacao = ESPECIFICACOES[loteria]
+    if distribuicao.ndim == 2 and not isinstance(especificacao.faixas_premiacao[0], tuple):
+        faixas = [(faixa, int(distribuicao[faixa].sum())) for faixa in especificacao.faixas_premiacao]
+        return faixas + [(especificacao.rotulo_trevo, int(distribuicao[:, 1:].sum()))]
+    return [(faixa, int(distribuicao[faixa])) for faixa in especificacao.faixas_premiacao]
+
+
+# Mês da sorte (1 a 12, 0 se ausente) de cada concurso em `concursos`, a partir da tabela de sorteios
+def meses_sorteados(tabela, concursos):
+    meses = pd.Series(numeros_meses(tabela["mes"]), index=tabela["concurso"].to_numpy())
+    return meses.reindex(concursos, fill_value=0).to_numpy()
+
+
+# Máscaras de bits de uma coluna de números; nas loterias posicionais o bit inclui a coluna
+def _codificar_coluna(loteria, numeros, coluna="dezenas"):
+    max_num, numero_inicial = faixa_numeros(loteria, coluna)
+    posicional = coluna == "dezenas" and ESPECIFICACOES[loteria].posicional
+    return codificar(numeros, max_num, numero_inicial, posicional)
+
+
+# Máscaras dos concursos já guardadas na matriz, exceto nas loterias posicionais
+def _mascaras_sorteios(loteria, matriz):
+    if ESPECIFICACOES[loteria].posicional:
+        return _codificar_coluna(loteria, matriz.dezenas)
+    return matriz.mascaras
+
+
+# Pontua os bilhetes (dezenas e, se houver, trevos) contra os concursos das matrizes de sorteios.
+# Retorna a distribuição de acertos; na Dupla Sena cada sorteio do concurso conta separadamente.
+# No Dia de Sorte o mês gerado em `trevos` é comparado com `meses` (meses_sorteados, um por linha
+# da matriz de dezenas).
+def backtest(loteria, matrizes, dezenas, trevos=None, meses=None):
+    bilhetes = _codificar_coluna(loteria, dezenas)
+    max_acertos = dezenas.shape[1]
+    colunas = [c for c in ("dezenas", "dezenas_2") if c in matrizes]
+
+    sorteios_trevos = None
+    if "trevos" in matrizes:
+        sorteios_trevos = matrizes["trevos"].mascaras
+    elif meses is not None:
+        meses = np.asarray(meses)
+        sorteios_trevos = _codificar_coluna(loteria, np.where(meses > 0, meses, VAZIO)[:, None], "trevos")
+    if ESPECIFICACOES[loteria].tem_trevos and trevos is not None and sorteios_trevos is not None:
+        return distribuicao_acertos(
+            bilhetes, _mascaras_sorteios(loteria, matrizes["dezenas"]), max_acertos,
+            _codificar_coluna(loteria, trevos, "trevos"), sorteios_trevos, trevos.shape[1]
+        )
+    return sum(
+        distribuicao_acertos(bilhetes, _mascaras_sorteios(loteria, matrizes[c]), max_acertos)
+        for c in colunas
+    )
+
+
+# Avaliação walk-forward: a cada `passo` concursos, a partir da linha `inicio`, gera `quantidade`
+# bilhetes usando só o histórico anterior e os pontua nos `passo` concursos seguintes.
+# Retorna (distribuição total, lista de (primeiro concurso avaliado, distribuição do passo)).
+def walk_forward(loteria, matrizes, inicio, passo=1, quantidade=1000, semente=0, meses=None, **opcoes_geracao):
+    matriz = matrizes["dezenas"]
+    indice = IndiceEstatisticas(matriz.max_num, matriz.numero_inicial, matriz.dezenas.shape[1])
+    total, passos = None, []
+
+    for n, linha in enumerate(range(max(inicio, 1), len(matriz), passo)):
+        # O índice avança de forma incremental só com os concursos anteriores à linha atual
+        indice.atualizar(matriz.fatia(0, linha))
+        dezenas, trevos = gerar_lote({"dezenas": indice}, loteria, quantidade, semente=semente + n, **opcoes_geracao)
+        seguintes = {coluna: m.fatia(linha, linha + passo) for coluna, m in matrizes.items()}
+        meses_seguintes = meses[linha:linha + passo] if meses is not None else None
+        distribuicao = backtest(loteria, seguintes, dezenas, trevos, meses_seguintes)
+        passos.append((int(matriz.concursos[linha]), distribuicao))
+        total = distribuicao if total is None else total + distribuicao
+    return total, passos
@@ -0,0 +1,160 @@
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import cache_disco
+from armazem import TAMANHO_BLOCO
+from benchmarks.sinteticos import CONCURSOS_ATUAIS, escalar, registros_fixture, resposta_api
+from estatisticas import IndiceEstatisticas
+from geracao import gerar_lote
+from loterias import faixa_numeros
+from matrizes import MatrizSorteios
+from processamento import iterar_registros, processar_registros
+
+ESCALAS = (1, 10, 100)
+# Bilhetes gerados no caminho de geração
+BILHETES = 1000
+# Concursos da janela no mapa de calor por posição
+JANELA_MAPA = 100
+# Concursos exibidos no histórico
+CONCURSOS_HISTORICO = 20
+
+
+# Tempo da melhor de `repeticoes` execuções e pico de memória alocada (MB) numa execução extra
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    gc.collect()
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico / 2 ** 20
+
+
+# Caminhos quentes do app, cada um como função sem argumentos sobre o histórico já preparado
+def caminhos(loteria, registros):
+    corpo = resposta_api(registros)
+    tabela, metadados = processar_registros(loteria, registros)
+    max_num, numero_inicial = faixa_numeros(loteria)
+    matriz = MatrizSorteios(
+        tabela["concurso"].to_numpy(), cache_disco.matriz_coluna(tabela, metadados, "dezenas"), max_num, numero_inicial
+    )
+    indices = {"dezenas": IndiceEstatisticas.de_matriz(matriz)}
+    df = cache_disco.de_colunar(tabela, metadados)
+    concursos = matriz.concursos
+    janela = (int(concursos[max(len(concursos) - JANELA_MAPA, 0)]), int(concursos[-1]))
+
+    def blocos():
+        for inicio in range(0, len(corpo), TAMANHO_BLOCO):
+            yield corpo[inicio:inicio + TAMANHO_BLOCO]
+
+    return {
+        # Resposta da API em blocos até a tabela colunar (o antigo json_normalize em carregar_dados)
+        "leitura_api": lambda: processar_registros(loteria, iterar_registros(blocos())),
+        # Tabela colunar até o DataFrame com listas exibido no app
+        "dataframe": lambda: cache_disco.de_colunar(tabela, metadados),
+        # Frequências, posições, atrasos e coocorrência (o antigo explode().value_counts())
+        "estatisticas": lambda: IndiceEstatisticas.de_matriz(matriz),
+        # Mapa de calor por posição numa janela recente
+        "mapa_calor": lambda: matriz.frequencia_por_posicao(janela),
+        # Geração de bilhetes (gerar_combinacoes_inteligentes)
+        "geracao": lambda: gerar_lote(indices, loteria, BILHETES, semente=0),
+        # Ordenação da tabela de histórico
+        "historico": lambda: df.sort_values(by="concurso", ascending=False).head(CONCURSOS_HISTORICO),
+    }
+
+
+# Mede todos os caminhos de cada loteria em cada escala. Retorna uma lista de resultados com
+# loteria, escala, concursos, caminho, segundos, concursos por segundo e pico de memória (MB).
+def executar(loterias, escalas=ESCALAS, repeticoes=3, fixtures=None, somente=None):
+    resultados = []
+    for loteria in loterias:
+        base = registros_fixture(loteria, fixtures)
+        for escala in escalas:
+            registros = escalar(base, escala)
+            for nome, funcao in caminhos(loteria, registros).items():
+                if somente and nome not in somente:
+                    continue
+                segundos, pico = medir(funcao, repeticoes)
+                resultados.append({
+                    "loteria": loteria,
+                    "escala": escala,
+                    "concursos": len(registros),
+                    "caminho": nome,
+                    "segundos": segundos,
+                    "concursos_por_segundo": len(registros) / segundos if segundos else float("inf"),
+                    "pico_mb": pico,
+                })
+            del registros
+    return resultados
+
+
+# Tabela de resultados com a razão de tempo em relação à menor escala (curva de escala)
+def relatorio(resultados):
+    menores = {}
+    for r in resultados:
+        chave = (r["loteria"], r["caminho"])
+        if chave not in menores or r["escala"] < menores[chave]["escala"]:
+            menores[chave] = r
+    linhas = [f"{'loteria':<15}{'caminho':<14}{'escala':>7}{'concursos':>11}{'ms':>11}{'conc/s':>13}"
+              f"{'pico MB':>10}{'× tempo':>9}"]
+    for r in resultados:
+        base = menores[(r["loteria"], r["caminho"])]["segundos"]
+        linhas.append(
+            f"{r['loteria']:<15}{r['caminho']:<14}{r['escala']:>6}×{r['concursos']:>11}{r['segundos'] * 1000:>11.2f}"
+            f"{r['concursos_por_segundo']:>13.0f}{r['pico_mb']:>10.1f}{r['segundos'] / base if base else 1:>9.1f}"
+        )
+    return "\n".join(linhas)
+
+
+# Resultados mais lentos que a referência além da tolerância: lista de (resultado, segundos de referência)
+def regressoes(resultados, referencia, tolerancia):
+    anteriores = {(r["loteria"], r["escala"], r["caminho"]): r["segundos"] for r in referencia}
+    lentos = []
+    for r in resultados:
+        anterior = anteriores.get((r["loteria"], r["escala"], r["caminho"]))
+        if anterior is not None and r["segundos"] > anterior * tolerancia:
+            lentos.append((r, anterior))
+    return lentos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos quentes com históricos sintéticos.")
+    parser.add_argument("--loterias", nargs="+", default=list(CONCURSOS_ATUAIS), choices=list(CONCURSOS_ATUAIS))
+    parser.add_argument("--escalas", nargs="+", type=int, default=list(ESCALAS))
+    parser.add_argument("--caminhos", nargs="+", default=None, help="só estes caminhos")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--fixtures", default=None,
+                        help="diretório com as respostas gravadas da API (<loteria>.json.gz); "
+                             "as que faltarem são geradas e gravadas")
+    parser.add_argument("--json", default=None, help="grava os resultados neste arquivo")
+    parser.add_argument("--comparar", default=None, help="resultados de referência (gerados com --json)")
+    parser.add_argument("--tolerancia", type=float, default=1.25,
+                        help="razão máxima de tempo em relação à referência")
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.loterias, args.escalas, args.repeticoes, args.fixtures, args.caminhos)
+    print(relatorio(resultados))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=1)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            lentos = regressoes(resultados, json.load(arquivo), args.tolerancia)
+        for r, anterior in lentos:
+            print(f"REGRESSÃO {r['loteria']} {r['caminho']} {r['escala']}×: "
+                  f"{r['segundos'] * 1000:.2f} ms (referência {anterior * 1000:.2f} ms)", file=sys.stderr)
+        return 1 if lentos else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import gzip
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from loterias import COLUNAS_NUMEROS, ESPECIFICACOES, MESES
+
+# Concursos de cada loteria na época em que o benchmark foi escrito (escala 1×)
+CONCURSOS_ATUAIS = {
+    "megasena": 2900,
+    "maismilionaria": 250,
+    "lotofacil": 3400,
+    "quina": 6700,
+    "lotomania": 2750,
+    "timemania": 2250,
+    "duplasena": 2800,
+    "diadesorte": 1050,
+    "supersete": 700,
+}
+TIMES = ["FLAMENGO/RJ", "PALMEIRAS/SP", "CORINTHIANS/SP", "GREMIO/RS", "BAHIA/BA", "SPORT/PE", "PAYSANDU/PA"]
+# Valores possíveis dos campos de texto
+TEXTOS = {"time": TIMES, "mes": MESES}
+# Linhas sorteadas por vez ao montar as matrizes aleatórias
+LINHAS_POR_BLOCO = 50000
+
+
+# Matriz (concursos, k) de números distintos entre 1 e n, ordenados em cada linha
+def sortear_distintos(rng, concursos, n, k, numero_inicial=1):
+    blocos = []
+    for inicio in range(0, concursos, LINHAS_POR_BLOCO):
+        linhas = min(LINHAS_POR_BLOCO, concursos - inicio)
+        chaves = rng.random((linhas, n), dtype=np.float32)
+        blocos.append(np.sort(np.argpartition(chaves, k - 1, axis=1)[:, :k], axis=1) + numero_inicial)
+    return np.vstack(blocos) if blocos else np.zeros((0, k), dtype=np.int64)
+
+
+# Registros no formato da API para `concursos` concursos sintéticos da loteria
+def gerar_registros(loteria, concursos, semente=0):
+    especificacao = ESPECIFICACOES[loteria]
+    rng = np.random.default_rng(semente)
+    if especificacao.posicional:
+        dezenas = rng.integers(0, especificacao.max_num, (concursos, especificacao.qtd_nums))
+    else:
+        # A API manda dois dígitos: na Lotomania o 100 chega como "00", então o sorteio vai de 0 a 99
+        inicial = especificacao.numero_inicial
+        if especificacao.max_num + inicial - 1 > 99:
+            inicial = 0
+        dezenas = sortear_distintos(rng, concursos, especificacao.max_num, especificacao.qtd_nums, inicial)
+    extras = {}
+    for campo in especificacao.extras:
+        if campo in COLUNAS_NUMEROS:
+            max_num, _ = especificacao.faixa(campo)
+            quantidade = especificacao.qtd_trevos if campo == "trevos" else especificacao.qtd_nums
+            extras[campo] = sortear_distintos(rng, concursos, max_num, quantidade).tolist()
+        elif campo in TEXTOS:
+            extras[campo] = [TEXTOS[campo][i] for i in rng.integers(0, len(TEXTOS[campo]), concursos)]
+
+    inicio = date(1996, 3, 11)
+    registros = []
+    for linha, numeros in enumerate(dezenas.tolist()):
+        registro = {
+            "concurso": linha + 1,
+            "data": (inicio + timedelta(days=3 * linha)).strftime("%d/%m/%Y"),
+            "dezenas": [f"{n:02d}" for n in numeros],
+        }
+        for campo, valores in extras.items():
+            valor = valores[linha]
+            registro[campo] = [f"{n:02d}" for n in valor] if isinstance(valor, list) else valor
+        registros.append(registro)
+    return registros
+
+
+# Repete os registros até `fator` vezes o histórico, renumerando os concursos em sequência
+def escalar(registros, fator):
+    escalados = []
+    for repeticao in range(fator):
+        deslocamento = repeticao * len(registros)
+        escalados.extend({**r, "concurso": int(r["concurso"]) + deslocamento} for r in registros)
+    return escalados
+
+
+def caminho_fixture(diretorio, loteria):
+    return os.path.join(diretorio, f"{loteria}.json.gz")
+
+
+# Registros da resposta gravada da API (ou gerados e gravados, se ainda não houver) na escala 1×
+def registros_fixture(loteria, diretorio=None, semente=0):
+    if diretorio is None:
+        return gerar_registros(loteria, CONCURSOS_ATUAIS[loteria], semente)
+    caminho = caminho_fixture(diretorio, loteria)
+    if os.path.exists(caminho):
+        with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    registros = gerar_registros(loteria, CONCURSOS_ATUAIS[loteria], semente)
+    os.makedirs(diretorio, exist_ok=True)
+    with gzip.open(caminho, "wt", encoding="utf-8") as arquivo:
+        json.dump(registros, arquivo, ensure_ascii=False)
+    return registros
+
+
+# Corpo da resposta do histórico completo, em bytes, como chega da API
+def resposta_api(registros):
+    return json.dumps(registros, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,78 @@
+import argparse
+import re
+import subprocess
+import sys
+
+# Bibliotecas pesadas que os módulos de dados e a linha de comando não podem importar
+PROIBIDOS = ("streamlit", "plotly", "matplotlib", "seaborn")
+# Bibliotecas base, cujo tempo de import é descontado do orçamento de cada módulo
+BASE = ("numpy", "pandas", "pyarrow")
+# Tempo máximo de import de cada módulo, em milissegundos, com as bibliotecas base já importadas
+ORCAMENTOS_MS = {
+    "loterias": 5,
+    "mascaras": 10,
+    "matrizes": 20,
+    "estatisticas": 40,
+    "geracao": 40,
+    "compartilhado": 40,
+    "armazem": 150,
+    "carregador": 200,
+    "backtest": 20,
+    "restricoes": 20,
+    "espaco": 20,
+    "agregacao": 10,
+    "graficos": 20,
+    "cli": 200,
+    "espelho": 200,
+}
+_LINHA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+# Tempo (ms) de cada import de nível mais alto de `import <modulos>` num interpretador novo, pela
+# saída de python -X importtime, e o conjunto de pacotes importados. Como os módulos são importados
+# em ordem, o tempo de cada um não inclui o que os anteriores já carregaram.
+def medir_import(modulos):
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modulos)}"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    importados, tempos = set(), {}
+    for _, acumulado, recuo, nome in _LINHA.findall(saida):
+        importados.add(nome.split(".")[0])
+        # Linhas com um só espaço de recuo são imports de nível mais alto
+        if len(recuo) == 1:
+            tempos[nome] = int(acumulado) / 1000
+    return importados, tempos
+
+
+# Mede cada módulo depois das bibliotecas base, ficando com a menor de `repeticoes` medições para
+# reduzir o ruído da máquina. Retorna (tempo da base, lista de (módulo, ms, orçamento, proibidos)).
+def verificar(orcamentos=ORCAMENTOS_MS, repeticoes=3):
+    base = min(sum(medir_import(BASE)[1].get(nome, 0) for nome in BASE) for _ in range(repeticoes))
+    resultados = []
+    for modulo, orcamento in orcamentos.items():
+        medicoes = [medir_import(BASE + (modulo,)) for _ in range(repeticoes)]
+        proibidos = sorted(medicoes[0][0].intersection(PROIBIDOS))
+        tempo = min(tempos.get(modulo, 0) for _, tempos in medicoes)
+        resultados.append((modulo, tempo, orcamento, proibidos))
+    return base, resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica o tempo de import de cada módulo contra o orçamento.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base, resultados = verificar(repeticoes=args.repeticoes)
+    print(f"{'base (' + ', '.join(BASE) + ')':<32}{base:>9.1f} ms")
+    falhas = 0
+    for modulo, tempo, orcamento, proibidos in resultados:
+        ok = tempo <= orcamento and not proibidos
+        falhas += not ok
+        aviso = f"  importa {', '.join(proibidos)}" if proibidos else ""
+        print(f"{modulo:<32}{tempo:>9.1f} ms  (orçamento {orcamento} ms) {'ok' if ok else 'ESTOUROU'}{aviso}")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import json
+import os
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from instrumentacao import medido
+
+# Versão do formato gravado em disco; caches com outra versão são descartados
+VERSAO_ESQUEMA = 1
+DIRETORIO_CACHE = os.environ.get("LOTERIAS_CACHE_DIR", os.path.join(".cache", "loterias"))
+
+# Valor de preenchimento para sorteios com menos números que a largura da coluna
+VAZIO = 255
+
+
+def caminho_cache(loteria, diretorio=None):
+    return os.path.join(diretorio or DIRETORIO_CACHE, f"{loteria}.arrow")
+
+
+def nomes_colunas(coluna, largura):
+    return [f"{coluna}_{j + 1:02d}" for j in range(largura)]
+
+
+# Monta a matriz uint8 a partir dos valores concatenados e do tamanho de cada sorteio,
+# preenchendo sorteios incompletos com VAZIO
+def montar_matriz(valores, tamanhos):
+    tamanhos = np.asarray(tamanhos, dtype=np.int64)
+    largura = int(tamanhos.max()) if len(tamanhos) else 0
+    matriz = np.full((len(tamanhos), largura), VAZIO, dtype=np.uint8)
+    matriz[np.arange(largura) < tamanhos[:, None]] = valores
+    return matriz
+
+
+# Converte uma coluna de listas em matriz uint8
+def listas_para_matriz(listas):
+    tamanhos = np.fromiter(map(len, listas), dtype=np.int64, count=len(listas))
+    valores = np.fromiter(chain.from_iterable(listas), dtype=np.uint8, count=int(tamanhos.sum()))
+    return montar_matriz(valores, tamanhos)
+
+
+# Converte a matriz uint8 de volta em listas de inteiros, ignorando o preenchimento
+def matriz_para_listas(matriz):
+    listas = matriz.tolist()
+    incompletos = np.flatnonzero((matriz == VAZIO).any(axis=1))
+    for i in incompletos:
+        listas[i] = [n for n in listas[i] if n != VAZIO]
+    return listas
+
+
+def montar_metadados(tabela, colunas, larguras):
+    return {
+        "versao": VERSAO_ESQUEMA,
+        "colunas": list(colunas),
+        "larguras": dict(larguras),
+        "ultimo_concurso": int(tabela["concurso"].max()) if len(tabela) else 0,
+    }
+
+
+# Matriz uint8 (n_concursos, largura) de uma coluna de números da tabela colunar
+def matriz_coluna(tabela, metadados, coluna):
+    nomes = nomes_colunas(coluna, metadados["larguras"][coluna])
+    return np.ascontiguousarray(tabela[nomes].to_numpy(dtype=np.uint8)).reshape(len(tabela), len(nomes))
+
+
+# Reconstrói o DataFrame de sorteios, com listas de números, a partir da tabela colunar
+@medido("cache_disco.dataframe")
+def de_colunar(tabela, metadados):
+    df = pd.DataFrame(index=tabela.index)
+    for coluna in metadados["colunas"]:
+        if coluna in metadados["larguras"]:
+            df[coluna] = matriz_para_listas(matriz_coluna(tabela, metadados, coluna))
+        elif coluna == "premios":
+            df[coluna] = [json.loads(p) for p in tabela[coluna]]
+        else:
+            df[coluna] = tabela[coluna]
+    return df
+
+
+# Completa as colunas de números da tabela até as larguras indicadas
+def _alargar_tabela(tabela, metadados, larguras):
+    tabela = tabela.copy()
+    for coluna, largura in larguras.items():
+        for nome in nomes_colunas(coluna, largura)[metadados["larguras"].get(coluna, 0):]:
+            tabela[nome] = np.full(len(tabela), VAZIO, dtype=np.uint8)
+    return tabela
+
+
+def _ordem_colunas(colunas, larguras):
+    ordem = []
+    for coluna in colunas:
+        ordem += nomes_colunas(coluna, larguras[coluna]) if coluna in larguras else [coluna]
+    return ordem
+
+
+# Junta duas tabelas colunares; em concursos repetidos prevalece a segunda
+def juntar(tabela, metadados, novos, metadados_novos):
+    if metadados is None or len(tabela) == 0:
+        return novos, metadados_novos
+    if len(novos) == 0:
+        return tabela, metadados
+
+    larguras = dict(metadados["larguras"])
+    for coluna, largura in metadados_novos["larguras"].items():
+        larguras[coluna] = max(larguras.get(coluna, 0), largura)
+    colunas = metadados["colunas"] + [c for c in metadados_novos["colunas"] if c not in metadados["colunas"]]
+
+    df = pd.concat(
+        [_alargar_tabela(tabela, metadados, larguras), _alargar_tabela(novos, metadados_novos, larguras)],
+        ignore_index=True,
+    )
+    df = df.drop_duplicates(subset="concurso", keep="last").sort_values("concurso").reset_index(drop=True)
+    df = df[_ordem_colunas(colunas, larguras)]
+    return df, montar_metadados(df, colunas, larguras)
+
+
+# Tabela Arrow com os metadados no esquema, no formato gravado em disco
+def para_arrow(tabela, metadados):
+    tabela_arrow = pa.Table.from_pandas(tabela, preserve_index=False)
+    return tabela_arrow.replace_schema_metadata({"loterias": json.dumps(metadados)})
+
+
+def salvar(loteria, tabela, metadados, diretorio=None):
+    tabela_arrow = para_arrow(tabela, metadados)
+
+    caminho = caminho_cache(loteria, diretorio)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Grava em arquivo temporário e substitui, para nunca deixar um cache pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with pa.OSFile(temporario, "wb") as destino:
+        with pa.ipc.new_file(destino, tabela_arrow.schema) as escritor:
+            escritor.write_table(tabela_arrow)
+    os.replace(temporario, caminho)
+
+
+# Tabela colunar serializada como stream Arrow IPC, para envio pela rede
+def para_bytes(tabela, metadados):
+    tabela_arrow = para_arrow(tabela, metadados)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela_arrow.schema) as escritor:
+        escritor.write_table(tabela_arrow)
+    return destino.getvalue().to_pybytes()
+
+
+# Tabela colunar em pandas e seus metadados a partir de um stream Arrow IPC gerado por para_bytes
+def de_bytes(dados):
+    try:
+        tabela = pa.ipc.open_stream(pa.py_buffer(dados)).read_all()
+        metadados = json.loads(tabela.schema.metadata[b"loterias"])
+    except (KeyError, TypeError, pa.ArrowException) as e:
+        raise ValueError(f"Tabela compacta inválida: {e}") from e
+    if metadados.get("versao") != VERSAO_ESQUEMA:
+        raise ValueError(f"Tabela compacta na versão {metadados.get('versao')}, esperada {VERSAO_ESQUEMA}.")
+    return tabela.to_pandas(), metadados
+
+
+# Lê a tabela Arrow mapeada em memória; retorna None se o cache não existir ou for inválido
+def carregar_tabela(loteria, diretorio=None):
+    caminho = caminho_cache(loteria, diretorio)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with pa.memory_map(caminho, "r") as fonte:
+            tabela = pa.ipc.open_file(fonte).read_all()
+        metadados = json.loads(tabela.schema.metadata[b"loterias"])
+    except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+        return None
+
+    if metadados.get("versao") != VERSAO_ESQUEMA:
+        return None
+    # O último concurso registrado precisa corresponder aos dados gravados
+    if tabela.num_rows and int(pc.max(tabela.column("concurso")).as_py()) != metadados["ultimo_concurso"]:
+        return None
+    return tabela, metadados
+
+
+# Tabela colunar em pandas e seus metadados; (DataFrame vazio, None) se não houver cache válido
+@medido("cache_disco.carregar")
+def carregar(loteria, diretorio=None):
+    resultado = carregar_tabela(loteria, diretorio)
+    if resultado is None:
+        return pd.DataFrame(), None
+    tabela, metadados = resultado
+    return tabela.to_pandas(), metadados
+
+
+def remover(loteria, diretorio=None):
+    try:
+        os.remove(caminho_cache(loteria, diretorio))
+    except FileNotFoundError:
+        pass
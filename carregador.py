@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from armazem import API_COMPACTA, COMPARTILHADO_ATIVO, URL_API, ArmazemSorteios
+from loterias import LOTERIAS
+
+
+# Sessão HTTP com pool de conexões e novas tentativas com espera exponencial
+def criar_sessao(max_conexoes=10, tentativas=3, espera_base=0.5):
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=espera_base,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes, max_retries=retry)
+    sessao = requests.Session()
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+# Carregador que mantém todas as loterias sincronizadas em segundo plano
+class CarregadorLoterias:
+    def __init__(self, loterias=LOTERIAS, url_base=URL_API, max_paralelo=4, intervalo=3600,
+                 timeout=(5, 30), diretorio_cache=None, sessao=None, compacto=API_COMPACTA,
+                 compartilhado=COMPARTILHADO_ATIVO):
+        self.max_paralelo = max_paralelo
+        self.intervalo = intervalo
+        self.sessao = sessao or criar_sessao(max_conexoes=max_paralelo)
+        self.armazens = {
+            loteria: ArmazemSorteios(loteria, url_base, self.sessao, timeout, diretorio_cache, compacto, compartilhado)
+            for loteria in loterias
+        }
+        # Último erro de sincronização de cada loteria
+        self.erros = {}
+        self._parar = threading.Event()
+        self._thread = None
+
+    def armazem(self, loteria):
+        return self.armazens[loteria]
+
+    def _sincronizar(self, armazem):
+        novos = armazem.sincronizar()
+        # Já deixa matrizes e índices prontos para a troca de loteria ser instantânea
+        armazem.indices()
+        return novos
+
+    # Sincroniza todas as loterias em paralelo, com no máximo `max_paralelo` ao mesmo tempo
+    def aquecer(self):
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=self.max_paralelo, thread_name_prefix="carregador") as executor:
+            futuros = {
+                executor.submit(self._sincronizar, armazem): loteria
+                for loteria, armazem in self.armazens.items()
+            }
+            for futuro in as_completed(futuros):
+                loteria = futuros[futuro]
+                try:
+                    resultados[loteria] = futuro.result()
+                    self.erros.pop(loteria, None)
+                except Exception as e:
+                    self.erros[loteria] = e
+        return resultados
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self.aquecer()
+            self._parar.wait(self.intervalo)
+
+    # Inicia a sincronização periódica em uma thread de fundo
+    def iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="carregador-loterias", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self, timeout=None):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from armazem import URL_API, ArmazemSorteios
+from geracao import gerar_lote
+from loterias import ESPECIFICACOES, LOTERIAS, faixa_numeros
+
+# Bilhetes escritos por vez na saída
+LINHAS_POR_BLOCO = 65536
+FORMATOS_ESTATISTICAS = ("json", "csv", "parquet")
+FORMATOS_BILHETES = ("csv", "jsonl")
+
+
+# Armazém da loteria a partir do cache em disco, sincronizado com a API se `offline` for falso.
+# Falhas de rede não interrompem: seguem os dados já gravados, como no app.
+def abrir_armazem(loteria, url_base=URL_API, diretorio_cache=None, offline=False):
+    armazem = ArmazemSorteios(loteria, url_base, diretorio_cache=diretorio_cache)
+    if not offline:
+        try:
+            armazem.sincronizar()
+        except Exception as e:
+            print(f"{loteria}: falha ao sincronizar ({e}); usando o cache em disco", file=sys.stderr)
+    return armazem
+
+
+# Tabela por número (frequência, janela recente, quentes e frios e atrasos) e resumo da loteria
+def estatisticas_loteria(armazem, janela=100, meia_vida=20, top=10):
+    indices = armazem.indices()
+    if "dezenas" not in indices:
+        return None, None
+    indice = indices["dezenas"]
+    tabela = indice.tabela_atrasos()
+    tabela.insert(2, f"Últimos {janela}", indice.janelas.janela(min(janela, indice.total_concursos)))
+    tabela.insert(3, f"Quente (meia-vida {meia_vida})", indice.janelas.pontuacao(meia_vida).round(3))
+    resumo = {
+        "loteria": armazem.loteria,
+        "concursos": int(indice.total_concursos),
+        "ultimo_concurso": int(armazem.ultimo_concurso),
+        "mais_frequente": indice.mais_frequente(),
+        "pares": indice.coocorrencia.top_pares(top),
+        "trios": indice.coocorrencia.top_trios(top),
+    }
+    return tabela, resumo
+
+
+# Grava as estatísticas da loteria em `diretorio` e retorna os caminhos gravados
+def gravar_estatisticas(loteria, diretorio, formato, janela, meia_vida, url_base, diretorio_cache, offline):
+    armazem = abrir_armazem(loteria, url_base, diretorio_cache, offline)
+    tabela, resumo = estatisticas_loteria(armazem, janela, meia_vida)
+    if tabela is None:
+        return []
+
+    base = os.path.join(diretorio, loteria)
+    if formato == "json":
+        # Via to_json para os atrasos médios indefinidos (NaN) virarem null
+        resumo["numeros"] = json.loads(tabela.to_json(orient="records", force_ascii=False))
+        with open(f"{base}.json", "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, ensure_ascii=False)
+        return [f"{base}.json"]
+
+    with open(f"{base}_resumo.json", "w", encoding="utf-8") as arquivo:
+        json.dump(resumo, arquivo, ensure_ascii=False)
+    if formato == "csv":
+        tabela.to_csv(f"{base}_numeros.csv", index=False)
+    else:
+        tabela.to_parquet(f"{base}_numeros.parquet", index=False)
+    return [f"{base}_resumo.json", f"{base}_numeros.{formato}"]
+
+
+# Texto CSV de um bloco de bilhetes montado direto em bytes com NumPy: cada número ocupa a
+# largura fixa da sua coluna, com zeros à esquerda, como as dezenas da API ("04")
+def texto_csv(bloco, larguras):
+    partes = []
+    for coluna, largura in enumerate(larguras):
+        potencias = 10 ** np.arange(largura - 1, -1, -1)
+        partes.append((bloco[:, coluna, None] // potencias % 10 + ord("0")).astype(np.uint8))
+        partes.append(np.full((len(bloco), 1), ord(","), dtype=np.uint8))
+    partes[-1] = np.full((len(bloco), 1), ord("\n"), dtype=np.uint8)
+    return np.hstack(partes).tobytes()
+
+
+# Escreve os bilhetes em blocos, sem montar o texto de todos de uma vez
+def escrever_bilhetes(saida, loteria, dezenas, trevos=None, formato="csv"):
+    colunas = dezenas if trevos is None else np.hstack([dezenas, trevos])
+    if formato == "csv":
+        max_num, numero_inicial = faixa_numeros(loteria)
+        larguras = [len(str(max_num + numero_inicial - 1))] * dezenas.shape[1]
+        cabecalho = [f"d{i + 1}" for i in range(dezenas.shape[1])]
+        if trevos is not None:
+            larguras += [len(str(faixa_numeros(loteria, "trevos")[0]))] * trevos.shape[1]
+            cabecalho += [f"t{i + 1}" for i in range(trevos.shape[1])]
+        saida.write((",".join(cabecalho) + "\n").encode())
+    for inicio in range(0, len(colunas), LINHAS_POR_BLOCO):
+        bloco = colunas[inicio:inicio + LINHAS_POR_BLOCO]
+        if formato == "csv":
+            saida.write(texto_csv(bloco, larguras))
+            continue
+        linhas = []
+        for linha in bloco.tolist():
+            registro = {"dezenas": linha[:dezenas.shape[1]]}
+            if trevos is not None:
+                registro["trevos"] = linha[dezenas.shape[1]:]
+            linhas.append(json.dumps(registro))
+        saida.write(("\n".join(linhas) + "\n").encode())
+
+
+# Gera os bilhetes da loteria e grava em `caminho` (saída padrão se None; se for um diretório,
+# no arquivo da loteria dentro dele); retorna a quantidade
+def gravar_bilhetes(loteria, caminho, formato, quantidade, semente, url_base, diretorio_cache, offline):
+    if not ESPECIFICACOES[loteria].tem_dezenas:
+        return 0
+    if caminho is not None and os.path.isdir(caminho):
+        caminho = os.path.join(caminho, f"{loteria}.{formato}")
+    armazem = abrir_armazem(loteria, url_base, diretorio_cache, offline)
+    if armazem.vazio:
+        print(f"{loteria}: sem sorteios para gerar bilhetes", file=sys.stderr)
+        return 0
+    dezenas, trevos = gerar_lote(armazem.indices(), loteria, quantidade, semente=semente)
+    if caminho is None:
+        escrever_bilhetes(sys.stdout.buffer, loteria, dezenas, trevos, formato)
+        sys.stdout.buffer.flush()
+    else:
+        with open(caminho, "wb") as arquivo:
+            escrever_bilhetes(arquivo, loteria, dezenas, trevos, formato)
+    return len(dezenas)
+
+
+# Executa `funcao(loteria, *args)` para cada loteria, em paralelo entre processos se houver mais de uma
+def _executar(funcao, loterias, processos, *args):
+    if len(loterias) == 1 or processos == 1:
+        return {loteria: funcao(loteria, *args) for loteria in loterias}
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {loteria: executor.submit(funcao, loteria, *args) for loteria in loterias}
+        return {loteria: futuro.result() for loteria, futuro in futuros.items()}
+
+
+# Sincroniza a loteria e retorna o último concurso disponível
+def sincronizar_loteria(loteria, url_base, diretorio_cache, offline=False):
+    return abrir_armazem(loteria, url_base, diretorio_cache, offline).ultimo_concurso
+
+
+def _loterias(nome):
+    return [l for l in LOTERIAS if ESPECIFICACOES[l].tem_dezenas] if nome == "todas" else [nome]
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Análises e geração de bilhetes sem a interface web.")
+    parser.add_argument("--url-base", default=URL_API, help="URL base da API de resultados")
+    parser.add_argument("--cache", default=None, help="diretório do cache em disco dos sorteios")
+    parser.add_argument("--offline", action="store_true", help="usa só o cache em disco, sem acessar a API")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1,
+                        help="processos em paralelo quando há mais de uma loteria")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    sincronizar = subparsers.add_parser("sincronizar", help="atualiza o cache em disco")
+    sincronizar.add_argument("loteria", choices=LOTERIAS + ["todas"])
+
+    estatisticas = subparsers.add_parser("estatisticas", help="grava as estatísticas por número")
+    estatisticas.add_argument("loteria", choices=LOTERIAS + ["todas"])
+    estatisticas.add_argument("--formato", choices=FORMATOS_ESTATISTICAS, default="json")
+    estatisticas.add_argument("--saida", default=".", help="diretório de saída")
+    estatisticas.add_argument("--janela", type=int, default=100, help="concursos da janela recente")
+    estatisticas.add_argument("--meia-vida", type=int, default=20, help="meia-vida da pontuação quente/frio")
+
+    gerar = subparsers.add_parser("gerar", help="gera bilhetes com as estratégias do app")
+    gerar.add_argument("loteria", choices=LOTERIAS + ["todas"])
+    gerar.add_argument("--quantidade", type=int, default=5)
+    gerar.add_argument("--semente", type=int, default=None)
+    gerar.add_argument("--formato", choices=FORMATOS_BILHETES, default="csv")
+    gerar.add_argument("--saida", default=None,
+                       help="arquivo de saída (saída padrão se omitido); com 'todas', um diretório")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    loterias = _loterias(args.loteria)
+    fonte = (args.url_base, args.cache, args.offline)
+
+    if args.comando == "sincronizar":
+        for loteria, ultimo in _executar(sincronizar_loteria, loterias, args.processos, *fonte).items():
+            print(f"{loteria}: concurso {ultimo}", file=sys.stderr)
+        return 0
+
+    if args.comando == "estatisticas":
+        os.makedirs(args.saida, exist_ok=True)
+        gravados = _executar(
+            gravar_estatisticas, loterias, args.processos, args.saida, args.formato, args.janela,
+            args.meia_vida, *fonte
+        )
+        for caminhos in gravados.values():
+            for caminho in caminhos:
+                print(caminho, file=sys.stderr)
+        return 0
+
+    if len(loterias) > 1:
+        if args.saida is None:
+            raise SystemExit("Com 'todas', informe em --saida o diretório dos arquivos de bilhetes.")
+        os.makedirs(args.saida, exist_ok=True)
+    _executar(gravar_bilhetes, loterias, args.processos, args.saida, args.formato, args.quantidade, args.semente, *fonte)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from cache_disco import DIRETORIO_CACHE
+from estatisticas import IndiceEstatisticas
+from instrumentacao import contar, medir
+from matrizes import MatrizSorteios
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava, a publicação atômica ainda garante versões íntegras
+    fcntl = None
+
+# Versão do formato gravado em disco; versões de outro formato são ignoradas
+VERSAO_COMPARTILHADO = 1
+# Liga o cache compartilhado entre processos (ex.: várias réplicas do app na mesma máquina)
+ATIVO = os.environ.get("LOTERIAS_COMPARTILHADO", "") not in ("", "0")
+
+
+def diretorio_compartilhado(diretorio=None):
+    return os.path.join(diretorio or DIRETORIO_CACHE, "compartilhado")
+
+
+# Trava exclusiva entre processos sobre um arquivo, liberada ao sair do bloco
+class _Trava:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = None
+
+    def __enter__(self):
+        self.arquivo = open(self.caminho, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self.arquivo, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *excecao):
+        if fcntl is not None:
+            fcntl.flock(self.arquivo, fcntl.LOCK_UN)
+        self.arquivo.close()
+        return False
+
+
+# Matrizes e índices de estatísticas de cada loteria em arquivos .npy por (loteria, último concurso),
+# que os processos mapeiam em memória só para leitura: as páginas ficam uma vez no cache do sistema
+# e são compartilhadas por todos. Só um processo por vez calcula uma versão nova; os outros esperam
+# a trava e abrem o que ele gravou.
+class CacheCompartilhado:
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio_compartilhado(diretorio)
+
+    def _caminho_versao(self, loteria, ultimo_concurso):
+        return os.path.join(self.diretorio, f"{loteria}-{ultimo_concurso}")
+
+    # Abre a versão gravada; retorna None se ela não existir ou estiver em outro formato
+    def _abrir(self, caminho):
+        try:
+            with open(os.path.join(caminho, "metadados.json"), encoding="utf-8") as arquivo:
+                metadados = json.load(arquivo)
+            if metadados.get("versao") != VERSAO_COMPARTILHADO:
+                return None
+
+            def carregar(prefixo, nome):
+                return np.asarray(np.load(os.path.join(caminho, f"{prefixo}.{nome}.npy"), mmap_mode="r"))
+
+            matrizes, indices = {}, {}
+            for coluna, faixa in metadados["colunas"].items():
+                matriz = MatrizSorteios.de_arrays(
+                    {nome: carregar(coluna, nome) for nome in metadados["matriz"]},
+                    faixa["max_num"], faixa["numero_inicial"]
+                )
+                matrizes[coluna] = matriz
+                indices[coluna] = IndiceEstatisticas.de_arrays(
+                    {nome: carregar(f"{coluna}.indice", nome) for nome in metadados["indice"]}, matriz
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+        return matrizes, indices
+
+    # Grava a versão num diretório temporário e o renomeia para o nome definitivo, para que nenhum
+    # processo encontre uma versão pela metade
+    def _gravar(self, caminho, matrizes, indices):
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        metadados = {"versao": VERSAO_COMPARTILHADO, "colunas": {}, "matriz": [], "indice": []}
+        for coluna, matriz in matrizes.items():
+            metadados["colunas"][coluna] = {"max_num": matriz.max_num, "numero_inicial": matriz.numero_inicial}
+            for prefixo, arrays, chave in (
+                (coluna, matriz.arrays(), "matriz"), (f"{coluna}.indice", indices[coluna].arrays(), "indice")
+            ):
+                for nome, array in arrays.items():
+                    np.save(os.path.join(temporario, f"{prefixo}.{nome}.npy"), np.ascontiguousarray(array))
+                metadados[chave] = list(arrays)
+        with open(os.path.join(temporario, "metadados.json"), "w", encoding="utf-8") as arquivo:
+            json.dump(metadados, arquivo)
+        try:
+            os.rename(temporario, caminho)
+        except OSError:
+            # Outro processo (sem trava disponível) publicou a mesma versão antes
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    # Remove as versões antigas da loteria. Processos que ainda as têm mapeadas continuam lendo
+    # normalmente até trocarem de versão (no Windows a remoção falha e fica para a próxima vez).
+    def _remover_antigas(self, loteria, atual):
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith(f"{loteria}-") and nome != os.path.basename(atual) and not nome.endswith(".tmp"):
+                shutil.rmtree(os.path.join(self.diretorio, nome), ignore_errors=True)
+
+    # (matrizes, índices) da loteria no último concurso indicado: abre a versão compartilhada ou,
+    # se ainda não houver, calcula com `construir()` (que retorna o mesmo par), grava e abre
+    def obter(self, loteria, ultimo_concurso, construir):
+        caminho = self._caminho_versao(loteria, ultimo_concurso)
+        aberto = self._abrir(caminho)
+        if aberto is not None:
+            contar("compartilhado", "acerto")
+            return aberto
+
+        contar("compartilhado", "falha")
+        calculado = None
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            with _Trava(os.path.join(self.diretorio, f"{loteria}.lock")):
+                # Quem esperava a trava encontra a versão que o processo anterior acabou de gravar
+                aberto = self._abrir(caminho)
+                if aberto is not None:
+                    return aberto
+                calculado = construir()
+                with medir("compartilhado.gravar"):
+                    self._gravar(caminho, *calculado)
+                self._remover_antigas(loteria, caminho)
+        except OSError:
+            # Sem permissão de escrita, cada processo fica com a sua cópia
+            return calculado or construir()
+        return self._abrir(caminho) or calculado
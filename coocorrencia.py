@@ -0,0 +1,101 @@
+from itertools import combinations
+
+import numpy as np
+
+# Quantidade de concursos processados por vez ao contar trios, para limitar a memória temporária
+TAMANHO_BLOCO = 256
+
+
+# Índices dos k maiores valores, em ordem decrescente
+def _maiores(valores, k):
+    k = min(k, len(valores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    melhores = np.argpartition(-valores, k - 1)[:k]
+    return melhores[np.argsort(-valores[melhores], kind="stable")]
+
+
+# Motor de coocorrência: pares em matriz densa e trios compactados pelo sistema combinatório
+class MotorCoocorrencia:
+    def __init__(self, max_num, numero_inicial=1, com_trios=True):
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+        self.pares = np.zeros((max_num, max_num), dtype=np.int64)
+
+        # C(x, 2) e C(x, 3) para x de 0 a max_num: o trio a < b < c ocupa a posição a + C(b, 2) + C(c, 3)
+        x = np.arange(max_num + 1, dtype=np.int64)
+        self._c2 = x * (x - 1) // 2
+        self._c3 = x * (x - 1) * (x - 2) // 6
+        self.trios = np.zeros(int(self._c3[-1]), dtype=np.int64) if com_trios else None
+
+        self._triangulo = np.triu_indices(max_num, 1)
+        self._posicoes_trios = {}
+
+    @property
+    def numeros(self):
+        return np.arange(self.max_num) + self.numero_inicial
+
+    # Incorpora os concursos da matriz a partir da linha `inicio`
+    def atualizar(self, matriz, inicio=0):
+        bloco = matriz.incidencia[inicio:].astype(np.float64)
+        # Produto da incidência via BLAS; float64 é exato para essas contagens. As contagens ficam
+        # em arrays novas, sem alterar as que outro índice compartilhe
+        self.pares = self.pares + (bloco.T @ bloco).astype(np.int64)
+        if self.trios is not None:
+            self._atualizar_trios(matriz.indices[inicio:], matriz.validos[inicio:])
+
+    def _atualizar_trios(self, indices, validos):
+        largura = indices.shape[1]
+        if largura < 3 or len(indices) == 0:
+            return
+        if largura not in self._posicoes_trios:
+            self._posicoes_trios[largura] = np.array(list(combinations(range(largura), 3)), dtype=np.int64)
+        posicoes = self._posicoes_trios[largura]
+
+        # Ordena cada sorteio; posições vazias recebem max_num e vão para o fim
+        ordenados = np.sort(np.where(validos, indices, self.max_num), axis=1)
+        self.trios = self.trios.copy()
+        for inicio in range(0, len(ordenados), TAMANHO_BLOCO):
+            trios = ordenados[inicio:inicio + TAMANHO_BLOCO][:, posicoes]
+            a, b, c = trios[..., 0], trios[..., 1], trios[..., 2]
+            # Descarta trios com posição vazia ou número repetido (ex.: dígitos do Super Sete)
+            validos_trio = (a < b) & (b < c) & (c < self.max_num)
+            posicao = a[validos_trio] + self._c2[b[validos_trio]] + self._c3[c[validos_trio]]
+            self.trios += np.bincount(posicao, minlength=len(self.trios))
+
+    # Converte posições compactadas de volta em trios (a, b, c) de índices
+    def _decodificar_trios(self, posicoes):
+        c = np.searchsorted(self._c3, posicoes, side="right") - 1
+        resto = posicoes - self._c3[c]
+        b = np.searchsorted(self._c2, resto, side="right") - 1
+        a = resto - self._c2[b]
+        return a, b, c
+
+    # Os k pares que mais saíram juntos: lista de (número, número, concursos)
+    def top_pares(self, k=10):
+        linhas, colunas = self._triangulo
+        valores = self.pares[linhas, colunas]
+        melhores = _maiores(valores, k)
+        numeros = self.numeros
+        return [(int(numeros[linhas[i]]), int(numeros[colunas[i]]), int(valores[i])) for i in melhores]
+
+    # Os k trios que mais saíram juntos: lista de (número, número, número, concursos)
+    def top_trios(self, k=10):
+        if self.trios is None:
+            return []
+        melhores = _maiores(self.trios, k)
+        a, b, c = self._decodificar_trios(melhores)
+        numeros = self.numeros
+        return [
+            (int(numeros[x]), int(numeros[y]), int(numeros[z]), int(self.trios[i]))
+            for x, y, z, i in zip(a, b, c, melhores)
+        ]
+
+    # Os k números que mais saíram junto com `numero`: lista de (número, concursos)
+    def parceiros(self, numero, k=10):
+        indice = (numero - self.numero_inicial) % self.max_num
+        valores = self.pares[indice].copy()
+        valores[indice] = -1
+        melhores = _maiores(valores, k)
+        numeros = self.numeros
+        return [(int(numeros[i]), int(valores[i])) for i in melhores]
@@ -0,0 +1,240 @@
+import json
+import os
+from math import comb
+
+import numpy as np
+
+from cache_disco import DIRETORIO_CACHE, VAZIO
+from loterias import ESPECIFICACOES
+
+# Versão do formato gravado em disco; espaços com outra versão são reconstruídos
+VERSAO_ESPACO = 1
+# Loterias pequenas o bastante para materializar todas as combinações (até alguns milhões)
+LOTERIAS_ENUMERAVEIS = ("lotofacil", "diadesorte", "supersete")
+# Combinações processadas por bloco ao calcular os acertos com o histórico
+TAMANHO_BLOCO = 4096
+# Atributos de cada combinação gravados em disco, com seus tipos
+ATRIBUTOS = {"soma": np.uint16, "pares": np.uint8, "max_por_dezena": np.uint8, "max_acertos": np.uint8}
+
+
+def diretorio_espaco(loteria, diretorio=None):
+    return os.path.join(diretorio or DIRETORIO_CACHE, "espacos", loteria)
+
+
+# Máscaras de bits de todas as combinações de k entre n números, em ordem colexicográfica
+# (ordem crescente das máscaras). A posição de cada combinação é o seu índice no sistema combinatório.
+def mascaras_colex(n, k):
+    tipo = np.uint32 if n <= 32 else np.uint64
+    # anteriores[m]: combinações de j - 1 números entre os m primeiros
+    anteriores = [np.zeros(1, dtype=tipo) for _ in range(n + 1)]
+    for j in range(1, k + 1):
+        atuais = [np.zeros(0, dtype=tipo)]
+        for m in range(1, n + 1):
+            atuais.append(np.concatenate([atuais[m - 1], anteriores[m - 1] | tipo(1 << (m - 1))]))
+        anteriores = atuais
+    return anteriores[n]
+
+
+# Espaço completo de combinações de uma loteria, com atributos por combinação em arquivos .npy
+# mapeados em memória. Nas loterias posicionais (Super Sete) a combinação de índice i tem como
+# colunas os dígitos de i, e não há máscaras nem dezenas.
+class EspacoCombinacoes:
+    def __init__(self, loteria, diretorio=None):
+        especificacao = ESPECIFICACOES[loteria]
+        self.loteria = loteria
+        self.diretorio = diretorio_espaco(loteria, diretorio)
+        self.qtd_nums = especificacao.qtd_nums
+        self.max_num = especificacao.max_num
+        self.numero_inicial = especificacao.numero_inicial
+        self.posicional = especificacao.posicional
+        self.metadados = None
+        self.mascaras = None
+        self.atributos = {}
+
+        # Valor do número representado por cada bit das combinações e dos sorteios
+        if self.posicional:
+            self.total = self.max_num ** self.qtd_nums
+            self.valores_bits = np.tile(np.arange(self.max_num) + self.numero_inicial, self.qtd_nums)
+        else:
+            self.total = comb(self.max_num, self.qtd_nums)
+            self.valores_bits = np.arange(self.max_num) + self.numero_inicial
+
+    def __len__(self):
+        return self.total
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, f"{nome}.npy")
+
+    # Abre o espaço gravado em disco; retorna False se não existir ou estiver em outra versão
+    def carregar(self):
+        try:
+            with open(os.path.join(self.diretorio, "metadados.json"), encoding="utf-8") as arquivo:
+                metadados = json.load(arquivo)
+            if metadados.get("versao") != VERSAO_ESPACO:
+                return False
+            self.atributos = {nome: np.load(self._caminho(nome), mmap_mode="r") for nome in self._nomes_atributos()}
+            self.mascaras = None if self.posicional else np.load(self._caminho("mascaras"), mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+        self.metadados = metadados
+        return True
+
+    def _nomes_atributos(self):
+        return [nome for nome in ATRIBUTOS if not (self.posicional and nome == "max_por_dezena")]
+
+    # Matriz booleana (combinações, bits) das combinações de índice [inicio, fim)
+    def _marcados(self, inicio, fim):
+        if self.posicional:
+            pesos = self.max_num ** np.arange(self.qtd_nums - 1, -1, -1)
+            digitos = (np.arange(inicio, fim)[:, None] // pesos) % self.max_num
+            marcados = np.zeros((fim - inicio, len(self.valores_bits)), dtype=bool)
+            marcados[np.arange(fim - inicio)[:, None], digitos + np.arange(self.qtd_nums) * self.max_num] = True
+            return marcados
+        bits = np.arange(self.max_num, dtype=self.mascaras.dtype)
+        return ((self.mascaras[inicio:fim, None] >> bits) & 1).astype(bool)
+
+    # Matriz booleana (concursos, bits) dos sorteios, no mesmo formato de _marcados
+    def _marcados_sorteios(self, matriz):
+        if not self.posicional:
+            return matriz.incidencia
+        dezenas = matriz.dezenas[:, :self.qtd_nums]
+        validos = dezenas != VAZIO
+        marcados = np.zeros((len(dezenas), len(self.valores_bits)), dtype=bool)
+        linhas, colunas = np.nonzero(validos)
+        marcados[linhas, colunas * self.max_num + dezenas[validos].astype(np.int64) - self.numero_inicial] = True
+        return marcados
+
+    # Maior quantidade de acertos de cada combinação de [inicio, fim) com os sorteios (produto via BLAS)
+    def _max_acertos(self, inicio, fim, sorteios):
+        if sorteios.shape[1] == 0:
+            return np.zeros(fim - inicio, dtype=np.uint8)
+        return (self._marcados(inicio, fim).astype(np.float32) @ sorteios).max(axis=1).astype(np.uint8)
+
+    # Materializa todas as combinações e seus atributos em disco, em blocos
+    def construir(self, matriz=None):
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.atributos = {}
+        temporarios = {}
+
+        def criar(nome, tipo):
+            temporarios[nome] = os.path.join(self.diretorio, f"{nome}.{os.getpid()}.tmp.npy")
+            return np.lib.format.open_memmap(temporarios[nome], mode="w+", dtype=tipo, shape=(self.total,))
+
+        if not self.posicional:
+            mascaras = mascaras_colex(self.max_num, self.qtd_nums)
+            self.mascaras = criar("mascaras", mascaras.dtype)
+            self.mascaras[:] = mascaras
+            del mascaras
+        atributos = {nome: criar(nome, ATRIBUTOS[nome]) for nome in self._nomes_atributos()}
+
+        pares = (self.valores_bits % 2 == 0).astype(np.float32)
+        dezenas = self.valores_bits // 10
+        por_dezena = (dezenas[:, None] == np.arange(dezenas.max() + 1)).astype(np.float32)
+        sorteios = self._marcados_sorteios(matriz).T.astype(np.float32) if matriz is not None else np.zeros((0, 0))
+        for inicio in range(0, self.total, TAMANHO_BLOCO):
+            fim = min(inicio + TAMANHO_BLOCO, self.total)
+            marcados = self._marcados(inicio, fim).astype(np.float32)
+            atributos["soma"][inicio:fim] = marcados @ self.valores_bits.astype(np.float32)
+            atributos["pares"][inicio:fim] = marcados @ pares
+            if "max_por_dezena" in atributos:
+                atributos["max_por_dezena"][inicio:fim] = (marcados @ por_dezena).max(axis=1)
+            atributos["max_acertos"][inicio:fim] = self._max_acertos(inicio, fim, sorteios)
+
+        # Fecha os mapas temporários antes de movê-los para os nomes definitivos
+        for array in atributos.values():
+            array.flush()
+        if self.mascaras is not None:
+            self.mascaras.flush()
+        atributos.clear()
+        self.mascaras = None
+        for nome, temporario in temporarios.items():
+            os.replace(temporario, self._caminho(nome))
+
+        self._gravar_metadados(matriz)
+        self.carregar()
+        return self
+
+    def _gravar_metadados(self, matriz):
+        metadados = {
+            "versao": VERSAO_ESPACO,
+            "loteria": self.loteria,
+            "linhas": len(matriz) if matriz is not None else 0,
+            "ultimo_concurso": int(matriz.concursos[-1]) if matriz is not None and len(matriz) else 0,
+        }
+        caminho = os.path.join(self.diretorio, "metadados.json")
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(metadados, arquivo)
+        os.replace(temporario, caminho)
+        self.metadados = metadados
+
+    # Incorpora ao máximo de acertos só os concursos da matriz ainda não processados.
+    # Se o histórico gravado não corresponder ao da matriz, reconstrói tudo.
+    def atualizar(self, matriz):
+        linhas = self.metadados["linhas"]
+        if linhas > len(matriz) or (linhas and int(matriz.concursos[linhas - 1]) != self.metadados["ultimo_concurso"]):
+            return self.construir(matriz)
+        if linhas == len(matriz):
+            return self
+
+        sorteios = self._marcados_sorteios(matriz.fatia(linhas)).T.astype(np.float32)
+        self.atributos.clear()
+        max_acertos = np.load(self._caminho("max_acertos"), mmap_mode="r+")
+        for inicio in range(0, self.total, TAMANHO_BLOCO):
+            fim = min(inicio + TAMANHO_BLOCO, self.total)
+            np.maximum(max_acertos[inicio:fim], self._max_acertos(inicio, fim, sorteios), out=max_acertos[inicio:fim])
+        max_acertos.flush()
+        del max_acertos
+
+        self._gravar_metadados(matriz)
+        self.carregar()
+        return self
+
+    # Espaço pronto para consultas: abre do disco (construindo se preciso) e aplica os concursos novos
+    @classmethod
+    def abrir(cls, loteria, matriz=None, diretorio=None):
+        espaco = cls(loteria, diretorio)
+        if not espaco.carregar():
+            return espaco.construir(matriz)
+        if matriz is not None:
+            espaco.atualizar(matriz)
+        return espaco
+
+    # Máscara booleana das combinações com cada atributo dentro da faixa (mínimo, máximo) indicada
+    def filtrar(self, **faixas):
+        selecionadas = np.ones(self.total, dtype=bool)
+        for nome, (minimo, maximo) in faixas.items():
+            valores = self.atributos[nome]
+            selecionadas &= (valores >= minimo) & (valores <= maximo)
+        return selecionadas
+
+    # Quantas combinações têm todos os atributos dentro das faixas indicadas
+    def contar(self, **faixas):
+        return int(np.count_nonzero(self.filtrar(**faixas)))
+
+    # Índice da combinação no espaço (ordem colexicográfica; no Super Sete, os dígitos como número).
+    # A combinação precisa ter qtd_nums números da faixa da loteria, distintos fora do Super Sete.
+    def indice(self, numeros):
+        posicoes = [int(n) - self.numero_inicial for n in numeros]
+        if len(posicoes) != self.qtd_nums:
+            raise ValueError(f"A combinação precisa ter {self.qtd_nums} números.")
+        fora = [n for n, p in zip(numeros, posicoes) if not 0 <= p < self.max_num]
+        if fora:
+            raise ValueError(f"Números fora da faixa da loteria: {fora}.")
+        if self.posicional:
+            return int("".join(str(p) for p in posicoes))
+        if len(set(posicoes)) != len(posicoes):
+            raise ValueError("A combinação não pode ter números repetidos.")
+        return sum(comb(c, i + 1) for i, c in enumerate(sorted(posicoes)))
+
+    # Números da combinação de índice `indice`
+    def combinacao(self, indice):
+        if self.posicional:
+            digitos = str(int(indice)).zfill(self.qtd_nums)
+            return [int(d) + self.numero_inicial for d in digitos]
+        mascara = int(self.mascaras[indice])
+        return [int(self.valores_bits[b]) for b in range(self.max_num) if mascara >> b & 1]
+
+    # Se a combinação exata já saiu em algum concurso
+    def ja_sorteada(self, numeros):
+        return int(self.atributos["max_acertos"][self.indice(numeros)]) == self.qtd_nums
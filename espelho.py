@@ -0,0 +1,202 @@
+import argparse
+import gzip
+import json
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import cache_disco
+from armazem import URL_API
+from carregador import CarregadorLoterias
+from loterias import LOTERIAS
+
+# Corpos menores que isto não são comprimidos
+MIN_GZIP = 1024
+_ROTA = re.compile(r"^/api/(?P<loteria>[a-z]+)(?:/(?P<recurso>latest|compacto|\d+))?/?$")
+
+
+# Registros no formato da API a partir da tabela colunar (só os campos que o app usa)
+def registros_api(tabela, metadados):
+    df = cache_disco.de_colunar(tabela, metadados)
+    if "data" in df.columns:
+        df["data"] = df["data"].dt.strftime("%d/%m/%Y")
+    for coluna in metadados["larguras"]:
+        df[coluna] = [[f"{n:02d}" for n in numeros] for numeros in df[coluna]]
+    registros = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    for registro in registros:
+        registro["concurso"] = int(registro["concurso"])
+    return registros
+
+
+# Corpo pronto para envio, com a versão comprimida calculada uma vez
+class Resposta:
+    __slots__ = ("corpo", "corpo_gzip", "tipo")
+
+    def __init__(self, corpo, tipo):
+        self.corpo = corpo
+        self.tipo = tipo
+        self.corpo_gzip = gzip.compress(corpo, compresslevel=6, mtime=0) if len(corpo) >= MIN_GZIP else None
+
+
+# Espelho da API: mantém as loterias sincronizadas com a API pública e serve as respostas já
+# montadas, em cache por versão (último concurso) de cada loteria
+class EspelhoApi:
+    def __init__(self, carregador):
+        self.carregador = carregador
+        self._lock = threading.Lock()
+        # loteria -> (último concurso, instante em que essa versão foi vista)
+        self._versoes = {}
+        # (loteria, recurso) -> (último concurso, Resposta), só das respostas grandes
+        self._respostas = {}
+
+    # Último concurso da loteria e instante (epoch) da última mudança, para ETag e Last-Modified
+    def versao(self, loteria):
+        ultimo = self.carregador.armazem(loteria).ultimo_concurso
+        with self._lock:
+            anterior = self._versoes.get(loteria)
+            if anterior is None or anterior[0] != ultimo:
+                self._versoes[loteria] = anterior = (ultimo, time.time())
+        return anterior
+
+    def _json(self, dados):
+        return Resposta(json.dumps(dados, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    # Resposta do recurso: None (histórico completo), "latest", "compacto" ou o número do concurso.
+    # Retorna None se o concurso não existir.
+    def resposta(self, loteria, recurso=None, desde=0):
+        ultimo, _ = self.versao(loteria)
+        grande = recurso is None or (recurso == "compacto" and desde == 0)
+        if grande:
+            with self._lock:
+                guardada = self._respostas.get((loteria, recurso))
+            if guardada is not None and guardada[0] == ultimo:
+                return guardada[1]
+
+        tabela, metadados = self.carregador.armazem(loteria).tabela_colunar()
+        if metadados is None:
+            return self._json([]) if recurso is None else None
+        if recurso == "compacto":
+            selecionados = tabela[tabela["concurso"] > desde].reset_index(drop=True)
+            metadados_sel = cache_disco.montar_metadados(selecionados, metadados["colunas"], metadados["larguras"])
+            resposta = Resposta(cache_disco.para_bytes(selecionados, metadados_sel), "application/vnd.apache.arrow.stream")
+        elif recurso is None:
+            resposta = self._json(registros_api(tabela, metadados))
+        else:
+            concurso = ultimo if recurso == "latest" else int(recurso)
+            linha = tabela[tabela["concurso"] == concurso]
+            if len(linha) == 0:
+                return None
+            resposta = self._json(registros_api(linha.reset_index(drop=True), metadados)[0])
+
+        if grande:
+            with self._lock:
+                self._respostas[(loteria, recurso)] = (ultimo, resposta)
+        return resposta
+
+
+def criar_manipulador(espelho):
+    class ManipuladorEspelho(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            rota = _ROTA.match(url.path)
+            if rota is None or rota["loteria"] not in LOTERIAS:
+                self._vazio(404)
+                return
+            loteria, recurso = rota["loteria"], rota["recurso"]
+            try:
+                desde = int(parse_qs(url.query).get("desde", ["0"])[0])
+            except ValueError:
+                self._vazio(400)
+                return
+
+            ultimo, modificado = espelho.versao(loteria)
+            etag = f'W/"{loteria}-{ultimo}"'
+            if self._nao_modificado(etag, modificado):
+                self._vazio(304, etag, modificado)
+                return
+            resposta = espelho.resposta(loteria, recurso, desde)
+            if resposta is None:
+                self._vazio(404)
+                return
+
+            comprimir = resposta.corpo_gzip is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+            corpo = resposta.corpo_gzip if comprimir else resposta.corpo
+            self.send_response(200)
+            self.send_header("Content-Type", resposta.tipo)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.send_header("Vary", "Accept-Encoding")
+            self._cabecalhos_versao(etag, modificado)
+            if comprimir:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        # If-None-Match tem precedência; If-Modified-Since só vale sem ele (RFC 9110)
+        def _nao_modificado(self, etag, modificado):
+            etags = self.headers.get("If-None-Match")
+            if etags is not None:
+                return etags.strip() == "*" or etag in [e.strip() for e in etags.split(",")]
+            desde = self.headers.get("If-Modified-Since")
+            if desde is None:
+                return False
+            try:
+                return parsedate_to_datetime(desde).timestamp() >= int(modificado)
+            except (TypeError, ValueError):
+                return False
+
+        def _cabecalhos_versao(self, etag, modificado):
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(modificado, usegmt=True))
+            self.send_header("Cache-Control", "no-cache")
+
+        def _vazio(self, status, etag=None, modificado=None):
+            self.send_response(status)
+            if etag is not None:
+                self._cabecalhos_versao(etag, modificado)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    return ManipuladorEspelho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Espelho local da API de resultados, compartilhado pelas instâncias do app "
+                    "(aponte LOTERIAS_API_URL para http://<endereço>:<porta>/api)."
+    )
+    parser.add_argument("--endereco", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--origem", default=URL_API, help="URL base da API pública")
+    parser.add_argument("--intervalo", type=int, default=900, help="segundos entre sincronizações")
+    parser.add_argument("--cache", default=None, help="diretório do cache em disco dos sorteios")
+    args = parser.parse_args(argv)
+
+    # O espelho sempre fala JSON com a API pública, mesmo que o ambiente peça o modo compacto
+    carregador = CarregadorLoterias(
+        url_base=args.origem, intervalo=args.intervalo, diretorio_cache=args.cache, compacto=False
+    )
+    # Até a primeira sincronização terminar, serve o que já estiver no cache em disco
+    carregador.iniciar()
+
+    servidor = ThreadingHTTPServer((args.endereco, args.porta), criar_manipulador(EspelhoApi(carregador)))
+    print(f"Espelho em http://{args.endereco}:{args.porta}/api", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        carregador.parar(timeout=5)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
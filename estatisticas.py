@@ -0,0 +1,154 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from atrasos import MotorAtrasos
+from coocorrencia import MotorCoocorrencia
+from instrumentacao import medido
+from janelas import FrequenciasJanela
+
+
+# Índice de estatísticas de uma coluna de números, atualizado a cada concurso novo
+class IndiceEstatisticas:
+    def __init__(self, max_num, numero_inicial=1, num_posicoes=0):
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+        self.total_concursos = 0
+        self.concursos_por_linha = np.zeros(0, dtype=np.int64)
+
+        self.frequencias = np.zeros(max_num, dtype=np.int64)
+        self.posicoes = np.zeros((max_num, num_posicoes), dtype=np.int64)
+        # Atrasos entre aparições de cada número
+        self.atrasos = MotorAtrasos(max_num, numero_inicial)
+        # Coocorrência de pares e trios de números
+        self.coocorrencia = MotorCoocorrencia(max_num, numero_inicial)
+        # Frequências em janelas recentes e com decaimento exponencial
+        self.janelas = FrequenciasJanela(max_num, numero_inicial)
+
+    @classmethod
+    def de_matriz(cls, matriz):
+        indice = cls(matriz.max_num, matriz.numero_inicial, matriz.dezenas.shape[1])
+        indice.atualizar(matriz)
+        return indice
+
+    # Índice a partir das arrays de `arrays()` e da matriz de onde elas vieram, sem recalcular nada.
+    # Com arrays só de leitura (mapeadas de arquivo), o índice não pode ser atualizado.
+    @classmethod
+    def de_arrays(cls, arrays, matriz):
+        indice = cls(matriz.max_num, matriz.numero_inicial)
+        indice.frequencias = arrays["frequencias"]
+        indice.posicoes = arrays["posicoes"]
+        indice.atrasos.ultima_linha = arrays["ultima_linha"]
+        indice.atrasos.histograma = arrays["histograma"]
+        indice.coocorrencia.pares = arrays["pares"]
+        indice.coocorrencia.trios = arrays["trios"]
+        indice.janelas.acumulado = arrays["acumulado"]
+        indice.total_concursos = indice.atrasos.total_concursos = len(matriz)
+        indice.concursos_por_linha = matriz.concursos
+        return indice
+
+    # Arrays com todo o estado do índice, para gravar e reabrir com `de_arrays`
+    def arrays(self):
+        return {
+            "frequencias": self.frequencias,
+            "posicoes": self.posicoes,
+            "ultima_linha": self.atrasos.ultima_linha,
+            "histograma": self.atrasos.histograma,
+            "pares": self.coocorrencia.pares,
+            "trios": self.coocorrencia.trios,
+            "acumulado": self.janelas.acumulado,
+        }
+
+    # Incorpora os concursos da matriz a partir da linha `inicio` (as anteriores já estão no índice)
+    @medido("estatisticas.atualizar")
+    def atualizar(self, matriz, inicio=None):
+        inicio = self.total_concursos if inicio is None else inicio
+        if inicio >= len(matriz):
+            return
+
+        validos = matriz.validos[inicio:]
+        indices = matriz.indices[inicio:]
+        num_posicoes = matriz.dezenas.shape[1]
+
+        # Frequências e contagem por posição (arrays novas, sem alterar as que outro índice compartilhe)
+        self.frequencias = self.frequencias + np.bincount(indices[validos], minlength=self.max_num)
+        posicoes_atuais = self.posicoes
+        if num_posicoes > posicoes_atuais.shape[1]:
+            extra = np.zeros((self.max_num, num_posicoes - posicoes_atuais.shape[1]), dtype=np.int64)
+            posicoes_atuais = np.hstack([posicoes_atuais, extra])
+        posicoes = np.nonzero(validos)[1]
+        chaves = indices[validos] * posicoes_atuais.shape[1] + posicoes
+        self.posicoes = posicoes_atuais + np.bincount(chaves, minlength=posicoes_atuais.size).reshape(posicoes_atuais.shape)
+
+        self.atrasos.atualizar(matriz, inicio)
+        self.coocorrencia.atualizar(matriz, inicio)
+        self.janelas.atualizar(matriz, inicio)
+
+        self.total_concursos = len(matriz)
+        self.concursos_por_linha = matriz.concursos
+
+    # Novo índice com os concursos da matriz a partir da linha `inicio`, sem alterar este, que pode
+    # estar sendo lido por outras threads enquanto o carregador atualiza a loteria
+    def estendido(self, matriz, inicio=None):
+        novo = copy.copy(self)
+        novo.atrasos = copy.copy(self.atrasos)
+        novo.coocorrencia = copy.copy(self.coocorrencia)
+        novo.janelas = self.janelas.copia()
+        novo.atualizar(matriz, inicio)
+        return novo
+
+    # Linha em que cada número saiu pela última vez; -1 se nunca saiu
+    @property
+    def ultima_linha(self):
+        return self.atrasos.ultima_linha
+
+    # histograma_atrasos[n, g]: quantas vezes o número n ficou g concursos sem sair entre duas aparições
+    @property
+    def histograma_atrasos(self):
+        return self.atrasos.histograma
+
+    # Contagem de concursos em que cada par de números saiu junto (diagonal = frequência por concurso)
+    @property
+    def pares(self):
+        return self.coocorrencia.pares
+
+    # Números possíveis, na mesma ordem dos vetores do índice
+    @property
+    def numeros(self):
+        return np.arange(self.max_num) + self.numero_inicial
+
+    def serie_frequencias(self):
+        return pd.Series(self.frequencias, index=self.numeros)
+
+    # Frequências nos últimos `ultimos` concursos (histórico completo se None)
+    def serie_janela(self, ultimos=None):
+        return pd.Series(self.janelas.janela(ultimos), index=self.numeros)
+
+    # Pontuação quente/frio: aparições com peso que cai pela metade a cada `meia_vida` concursos
+    def serie_quentes(self, meia_vida):
+        return pd.Series(self.janelas.pontuacao(meia_vida), index=self.numeros)
+
+    def mais_frequente(self):
+        return int(self.numeros[np.argmax(self.frequencias)])
+
+    # Concursos desde a última aparição de cada número (total de concursos se nunca saiu)
+    def atrasos_atuais(self):
+        return self.atrasos.atuais()
+
+    # Tabela com aparições e atraso atual, máximo e médio de cada número
+    def tabela_atrasos(self):
+        return pd.DataFrame({
+            "Número": self.numeros,
+            "Aparições": self.frequencias,
+            "Atraso atual": self.atrasos.atuais(),
+            "Atraso máximo": self.atrasos.maximos(),
+            "Atraso médio": self.atrasos.medios().round(1),
+        })
+
+    # Último concurso em que cada número saiu (0 se nunca saiu)
+    def ultimo_concurso_visto(self):
+        vistos = self.ultima_linha >= 0
+        resultado = np.zeros(self.max_num, dtype=np.int64)
+        resultado[vistos] = self.concursos_por_linha[self.ultima_linha[vistos]]
+        return resultado
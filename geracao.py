@@ -0,0 +1,195 @@
+import numpy as np
+
+from instrumentacao import medido
+from loterias import ESPECIFICACOES
+from mascaras import chaves, de_booleanos
+
+# Estratégias de geração, na mesma ordem da geração inteligente original
+ESTRATEGIAS = ("frequentes", "equilibrada", "atrasados", "aleatoria")
+# Bilhetes gerados por bloco, para limitar a memória das chaves aleatórias
+TAMANHO_BLOCO = 32768
+# Rodadas extras de geração para repor bilhetes descartados como repetidos
+MAX_RODADAS = 20
+
+
+# Perfis de peso de cada estratégia: lista de partes (pesos sobre os números, quantidade de números)
+# `frequencias` substitui as frequências do histórico completo na ordem dos números mais frequentes
+# (ex.: frequências da janela recente ou pontuação com decaimento)
+def perfis_estrategias(indice, qtd_nums, pesos_frequentes=None, frequencias=None):
+    max_num = indice.max_num
+    frequencias = indice.frequencias if frequencias is None else np.asarray(frequencias)
+    ordem = np.argsort(-frequencias, kind="stable")
+
+    # Estratégia 1: Top números mais frequentes
+    top = np.zeros(max_num)
+    top[ordem[:int(qtd_nums * 2.5)]] = 1.0
+    if pesos_frequentes is not None:
+        top *= pesos_frequentes
+
+    # Estratégia 2: Mistura de frequentes e menos frequentes
+    meio = np.zeros(max_num)
+    meio[ordem[max_num // 3:2 * max_num // 3]] = 1.0
+
+    # Estratégia 3: Números mais atrasados que o normal, com peso pelo atraso atual / atraso médio
+    pontuacao = indice.atrasos.pontuacao()
+    atrasados = np.where(pontuacao >= 1, pontuacao, 0.0)
+    n_atrasados = min(qtd_nums // 2, int(np.count_nonzero(atrasados)))
+
+    return {
+        "frequentes": [(top, qtd_nums)],
+        "equilibrada": [(top, qtd_nums // 2), (meio, qtd_nums - qtd_nums // 2)],
+        "atrasados": [(atrasados, n_atrasados), (top, qtd_nums - n_atrasados)],
+        "aleatoria": [(np.ones(max_num), qtd_nums)],
+    }
+
+
+# Amostragem ponderada sem reposição em lote (Efraimidis-Spirakis): cada linha de `escolhidos`
+# recebe `quantidade` números novos, escolhidos pelos maiores log(U) / peso
+def amostrar(rng, pesos, quantidade, escolhidos):
+    if quantidade <= 0:
+        return escolhidos
+    linhas, max_num = escolhidos.shape
+    logs = np.log1p(-rng.random((linhas, max_num)))
+    with np.errstate(divide="ignore"):
+        chaves = np.where(pesos > 0, logs / pesos, logs - 1e9)  # Fora do perfil só se faltar número no perfil
+    chaves[escolhidos] = -np.inf
+    selecionados = np.argpartition(-chaves, quantidade - 1, axis=1)[:, :quantidade]
+    escolhidos[np.arange(linhas)[:, None], selecionados] = True
+    return escolhidos
+
+
+# Converte a matriz booleana de escolhidos (uma linha por bilhete) em números ordenados
+def escolhidos_para_numeros(escolhidos, numero_inicial=1):
+    quantidade = int(escolhidos[0].sum()) if len(escolhidos) else 0
+    colunas = np.nonzero(escolhidos)[1].reshape(len(escolhidos), quantidade)
+    return (colunas + numero_inicial).astype(np.uint8)
+
+
+# Sorteia uma estratégia por bilhete e preenche cada grupo de bilhetes com os perfis dela
+def _gerar_bloco(rng, perfis, estrategias, tamanho, max_num):
+    escolhidos = np.zeros((tamanho, max_num), dtype=bool)
+    sorteio = rng.integers(0, len(estrategias), size=tamanho)
+    for i, estrategia in enumerate(estrategias):
+        linhas = np.flatnonzero(sorteio == i)
+        if len(linhas) == 0:
+            continue
+        bloco = escolhidos[linhas]
+        for pesos, quantidade in perfis[estrategia]:
+            amostrar(rng, pesos, quantidade, bloco)
+        escolhidos[linhas] = bloco
+    return escolhidos
+
+
+# Probabilidade de cada número numa coluna das loterias posicionais: as partes do perfil somadas
+# com o peso da quantidade de números de cada uma (uniforme se o perfil não tiver pesos)
+def _probabilidades_posicionais(partes, max_num):
+    probabilidades = np.zeros(max_num)
+    for pesos, quantidade in partes:
+        total = pesos.sum()
+        if quantidade > 0 and total > 0:
+            probabilidades += quantidade * pesos / total
+    if probabilidades.sum() <= 0:
+        probabilidades = np.ones(max_num)
+    return probabilidades / probabilidades.sum()
+
+
+# Loterias posicionais (Super Sete): cada coluna recebe um número sorteado de forma independente,
+# com repetição entre colunas. Retorna a matriz booleana (bilhete, coluna * max_num + número).
+def _gerar_bloco_posicional(rng, perfis, estrategias, tamanho, max_num, colunas):
+    sorteio = rng.integers(0, len(estrategias), size=tamanho)
+    numeros = np.zeros((tamanho, colunas), dtype=np.int64)
+    for i, estrategia in enumerate(estrategias):
+        linhas = np.flatnonzero(sorteio == i)
+        if len(linhas) == 0:
+            continue
+        acumuladas = np.cumsum(_probabilidades_posicionais(perfis[estrategia], max_num))
+        sorteados = np.searchsorted(acumuladas, rng.random((len(linhas), colunas)) * acumuladas[-1], side="right")
+        numeros[linhas] = np.minimum(sorteados, max_num - 1)
+    escolhidos = np.zeros((tamanho, colunas * max_num), dtype=bool)
+    escolhidos[np.arange(tamanho)[:, None], numeros + np.arange(colunas) * max_num] = True
+    return escolhidos
+
+
+# Números de cada coluna, na ordem das colunas, a partir da matriz de _gerar_bloco_posicional
+def posicoes_para_numeros(escolhidos, max_num, numero_inicial=0):
+    colunas = escolhidos.shape[1] // max_num
+    return (escolhidos.reshape(len(escolhidos), colunas, max_num).argmax(axis=2) + numero_inicial).astype(np.uint8)
+
+
+# Trevos (ou mês da sorte) sorteados uniformemente entre todos os possíveis
+def _gerar_trevos(rng, especificacao, tamanho):
+    max_trevo = especificacao.max_trevo
+    return amostrar(rng, np.ones(max_trevo), especificacao.qtd_trevos, np.zeros((tamanho, max_trevo), dtype=bool))
+
+
+# Chave compacta de cada bilhete (números e trevos), para eliminar repetidos
+def _chaves(escolhidos, trevos):
+    partes = [de_booleanos(escolhidos)]
+    if trevos is not None:
+        partes.append(de_booleanos(trevos))
+    return chaves(np.hstack(partes))
+
+
+# Gera `quantidade` bilhetes de uma vez. Retorna (dezenas, trevos): matrizes uint8 com uma linha
+# por bilhete e números ordenados (na Super Sete, um número por coluna, na ordem das colunas); trevos é None nas loterias sem trevos/mês.
+# Com deduplicar=True pode retornar menos bilhetes se os perfis não tiverem combinações suficientes.
+@medido("geracao.gerar_lote")
+def gerar_lote(indices, loteria, quantidade, semente=None, estrategias=ESTRATEGIAS, deduplicar=True,
+               tamanho_bloco=TAMANHO_BLOCO, pesos_frequentes=None, frequencias=None):
+    especificacao = ESPECIFICACOES.get(loteria)
+    if especificacao is None or not especificacao.tem_dezenas or "dezenas" not in indices:
+        return np.zeros((0, 0), dtype=np.uint8), None
+
+    rng = np.random.default_rng(semente)
+    indice = indices["dezenas"]
+    perfis = perfis_estrategias(indice, especificacao.qtd_nums, pesos_frequentes, frequencias)
+    tem_trevos = especificacao.tem_trevos
+    posicional = especificacao.posicional
+
+    dezenas = np.zeros((0, especificacao.qtd_nums), dtype=np.uint8)
+    trevos = np.zeros((0, especificacao.qtd_trevos), dtype=np.uint8) if tem_trevos else None
+    chaves = None
+
+    for rodada in range(MAX_RODADAS if deduplicar else 1):
+        faltam = quantidade - len(dezenas)
+        if faltam <= 0:
+            break
+        if rodada:
+            # Nas rodadas de reposição gera uma folga, já que parte dos bilhetes volta a repetir
+            faltam = max(2 * faltam, 1024)
+        novos_dezenas, novos_trevos = [dezenas], [trevos]
+        novas_chaves = [] if chaves is None else [chaves]
+        while faltam > 0:
+            tamanho = min(tamanho_bloco, faltam)
+            if posicional:
+                escolhidos = _gerar_bloco_posicional(
+                    rng, perfis, estrategias, tamanho, indice.max_num, especificacao.qtd_nums
+                )
+                novos_dezenas.append(posicoes_para_numeros(escolhidos, indice.max_num, indice.numero_inicial))
+            else:
+                escolhidos = _gerar_bloco(rng, perfis, estrategias, tamanho, indice.max_num)
+                novos_dezenas.append(escolhidos_para_numeros(escolhidos, indice.numero_inicial))
+            escolhidos_trevos = _gerar_trevos(rng, especificacao, tamanho) if tem_trevos else None
+            if tem_trevos:
+                novos_trevos.append(escolhidos_para_numeros(escolhidos_trevos))
+            if deduplicar:
+                novas_chaves.append(_chaves(escolhidos, escolhidos_trevos))
+            faltam -= tamanho
+
+        anteriores = len(dezenas)
+        dezenas = np.vstack(novos_dezenas)
+        trevos = np.vstack(novos_trevos) if tem_trevos else None
+        if not deduplicar:
+            break
+
+        # Mantém a primeira ocorrência de cada bilhete, na ordem de geração
+        chaves = np.concatenate(novas_chaves)
+        _, primeiros = np.unique(chaves, return_index=True)
+        primeiros.sort()
+        dezenas, chaves = dezenas[primeiros], chaves[primeiros]
+        if tem_trevos:
+            trevos = trevos[primeiros]
+        if len(dezenas) == anteriores:
+            break  # Nenhum bilhete novo: o espaço dos perfis está esgotado
+
+    return dezenas[:quantidade], (trevos[:quantidade] if tem_trevos else None)
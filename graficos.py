@@ -0,0 +1,251 @@
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from agregacao import LIMITE_WEBGL, MAX_BARRAS, MAX_PONTOS_LINHA, agrupar_baldes, lttb, media_baldes, reduzir_mapa
+from instrumentacao import contar, medir, registrar_bytes
+
+# Cores do tema
+COR_TITULO = "#00ccff"
+COR_BRILHO = "#00ffcc"
+# Memória máxima ocupada pelas figuras serializadas em cache
+MAX_BYTES_FIGURAS = 64 * 1024 * 1024
+
+# Tema escuro único de todos os gráficos, aplicado por cima do plotly_dark
+LAYOUT_TEMA = {
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "title": {"font": {"family": "Orbitron", "size": 24, "color": COR_TITULO}, "x": 0.5},
+    "font": {"family": "Arial", "size": 14, "color": "#e0e0e0"},
+    "xaxis": {"title": {"font": {"size": 16, "color": COR_TITULO}}},
+    "yaxis": {"title": {"font": {"size": 16, "color": COR_TITULO}}},
+    "margin": {"l": 40, "r": 40, "t": 70, "b": 40},
+}
+TEMA = "plotly_dark+futurista"
+
+
+# Plotly só é importado na primeira figura, e o tema registrado nesse momento: quem importa este
+# módulo sem desenhar nada (linha de comando, testes de dados) não paga pelo import
+@functools.cache
+def _plotly():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    pio.templates["futurista"] = go.layout.Template(layout=LAYOUT_TEMA)
+    return px, go
+
+
+# Cache LRU de figuras serializadas em JSON, limitado pela memória total das figuras guardadas
+class CacheFiguras:
+    def __init__(self, max_bytes=MAX_BYTES_FIGURAS):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figuras)
+
+    # JSON da figura da chave; na falta, constrói com `construtor()` e guarda
+    def obter(self, chave, construtor):
+        with self._lock:
+            texto = self._figuras.get(chave)
+            if texto is not None:
+                self._figuras.move_to_end(chave)
+                self.acertos += 1
+                contar("figuras", "acerto")
+                return texto
+            self.falhas += 1
+        contar("figuras", "falha")
+
+        with medir("graficos.construcao"):
+            figura = construtor()
+        with medir("graficos.serializacao"):
+            texto = figura.to_json()
+        registrar_bytes("figuras.json", len(texto))
+        with self._lock:
+            if chave not in self._figuras:
+                self._figuras[chave] = texto
+                self.total_bytes += len(texto)
+            # Descarta as menos usadas recentemente até caber no limite
+            while self.total_bytes > self.max_bytes and len(self._figuras) > 1:
+                _, antiga = self._figuras.popitem(last=False)
+                self.total_bytes -= len(antiga)
+        return texto
+
+    def limpar(self):
+        with self._lock:
+            self._figuras.clear()
+            self.total_bytes = 0
+
+
+CACHE_FIGURAS = CacheFiguras()
+
+
+def _atualizar_hash(resumo, parte):
+    if isinstance(parte, np.ndarray):
+        resumo.update(f"{parte.dtype.str}{parte.shape}".encode())
+        resumo.update(np.ascontiguousarray(parte).tobytes() if parte.dtype != object else repr(parte.tolist()).encode())
+    elif hasattr(parte, "to_numpy") and hasattr(parte, "index"):
+        # Series e DataFrames: índice e valores
+        _atualizar_hash(resumo, np.asarray(parte.index))
+        _atualizar_hash(resumo, parte.to_numpy())
+    elif hasattr(parte, "to_numpy"):
+        _atualizar_hash(resumo, parte.to_numpy())
+    elif isinstance(parte, (list, tuple)):
+        resumo.update(f"{type(parte).__name__}{len(parte)}".encode())
+        for item in parte:
+            _atualizar_hash(resumo, item)
+    else:
+        resumo.update(repr(parte).encode())
+    resumo.update(b"|")
+
+
+# Impressão digital dos dados e parâmetros de um gráfico
+def impressao_digital(*partes):
+    resumo = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        _atualizar_hash(resumo, parte)
+    return resumo.hexdigest()
+
+
+# Figura a partir do JSON em cache, sem validar de novo as propriedades
+def figura_de_json(texto):
+    _, go = _plotly()
+    with medir("graficos.desserializacao"):
+        return go.Figure(json.loads(texto), _validate=False)
+
+
+# Transforma uma função que constrói uma figura em outra que consulta antes o cache de figuras,
+# pela impressão digital dos argumentos
+def memoizada(construtor):
+    @functools.wraps(construtor)
+    def figura(*args, **kwargs):
+        chave = (construtor.__name__, impressao_digital(args, sorted(kwargs.items())))
+        return figura_de_json(CACHE_FIGURAS.obter(chave, lambda: construtor(*args, **kwargs)))
+    return figura
+
+
+# Gráfico de frequência dos números, com barras coloridas pela própria frequência
+@memoizada
+def grafico_frequencia(freq_series, titulo, escala="Viridis", altura=400):
+    px, _ = _plotly()
+    fig = px.bar(
+        x=freq_series.index.astype(str),
+        y=freq_series.values,
+        labels={"x": "Número", "y": "Frequência"},
+        title=titulo,
+        color=freq_series.values,
+        color_continuous_scale=escala,
+        height=altura,
+        template=TEMA
+    )
+    fig.update_layout(hovermode="closest")
+
+    # Efeito de brilho nas barras e grade horizontal
+    fig.update_traces(marker_line_color=COR_BRILHO, marker_line_width=1.5, opacity=0.9)
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor="rgba(255, 255, 255, 0.1)")
+    return fig
+
+
+# Rótulos das faixas de itens agrupados: "primeiro–último", ou o próprio item se a faixa tem um só
+def _rotulos_faixas(rotulos, inicios):
+    fins = np.append(inicios[1:], len(rotulos)) - 1
+    return [str(rotulos[a]) if a == b else f"{rotulos[a]}–{rotulos[b]}" for a, b in zip(inicios, fins)]
+
+
+# Barras simples; `cor` colore pela escala indicada, senão as barras usam a cor de brilho do tema.
+# Com eixo x numérico e mais de MAX_BARRAS barras, as barras vizinhas são somadas em faixas.
+@memoizada
+def grafico_barras(x, y, titulo, rotulo_x, rotulo_y, cor=None, escala="Viridis", titulo_cor=None,
+                   tamanho_titulo=20, inclinacao_x=None):
+    px, _ = _plotly()
+    x = np.asarray(x)
+    if len(x) > MAX_BARRAS and np.issubdtype(x.dtype, np.number):
+        inicios, y = agrupar_baldes(y, MAX_BARRAS)
+        x = np.array(_rotulos_faixas(x, inicios))
+        cor = None if cor is None else media_baldes(cor, MAX_BARRAS)[1]
+
+    fig = px.bar(
+        x=x,
+        y=y,
+        labels={"x": rotulo_x, "y": rotulo_y},
+        title=titulo,
+        color=cor,
+        color_continuous_scale=escala,
+        template=TEMA
+    )
+    fig.update_layout(title_font_size=tamanho_titulo)
+    if titulo_cor is not None:
+        fig.update_layout(coloraxis_colorbar_title=titulo_cor)
+    if inclinacao_x is not None:
+        fig.update_layout(xaxis_tickangle=inclinacao_x)
+    if cor is None:
+        fig.update_traces(marker_color=COR_BRILHO)
+    return fig
+
+
+# Linha com marcadores e traço brilhante. Séries longas são reduzidas a MAX_PONTOS_LINHA pontos
+# (LTTB) e, acima de LIMITE_WEBGL pontos, desenhadas em WebGL.
+@memoizada
+def grafico_linha(x, y, titulo, rotulo_x, rotulo_y):
+    px, _ = _plotly()
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) > MAX_PONTOS_LINHA:
+        posicoes = x if np.issubdtype(x.dtype, np.number) else np.arange(len(x))
+        mantidos = lttb(posicoes, y, MAX_PONTOS_LINHA)
+        x, y = x[mantidos], y[mantidos]
+
+    webgl = len(y) > LIMITE_WEBGL
+    fig = px.line(
+        x=x, y=y, markers=not webgl, title=titulo, template=TEMA,
+        line_shape="linear" if webgl else "spline", render_mode="webgl" if webgl else "svg"
+    )
+    fig.update_layout(xaxis_title=rotulo_x, yaxis_title=rotulo_y)
+    fig.update_traces(line=dict(width=1.5 if webgl else 3, color=COR_BRILHO))
+    if not webgl:
+        fig.update_traces(marker=dict(size=8, line=dict(width=2, color=COR_BRILHO)))
+    return fig
+
+
+# Mapa de calor genérico: z[i, j] para o rótulo y[i] e o rótulo x[j]. Acima de MAX_CELULAS_MAPA
+# células, linhas e colunas vizinhas são somadas em faixas.
+@memoizada
+def mapa_calor(z, x, y, titulo, rotulo_x, rotulo_y, dica, altura=500):
+    _, go = _plotly()
+    z, inicios_y, inicios_x = reduzir_mapa(np.asarray(z))
+    if z.size < len(x) * len(y):
+        x, y = _rotulos_faixas(list(x), inicios_x), _rotulos_faixas(list(y), inicios_y)
+    fig = go.Figure(data=go.Heatmap(
+        z=z,
+        x=list(x),
+        y=list(y),
+        colorscale="Viridis",
+        showscale=True,
+        hovertemplate=dica
+    ))
+    fig.update_layout(title=titulo, height=altura, template=TEMA, xaxis_title=rotulo_x, yaxis_title=rotulo_y)
+    return fig
+
+
+# Mapa de calor da frequência de cada número em cada posição do sorteio
+def mapa_calor_posicoes(matriz_freq, numeros, titulo, altura=500):
+    return mapa_calor(
+        matriz_freq, [f"Posição {i + 1}" for i in range(matriz_freq.shape[1])], numeros.tolist(), titulo,
+        "Posição do Sorteio", "Número", "Número: %{y}<br>%{x}<br>Frequência: %{z}<extra></extra>", altura
+    )
+
+
+# Mapa de calor de coocorrência: quantos concursos cada par de números saiu junto
+def mapa_coocorrencia(pares, numeros, titulo, altura=600):
+    return mapa_calor(
+        pares, numeros.tolist(), numeros.tolist(), titulo, "Número", "Número",
+        "Números: %{x} e %{y}<br>Concursos juntos: %{z}<extra></extra>", altura
+    )
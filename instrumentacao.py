@@ -0,0 +1,184 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+# Instrumentação ligada pela variável de ambiente; desligada, `medir` devolve um contexto vazio
+# compartilhado e os contadores retornam na primeira linha
+ATIVA = os.environ.get("LOTERIAS_INSTRUMENTACAO", "") not in ("", "0")
+# Arquivo de métricas no formato de texto do Prometheus, regravado ao fim de cada execução da página
+ARQUIVO_METRICAS = os.environ.get("LOTERIAS_METRICAS")
+# Porta do endpoint HTTP /metrics (desligado se vazio)
+PORTA_METRICAS = os.environ.get("LOTERIAS_METRICAS_PORTA")
+
+_VAZIO = nullcontext()
+_lock = threading.Lock()
+_local = threading.local()
+# nome -> [chamadas, segundos totais, maior duração]
+_spans = defaultdict(lambda: [0, 0.0, 0.0])
+# (nome, evento) -> contagem; eventos usados: "acerto", "falha", "chamada"
+_eventos = defaultdict(int)
+# nome -> bytes acumulados
+_bytes = defaultdict(int)
+
+
+def ativar(ativa=True):
+    global ATIVA
+    ATIVA = ativa
+
+
+# Trecho medido: acumula a duração por nome e registra o trecho na execução atual da thread
+class _Span:
+    __slots__ = ("nome", "inicio", "profundidade")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.profundidade = getattr(_local, "profundidade", 0)
+        _local.profundidade = self.profundidade + 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        duracao = time.perf_counter() - self.inicio
+        _local.profundidade = self.profundidade
+        with _lock:
+            total = _spans[self.nome]
+            total[0] += 1
+            total[1] += duracao
+            total[2] = max(total[2], duracao)
+        execucao = getattr(_local, "execucao", None)
+        if execucao is not None:
+            execucao.append((self.inicio, self.profundidade, self.nome, duracao))
+        return False
+
+
+# Contexto que mede o trecho com o nome indicado: `with medir("secao.frequencia"): ...`
+def medir(nome):
+    return _Span(nome) if ATIVA else _VAZIO
+
+
+# Decorador que mede cada chamada da função (nome padrão: módulo.função)
+def medido(nome=None):
+    def decorador(funcao):
+        rotulo = nome or f"{funcao.__module__}.{funcao.__name__}"
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not ATIVA:
+                return funcao(*args, **kwargs)
+            with _Span(rotulo):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+# Conta um evento de cache ("acerto", "falha" ou "chamada") do nome indicado
+def contar(nome, evento):
+    if not ATIVA:
+        return
+    with _lock:
+        _eventos[(nome, evento)] += 1
+
+
+# Soma bytes transferidos ou serializados sob o nome indicado
+def registrar_bytes(nome, quantidade):
+    if not ATIVA:
+        return
+    with _lock:
+        _bytes[nome] += quantidade
+
+
+# Começa a registrar os trechos desta thread como uma nova execução da página
+def iniciar_execucao():
+    _local.execucao = [] if ATIVA else None
+    _local.profundidade = 0
+
+
+# Trechos da execução atual em ordem de início: lista de (profundidade, nome, milissegundos)
+def resumo_execucao():
+    execucao = getattr(_local, "execucao", None) or []
+    return [(profundidade, nome, duracao * 1000) for _, profundidade, nome, duracao in sorted(execucao)]
+
+
+# Cópia dos totais acumulados: (trechos, eventos, bytes)
+def totais():
+    with _lock:
+        return ({nome: tuple(valores) for nome, valores in _spans.items()}, dict(_eventos), dict(_bytes))
+
+
+def zerar():
+    with _lock:
+        _spans.clear()
+        _eventos.clear()
+        _bytes.clear()
+
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Métricas acumuladas no formato de texto do Prometheus
+def texto_prometheus():
+    spans, eventos, quantidades = totais()
+    linhas = [
+        "# TYPE loterias_trecho_chamadas_total counter",
+        *(f'loterias_trecho_chamadas_total{{trecho="{_rotulo(n)}"}} {v[0]}' for n, v in sorted(spans.items())),
+        "# TYPE loterias_trecho_segundos_total counter",
+        *(f'loterias_trecho_segundos_total{{trecho="{_rotulo(n)}"}} {v[1]:.6f}' for n, v in sorted(spans.items())),
+        "# TYPE loterias_trecho_segundos_max gauge",
+        *(f'loterias_trecho_segundos_max{{trecho="{_rotulo(n)}"}} {v[2]:.6f}' for n, v in sorted(spans.items())),
+        "# TYPE loterias_cache_eventos_total counter",
+        *(f'loterias_cache_eventos_total{{cache="{_rotulo(n)}",evento="{e}"}} {v}'
+          for (n, e), v in sorted(eventos.items())),
+        "# TYPE loterias_bytes_total counter",
+        *(f'loterias_bytes_total{{origem="{_rotulo(n)}"}} {v}' for n, v in sorted(quantidades.items())),
+    ]
+    return "\n".join(linhas) + "\n"
+
+
+# Grava as métricas no arquivo (substituição atômica, para o coletor nunca ler um arquivo pela metade)
+def gravar_metricas(caminho=None):
+    caminho = caminho or ARQUIVO_METRICAS
+    if not ATIVA or not caminho:
+        return
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto_prometheus())
+    os.replace(temporario, caminho)
+
+
+# Serve /metrics numa thread de fundo; retorna o servidor (None se não houver porta configurada ou
+# se ela não puder ser aberta, ex.: já em uso por outro processo, caso em que o erro só é registrado)
+def servir_metricas(porta=None, endereco="127.0.0.1"):
+    porta = porta or PORTA_METRICAS
+    if not porta:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class ManipuladorMetricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        servidor = ThreadingHTTPServer((endereco, int(porta)), ManipuladorMetricas)
+    except OSError as e:
+        print(f"Endpoint /metrics desligado: não foi possível abrir {endereco}:{porta} ({e})", file=sys.stderr)
+        return None
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
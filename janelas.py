@@ -0,0 +1,95 @@
+import numpy as np
+
+
+# Frequências em janelas deslizantes e com decaimento exponencial, a partir da soma acumulada da
+# incidência: a frequência em qualquer intervalo de concursos é uma subtração de duas linhas
+class FrequenciasJanela:
+    def __init__(self, max_num, numero_inicial=1):
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+        # acumulado[i, n]: quantas vezes o número n saiu nas i primeiras linhas do histórico
+        self.acumulado = np.zeros((1, max_num), dtype=np.int32)
+        # Pontuações com decaimento já calculadas, por meia-vida (em concursos)
+        self._pontuacoes = {}
+
+    # As linhas do acumulado ficam no início de _buffer, que tem folga para os concursos seguintes
+    # e dobra de tamanho quando enche. Cópias compartilham o buffer; _ocupadas (também
+    # compartilhada) diz até onde alguma delas já escreveu, e só quem está nesse limite anexa
+    # linhas no próprio buffer, sem alterar o que as outras enxergam.
+    @property
+    def acumulado(self):
+        return self._buffer[:self._linhas]
+
+    @acumulado.setter
+    def acumulado(self, acumulado):
+        self._buffer = acumulado
+        self._linhas = len(acumulado)
+        self._ocupadas = [len(acumulado)]
+
+    @property
+    def total_concursos(self):
+        return self._linhas - 1
+
+    @property
+    def numeros(self):
+        return np.arange(self.max_num) + self.numero_inicial
+
+    # Incorpora os concursos da matriz a partir da linha `inicio`
+    def atualizar(self, matriz, inicio=None):
+        inicio = self.total_concursos if inicio is None else inicio
+        if inicio >= len(matriz):
+            return
+        novos = matriz.incidencia[inicio:]
+        anexando = inicio == self.total_concursos
+        linhas = inicio + 1 + len(novos)
+        if not (anexando and self._ocupadas[0] == self._linhas and linhas <= len(self._buffer)):
+            buffer = np.empty((max(linhas, 2 * self._linhas), self.max_num), dtype=np.int32)
+            buffer[:inicio + 1] = self._buffer[:inicio + 1]
+            self._buffer, self._ocupadas = buffer, [inicio + 1]
+        destino = self._buffer[inicio + 1:linhas]
+        np.cumsum(novos, axis=0, dtype=np.int32, out=destino)
+        destino += self._buffer[inicio]
+        self._linhas = self._ocupadas[0] = linhas
+        if anexando:
+            self._pontuacoes = {
+                meia_vida: self._decair(pontuacao, novos, meia_vida)
+                for meia_vida, pontuacao in list(self._pontuacoes.items())
+            }
+        else:
+            # Concursos reescritos: as pontuações são recalculadas na próxima consulta
+            self._pontuacoes = {}
+
+    # Cópia independente para atualizar sem afetar quem lê esta instância
+    def copia(self):
+        nova = FrequenciasJanela.__new__(FrequenciasJanela)
+        nova.max_num = self.max_num
+        nova.numero_inicial = self.numero_inicial
+        nova._buffer, nova._linhas, nova._ocupadas = self._buffer, self._linhas, self._ocupadas
+        nova._pontuacoes = dict(self._pontuacoes)
+        return nova
+
+    # Frequência de cada número entre as linhas [inicio, fim) do histórico
+    def intervalo(self, inicio, fim=None):
+        fim = self.total_concursos if fim is None else fim
+        return self.acumulado[fim] - self.acumulado[max(inicio, 0)]
+
+    # Frequência de cada número nos últimos `ultimos` concursos (todos se None)
+    def janela(self, ultimos=None):
+        if ultimos is None:
+            return self.intervalo(0)
+        return self.intervalo(self.total_concursos - ultimos)
+
+    # Soma das aparições de cada número com peso 0,5 ** (idade / meia_vida), idade em concursos.
+    # A primeira consulta de cada meia-vida percorre o histórico; depois só os concursos novos.
+    def pontuacao(self, meia_vida):
+        pontuacao = self._pontuacoes.get(meia_vida)
+        if pontuacao is None:
+            incidencia = np.diff(self.acumulado, axis=0)
+            pontuacao = self._pontuacoes[meia_vida] = self._decair(np.zeros(self.max_num), incidencia, meia_vida)
+        return pontuacao
+
+    @staticmethod
+    def _decair(pontuacao, incidencia, meia_vida):
+        fator = 0.5 ** (1.0 / meia_vida)
+        pesos = fator ** np.arange(len(incidencia) - 1, -1, -1, dtype=np.float64)
+        return pontuacao * fator ** len(incidencia) + pesos @ incidencia
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+# Colunas com listas de números sorteados (as demais são data, texto ou prêmios)
+COLUNAS_NUMEROS = ("dezenas", "trevos", "dezenas_2")
+MESES = ("Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro",
+         "Outubro", "Novembro", "Dezembro")
+_NUMEROS_MESES = {nome.lower(): i + 1 for i, nome in enumerate(MESES)}
+
+
+# Especificação de uma loteria: números sorteados, sorteio extra (trevos da +Milionária, mês do
+# Dia de Sorte), campos lidos da API e faixas de premiação. Parsing, geração e exibição partem
+# daqui, então uma loteria nova é uma única entrada em ESPECIFICACOES.
+class Loteria:
+    __slots__ = ("nome", "qtd_nums", "max_num", "numero_inicial", "posicional", "qtd_trevos", "max_trevo",
+                 "rotulo_trevo", "campos", "obrigatorias", "faixas_premiacao")
+
+    def __init__(self, nome, qtd_nums, max_num, numero_inicial=1, posicional=False, qtd_trevos=0, max_trevo=0,
+                 rotulo_trevo="trevo", com_data=True, extras=(), obrigatorias=("dezenas",), faixas_premiacao=()):
+        self.nome = nome
+        self.qtd_nums = qtd_nums
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+        # Super Sete: um dígito por coluna, com repetição
+        self.posicional = posicional
+        # Números do sorteio extra gerados junto com as dezenas, e o nome de cada um na exibição
+        self.qtd_trevos = qtd_trevos
+        self.max_trevo = max_trevo
+        self.rotulo_trevo = rotulo_trevo
+        # Campos extraídos dos registros da API, na ordem da tabela
+        self.campos = ("concurso",) + (("data",) if com_data else ()) + (("dezenas",) if qtd_nums else ()) + extras
+        # Campos sem os quais o registro é descartado (além do concurso)
+        self.obrigatorias = obrigatorias
+        # Acertos premiados, da faixa principal para a menor. Na +Milionária cada faixa é
+        # (acertos nas dezenas, acertos nos trevos)
+        self.faixas_premiacao = faixas_premiacao
+
+    @property
+    def tem_trevos(self):
+        return self.qtd_trevos > 0
+
+    @property
+    def tem_dezenas(self):
+        return self.qtd_nums > 0
+
+    # Campos com listas de números, gravados como colunas inteiras de largura fixa
+    @property
+    def colunas_numeros(self):
+        return tuple(c for c in self.campos if c in COLUNAS_NUMEROS)
+
+    # Campos além de concurso, data e dezenas, exibidos à parte (trevos, segundo sorteio, time, mês)
+    @property
+    def extras(self):
+        return tuple(c for c in self.campos if c not in ("concurso", "data", "dezenas", "premios"))
+
+    # (quantidade de números possíveis, menor número) de uma coluna de sorteio
+    def faixa(self, coluna="dezenas"):
+        if coluna == "trevos":
+            return self.max_trevo, 1
+        return self.max_num, self.numero_inicial
+
+    def __repr__(self):
+        return f"Loteria({self.nome!r})"
+
+
+ESPECIFICACOES = {
+    loteria.nome: loteria for loteria in (
+        Loteria("megasena", 6, 60, faixas_premiacao=(6, 5, 4)),
+        Loteria(
+            "maismilionaria", 6, 50, qtd_trevos=2, max_trevo=6, com_data=False, extras=("trevos",),
+            obrigatorias=("dezenas", "trevos"),
+            faixas_premiacao=((6, 2), (6, 1), (6, 0), (5, 2), (5, 1), (5, 0), (4, 2), (4, 1), (4, 0), (3, 2), (3, 1),
+                              (2, 2), (2, 1)),
+        ),
+        Loteria("lotofacil", 15, 25, faixas_premiacao=(15, 14, 13, 12, 11)),
+        Loteria("quina", 5, 80, faixas_premiacao=(5, 4, 3, 2)),
+        Loteria("lotomania", 20, 100, faixas_premiacao=(20, 19, 18, 17, 16, 15, 0)),
+        Loteria("timemania", 7, 80, extras=("time",), faixas_premiacao=(7, 6, 5, 4, 3)),
+        Loteria("duplasena", 6, 50, com_data=False, extras=("dezenas_2",), faixas_premiacao=(6, 5, 4, 3)),
+        # Federal não tem dezenas
+        Loteria("federal", 0, 0, extras=("premios",), obrigatorias=("premios",)),
+        # O mês da sorte é gerado como um "trevo" de 1 a 12
+        Loteria("diadesorte", 7, 31, qtd_trevos=1, max_trevo=12, rotulo_trevo="mes", extras=("mes",),
+                faixas_premiacao=(7, 6, 5, 4)),
+        # Dígitos de 0 a 9, um por coluna
+        Loteria("supersete", 7, 10, numero_inicial=0, posicional=True, faixas_premiacao=(7, 6, 5, 4, 3)),
+    )
+}
+
+# Lista de loterias disponíveis
+LOTERIAS = list(ESPECIFICACOES)
+
+
+# Retorna (quantidade de números possíveis, menor número) de uma coluna de sorteio
+def faixa_numeros(loteria, coluna="dezenas"):
+    return ESPECIFICACOES[loteria].faixa(coluna)
+
+
+# Número (1 a 12) de cada mês, dado pelo nome ("Março") ou pelo número; 0 se não reconhecido
+def numeros_meses(valores):
+    texto = pd.Series(valores, dtype=object).astype(str).str.strip()
+    numeros = texto.str.lower().map(_NUMEROS_MESES)
+    numeros = numeros.fillna(pd.to_numeric(texto, errors="coerce"))
+    numeros = numeros.where(numeros.between(1, 12), 0)
+    return numeros.to_numpy(dtype=np.int64)
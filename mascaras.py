@@ -0,0 +1,75 @@
+import numpy as np
+
+from cache_disco import VAZIO
+
+# Nenhuma loteria passa de 100 números: dois uint64 por sorteio ou bilhete
+BITS_POR_PALAVRA = 64
+
+if hasattr(np, "bitwise_count"):
+    contar_bits = np.bitwise_count
+else:
+    _BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+    # Popcount de cada palavra uint64 por tabela de bytes (NumPy sem bitwise_count)
+    def contar_bits(palavras):
+        bytes_ = _BITS_POR_BYTE[np.ascontiguousarray(palavras).view(np.uint8)]
+        return bytes_.reshape(*palavras.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def num_palavras(total_bits):
+    return max(1, -(-total_bits // BITS_POR_PALAVRA))
+
+
+# Converte uma matriz booleana (linhas, bits) em palavras uint64 (linhas, palavras); o bit j
+# da linha fica no bit j % 64 da palavra j // 64
+def de_booleanos(marcados):
+    palavras = num_palavras(marcados.shape[1])
+    if marcados.shape[1] != palavras * BITS_POR_PALAVRA:
+        extra = np.zeros((len(marcados), palavras * BITS_POR_PALAVRA - marcados.shape[1]), dtype=bool)
+        marcados = np.hstack([marcados, extra])
+    return np.packbits(marcados, axis=1, bitorder="little").view("<u8")
+
+
+# Matriz booleana (linhas, total_bits) de volta a partir das palavras
+def para_booleanos(mascaras, total_bits):
+    bytes_ = np.ascontiguousarray(mascaras, dtype="<u8").view(np.uint8)
+    return np.unpackbits(bytes_, axis=1, count=total_bits, bitorder="little").astype(bool)
+
+
+# Codifica cada linha de números (uint8, VAZIO nas posições vazias) como conjunto de bits.
+# Em loterias posicionais (Super Sete) o bit é posição * max_num + número.
+def codificar(numeros, max_num, numero_inicial=1, posicional=False):
+    numeros = np.asarray(numeros, dtype=np.uint8).reshape(len(numeros), -1)
+    validos = numeros != VAZIO
+    bits = (numeros.astype(np.int64) - numero_inicial) % max_num
+    total_bits = max_num
+    if posicional:
+        bits = bits + np.arange(numeros.shape[1]) * max_num
+        total_bits = max_num * numeros.shape[1]
+    marcados = np.zeros((len(numeros), total_bits), dtype=bool)
+    marcados[np.nonzero(validos)[0], bits[validos]] = True
+    return de_booleanos(marcados)
+
+
+# Números ordenados de cada linha (uint8, VAZIO completando as linhas com menos números)
+def decodificar(mascaras, max_num, numero_inicial=1):
+    marcados = para_booleanos(mascaras, max_num)
+    tamanhos = marcados.sum(axis=1)
+    largura = int(tamanhos.max()) if len(tamanhos) else 0
+    numeros = np.full((len(marcados), largura), VAZIO, dtype=np.uint8)
+    linhas, colunas = np.nonzero(marcados)
+    posicoes = np.arange(len(linhas)) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    # O "00" das loterias que começam em 1 volta como o maior número (ex.: 100 na Lotomania)
+    numeros[linhas, posicoes] = (colunas + numero_inicial).astype(np.uint8)
+    return numeros
+
+
+# Quantidade de números em comum entre um bilhete (palavras) e cada linha de `mascaras`
+def em_comum(bilhete, mascaras):
+    return contar_bits(mascaras & np.asarray(bilhete, dtype=np.uint64)).sum(axis=-1, dtype=np.int64)
+
+
+# Chave de cada linha para comparações exatas (np.unique, isin), tratando as palavras como bytes
+def chaves(mascaras):
+    mascaras = np.ascontiguousarray(mascaras)
+    return mascaras.view(np.dtype((np.void, mascaras.dtype.itemsize * mascaras.shape[1]))).ravel()
@@ -0,0 +1,110 @@
+import numpy as np
+
+from cache_disco import VAZIO, listas_para_matriz
+from instrumentacao import medido
+from mascaras import de_booleanos
+
+# Arrays por concurso que compõem a matriz, todas com uma linha por concurso
+CAMPOS = ("concursos", "dezenas", "validos", "indices", "incidencia", "mascaras")
+
+# Converte os números sorteados no índice da coluna correspondente (0 a max_num - 1).
+# Em loterias que começam em 1, o "00" equivale ao maior número (ex.: 100 na Lotomania).
+def indices_numeros(dezenas, max_num, numero_inicial=1):
+    return (dezenas.astype(np.int64) - numero_inicial) % max_num
+
+
+# Completa a matriz à direita até a largura indicada
+def _alargar(matriz, largura, valor):
+    if matriz.shape[1] == largura:
+        return matriz
+    extra = np.full((matriz.shape[0], largura - matriz.shape[1]), valor, dtype=matriz.dtype)
+    return np.hstack([matriz, extra])
+
+
+# Matriz densa dos sorteios de uma loteria, com uma linha por concurso em ordem crescente
+class MatrizSorteios:
+    def __init__(self, concursos, dezenas, max_num, numero_inicial=1):
+        self.concursos = np.ascontiguousarray(concursos, dtype=np.int64)
+        # Matriz uint8 (n_concursos, numeros_por_sorteio); posições vazias valem VAZIO
+        self.dezenas = np.ascontiguousarray(dezenas, dtype=np.uint8)
+        self.max_num = max_num
+        self.numero_inicial = numero_inicial
+
+        self.validos = self.dezenas != VAZIO
+        self.indices = indices_numeros(self.dezenas, max_num, numero_inicial)
+
+        # Matriz booleana de incidência (n_concursos, max_num)
+        self.incidencia = np.zeros((len(self.concursos), max_num), dtype=bool)
+        linhas, _ = np.nonzero(self.validos)
+        self.incidencia[linhas, self.indices[self.validos]] = True
+        # Mesma incidência em dois uint64 por concurso, para comparações por popcount
+        self.mascaras = de_booleanos(self.incidencia)
+
+    @classmethod
+    def de_listas(cls, concursos, listas, max_num, numero_inicial=1):
+        return cls(concursos, listas_para_matriz(listas), max_num, numero_inicial)
+
+    # Matriz a partir das arrays já calculadas de cada campo (podem ser mapas só de leitura)
+    @classmethod
+    def de_arrays(cls, arrays, max_num, numero_inicial=1):
+        matriz = cls.__new__(cls)
+        matriz.max_num = max_num
+        matriz.numero_inicial = numero_inicial
+        for nome in CAMPOS:
+            setattr(matriz, nome, arrays[nome])
+        return matriz
+
+    # Arrays de cada campo, na ordem de CAMPOS
+    def arrays(self):
+        return {nome: getattr(self, nome) for nome in CAMPOS}
+
+    # Nova matriz com os concursos acrescentados ao final, sem recalcular as linhas já existentes
+    def anexar(self, concursos, dezenas):
+        novos = MatrizSorteios(concursos, dezenas, self.max_num, self.numero_inicial)
+        largura = max(self.dezenas.shape[1], novos.dezenas.shape[1])
+
+        matriz = MatrizSorteios.__new__(MatrizSorteios)
+        matriz.max_num = self.max_num
+        matriz.numero_inicial = self.numero_inicial
+        matriz.concursos = np.concatenate([self.concursos, novos.concursos])
+        matriz.dezenas = np.vstack([_alargar(self.dezenas, largura, VAZIO), _alargar(novos.dezenas, largura, VAZIO)])
+        matriz.validos = np.vstack([_alargar(self.validos, largura, False), _alargar(novos.validos, largura, False)])
+        matriz.indices = np.vstack([_alargar(self.indices, largura, 0), _alargar(novos.indices, largura, 0)])
+        matriz.incidencia = np.vstack([self.incidencia, novos.incidencia])
+        matriz.mascaras = np.vstack([self.mascaras, novos.mascaras])
+        return matriz
+
+    # Matriz só com as linhas [inicio, fim), compartilhando a memória das arrays originais
+    def fatia(self, inicio=0, fim=None):
+        return MatrizSorteios.de_arrays(
+            {nome: array[inicio:fim] for nome, array in self.arrays().items()}, self.max_num, self.numero_inicial
+        )
+
+    def __len__(self):
+        return len(self.concursos)
+
+    # Números possíveis, na mesma ordem das colunas da incidência
+    @property
+    def numeros(self):
+        return np.arange(self.max_num) + self.numero_inicial
+
+    # Intervalo de linhas dos concursos dentro da janela (inicio, fim), inclusiva
+    def linhas_janela(self, janela=None):
+        if janela is None:
+            return 0, len(self.concursos)
+        inicio, fim = janela
+        return (
+            int(np.searchsorted(self.concursos, inicio, side="left")),
+            int(np.searchsorted(self.concursos, fim, side="right")),
+        )
+
+    # Matriz (max_num, posicoes) com a frequência de cada número em cada posição do sorteio
+    @medido("matrizes.frequencia_por_posicao")
+    def frequencia_por_posicao(self, janela=None):
+        inicio, fim = self.linhas_janela(janela)
+        num_posicoes = self.dezenas.shape[1]
+        validos = self.validos[inicio:fim]
+        posicoes = np.nonzero(validos)[1]
+        chaves = self.indices[inicio:fim][validos] * num_posicoes + posicoes
+        contagem = np.bincount(chaves, minlength=self.max_num * num_posicoes)
+        return contagem.reshape(self.max_num, num_posicoes)
@@ -0,0 +1,131 @@
+import codecs
+import json
+import re
+from array import array
+
+import numpy as np
+import pandas as pd
+
+import cache_disco
+from instrumentacao import medido
+from loterias import ESPECIFICACOES
+
+# Código ASCII do "0" e da vírgula usada para juntar os números de uma coluna
+_ZERO = ord("0")
+_VIRGULA = ord(",")
+_SEPARADORES = re.compile(r"[\s,]*")
+
+
+# Percorre uma lista JSON recebida em blocos de bytes, devolvendo um registro por vez,
+# sem manter a resposta inteira nem a árvore de objetos completa em memória
+def iterar_registros(blocos):
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    iniciado = False
+
+    for bloco in blocos:
+        buffer += utf8.decode(bloco)
+        pos = 0
+        while True:
+            pos = _SEPARADORES.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if not iniciado:
+                if buffer[pos] != "[":
+                    raise ValueError("Estrutura inesperada na resposta da API: era esperada uma lista.")
+                iniciado = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                registro, pos_final = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Registro incompleto: aguarda o próximo bloco
+                break
+            yield registro
+            pos = pos_final
+        buffer = buffer[pos:]
+
+    raise ValueError("Resposta da API incompleta ou malformada.")
+
+
+# Converte de uma vez os números de uma coluna, como vêm da API ("03", "17", ...), em uint8.
+# No caso comum (todos com dois dígitos) o texto é lido direto como bytes; senão, número a número.
+def converter_numeros(textos):
+    if not textos:
+        return np.zeros(0, dtype=np.uint8)
+    try:
+        dados = ",".join(textos).encode("ascii")
+    except (TypeError, UnicodeEncodeError):
+        dados = b""
+    if len(dados) == 3 * len(textos) - 1:
+        caracteres = np.frombuffer(dados + b",", dtype=np.uint8).reshape(len(textos), 3)
+        digitos = caracteres[:, :2] - np.uint8(_ZERO)
+        if (digitos <= 9).all() and (caracteres[:, 2] == _VIRGULA).all():
+            return digitos[:, 0] * np.uint8(10) + digitos[:, 1]
+    return np.fromiter(map(int, textos), dtype=np.uint8, count=len(textos))
+
+
+# Acumula os campos de cada registro conforme a especificação da loteria; os números são guardados
+# como vieram e convertidos coluna a coluna ao montar a tabela
+class ColetorRegistros:
+    def __init__(self, loteria):
+        especificacao = ESPECIFICACOES.get(loteria)
+        if especificacao is None:
+            raise ValueError(f"Loteria desconhecida: {loteria}")
+        self.loteria = loteria
+        self.colunas = especificacao.campos
+        self.obrigatorias = especificacao.obrigatorias
+        self.concursos = array("q")
+        self.valores = {c: [] for c in especificacao.colunas_numeros}
+        self.tamanhos = {c: array("q") for c in self.valores}
+        self.textos = {c: [] for c in self.colunas if c != "concurso" and c not in self.valores}
+
+    def adicionar(self, registro):
+        if registro.get("concurso") is None or any(registro.get(c) is None for c in self.obrigatorias):
+            return
+        self.concursos.append(int(registro["concurso"]))
+        for coluna, valores in self.valores.items():
+            numeros = registro.get(coluna) or []
+            valores.extend(numeros)
+            self.tamanhos[coluna].append(len(numeros))
+        for coluna, textos in self.textos.items():
+            valor = registro.get(coluna)
+            textos.append(json.dumps(valor, ensure_ascii=False) if coluna == "premios" else valor)
+
+    def __len__(self):
+        return len(self.concursos)
+
+    # Tabela colunar no formato do cache em disco e seus metadados
+    def tabela(self):
+        dados = {"concurso": np.array(self.concursos, dtype=np.int64)}
+        larguras = {}
+        for coluna in self.colunas:
+            if coluna in self.valores:
+                matriz = cache_disco.montar_matriz(
+                    converter_numeros(self.valores[coluna]), np.array(self.tamanhos[coluna])
+                )
+                larguras[coluna] = matriz.shape[1]
+                for j, nome in enumerate(cache_disco.nomes_colunas(coluna, matriz.shape[1])):
+                    dados[nome] = matriz[:, j]
+            elif coluna == "data":
+                dados[coluna] = pd.to_datetime(
+                    pd.Series(self.textos[coluna], dtype=object), format="%d/%m/%Y", errors="coerce"
+                )
+            elif coluna != "concurso":
+                dados[coluna] = self.textos[coluna]
+
+        tabela = pd.DataFrame(dados)
+        tabela = tabela.drop_duplicates(subset="concurso", keep="last").sort_values("concurso").reset_index(drop=True)
+        return tabela, cache_disco.montar_metadados(tabela, self.colunas, larguras)
+
+
+# Função para converter registros já decodificados (ou um iterador deles) na tabela colunar
+@medido("processamento.registros")
+def processar_registros(loteria, registros):
+    coletor = ColetorRegistros(loteria)
+    for registro in registros:
+        coletor.adicionar(registro)
+    return coletor.tabela()
@@ -0,0 +1,322 @@
+import time
+from itertools import islice
+
+import numpy as np
+
+from geracao import amostrar, escolhidos_para_numeros
+from loterias import ESPECIFICACOES
+
+# Bilhetes além da quantidade pedida até os quais o espaço filtrado é enumerado por completo
+LIMITE_ENUMERACAO = 20000
+# Bilhetes repetidos seguidos tolerados na amostragem antes de desistir de completar o lote
+MAX_REPETIDOS = 1000
+# Tempo máximo, em segundos, de uma chamada de gerar_filtrados; depois disso retorna o que achou
+TEMPO_LIMITE = 10.0
+# Nós da busca visitados entre duas consultas ao relógio
+NOS_POR_VERIFICACAO = 256
+# Bilhetes com mais números do que isto não aceitam o filtro de acertos com o histórico: quase todo
+# bilhete tem muitos acertos com algum concurso e a busca não termina em tempo útil
+MAX_NUMEROS_FILTRO_HISTORICO = 14
+
+
+# Filtros que todo bilhete gerado precisa satisfazer; None desativa o filtro
+class FiltrosBilhete:
+    def __init__(self, pares=None, soma=None, max_por_dezena=None, max_consecutivos=None,
+                 excluidos=(), fixos=(), max_acertos_historico=None):
+        # Faixas (mínimo, máximo), inclusivas: quantidade de números pares e soma dos números
+        self.pares = pares
+        self.soma = soma
+        # Máximo de números com o mesmo algarismo das dezenas (1-9, 10-19, 20-29, ...)
+        self.max_por_dezena = max_por_dezena
+        # Maior sequência permitida de números consecutivos (ex.: 3 permite 10, 11, 12)
+        self.max_consecutivos = max_consecutivos
+        self.excluidos = frozenset(int(n) for n in excluidos)
+        self.fixos = frozenset(int(n) for n in fixos)
+        # Máximo de acertos do bilhete com qualquer concurso já sorteado
+        self.max_acertos_historico = max_acertos_historico
+
+
+# Prazo compartilhado pelas buscas: passado `prazo` (time.monotonic), a busca para de descer
+# na árvore e marca `interrompida`
+class _BuscaComPrazo:
+    prazo = None
+    interrompida = False
+    _nos = 0
+
+    def _esgotada(self):
+        self._nos += 1
+        if (not self.interrompida and self.prazo is not None and self._nos % NOS_POR_VERIFICACAO == 0
+                and time.monotonic() > self.prazo):
+            self.interrompida = True
+        return self.interrompida
+
+
+# Busca em profundidade pelos bilhetes que satisfazem os filtros. Os números são decididos em ordem
+# crescente (entra ou não entra) e cada ramo é podado assim que paridade, soma, dezenas,
+# consecutivos ou acertos históricos ficam impossíveis de cumprir.
+class BuscaFiltrada(_BuscaComPrazo):
+    def __init__(self, filtros, qtd_nums, max_num, numero_inicial=1, incidencia=None):
+        if filtros.max_acertos_historico is not None and qtd_nums > MAX_NUMEROS_FILTRO_HISTORICO:
+            raise ValueError(
+                f"O filtro de acertos com o histórico só vale para bilhetes de até {MAX_NUMEROS_FILTRO_HISTORICO} números."
+            )
+        numeros = np.arange(max_num) + numero_inicial
+        fora = [n for n in filtros.excluidos | filtros.fixos if not numero_inicial <= n < numero_inicial + max_num]
+        if fora:
+            raise ValueError(f"Números fora da faixa da loteria: {sorted(fora)}.")
+        if filtros.excluidos & filtros.fixos:
+            raise ValueError("Um número não pode ser fixo e excluído ao mesmo tempo.")
+        if len(filtros.fixos) > qtd_nums:
+            raise ValueError(f"No máximo {qtd_nums} números fixos.")
+
+        self.filtros = filtros
+        self.qtd_nums = qtd_nums
+        self.candidatos = [int(n) for n in numeros if int(n) not in filtros.excluidos]
+        self.fixos = [n in filtros.fixos for n in self.candidatos]
+        self.colunas = [n - numero_inicial for n in self.candidatos]
+        m = len(self.candidatos)
+
+        self.pares_min, self.pares_max = filtros.pares or (0, qtd_nums)
+        self.soma_min, self.soma_max = filtros.soma or (-np.inf, np.inf)
+        self.max_por_dezena = filtros.max_por_dezena or qtd_nums
+        self.max_consecutivos = filtros.max_consecutivos or qtd_nums
+
+        # Contagens a partir de cada posição dos candidatos, para as podas
+        pares = np.array([n % 2 == 0 for n in self.candidatos], dtype=np.int64)
+        self.pares_restantes = np.concatenate([np.cumsum(pares[::-1])[::-1], [0]]).tolist()
+        self.fixos_restantes = np.concatenate([np.cumsum(np.array(self.fixos[::-1], dtype=np.int64))[::-1], [0]]).tolist()
+        self.acumulado = np.concatenate([[0], np.cumsum(self.candidatos)]).tolist()
+        self.restantes = [m - i for i in range(m + 1)]
+
+        # Incidência transposta (número, concurso) para somar os acertos com todo o histórico, e
+        # quantos dos candidatos a partir de cada posição saíram em cada concurso
+        self.incidencia = None
+        if filtros.max_acertos_historico is not None and incidencia is not None and len(incidencia):
+            self.incidencia = np.ascontiguousarray(incidencia.T, dtype=np.int16)
+            sorteados = self.incidencia[self.colunas]
+            self.sorteados_restantes = np.zeros((m + 1, sorteados.shape[1]), dtype=np.int16)
+            self.sorteados_restantes[:m] = np.cumsum(sorteados[::-1], axis=0, dtype=np.int16)[::-1]
+            self.max_sorteados_restantes = self.sorteados_restantes.max(axis=1).tolist()
+
+    # Acertos que algum concurso terá de qualquer jeito: se os candidatos restantes fora dele não
+    # bastam para os `k` números que faltam, os demais saem dos números sorteados nele
+    def _acertos_viaveis(self, i, k, acertos):
+        # Com os acertos já feitos limitados pelos números escolhidos, muitas vezes nada é forçado
+        if self.qtd_nums - self.restantes[i] + self.max_sorteados_restantes[i] <= self.filtros.max_acertos_historico:
+            return True
+        forcados = k - self.restantes[i] + self.sorteados_restantes[i]
+        if acertos is not None:
+            forcados = forcados + acertos
+        return forcados.max() <= self.filtros.max_acertos_historico
+
+    # Faixas de pares e soma ainda alcançáveis escolhendo `k` números a partir da posição `i`
+    def _viavel(self, i, k, pares, soma):
+        restantes = self.restantes[i]
+        if restantes < k or self.fixos_restantes[i] > k:
+            return False
+        pares_restantes = self.pares_restantes[i]
+        if pares + max(0, k - (restantes - pares_restantes)) > self.pares_max:
+            return False
+        if pares + min(k, pares_restantes) < self.pares_min:
+            return False
+        acumulado = self.acumulado
+        if soma + acumulado[i + k] - acumulado[i] > self.soma_max:
+            return False
+        return soma + acumulado[-1] - acumulado[-1 - k] >= self.soma_min
+
+    # Percorre a árvore de decisões a partir da posição `i`, devolvendo os bilhetes completos.
+    # Sem rng a ordem é lexicográfica; com rng cada número entra primeiro com probabilidade
+    # k / restantes, o que sem filtros equivale a uma amostra uniforme.
+    def _percorrer(self, rng, i=0, escolhidos=(), pares=0, soma=0, dezenas=(), sequencia=0, acertos=None):
+        k = self.qtd_nums - len(escolhidos)
+        if k == 0:
+            # _viavel só olha os números ainda por escolher: o último escolhido é conferido aqui
+            if (self.fixos_restantes[i] == 0 and self.pares_min <= pares <= self.pares_max
+                    and self.soma_min <= soma <= self.soma_max):
+                yield escolhidos
+            return
+        if self._esgotada() or not self._viavel(i, k, pares, soma):
+            return
+        if self.incidencia is not None and not self._acertos_viaveis(i, k, acertos):
+            return
+
+        entra_primeiro = rng is None or rng.random() * self.restantes[i] < k
+        for entra in ((True, False) if entra_primeiro else (False, True)):
+            if not entra:
+                if not self.fixos[i]:
+                    yield from self._percorrer(rng, i + 1, escolhidos, pares, soma, dezenas, sequencia, acertos)
+                continue
+
+            numero = self.candidatos[i]
+            nova_sequencia = sequencia + 1 if escolhidos and escolhidos[-1] == numero - 1 else 1
+            if nova_sequencia > self.max_consecutivos:
+                continue
+            dezena = numero // 10
+            if len(dezenas) <= dezena:
+                dezenas = dezenas + (0,) * (dezena + 1 - len(dezenas))
+            if dezenas[dezena] >= self.max_por_dezena:
+                continue
+            novos_acertos = acertos
+            if self.incidencia is not None:
+                novos_acertos = self.incidencia[self.colunas[i]] + (0 if acertos is None else acertos)
+                if novos_acertos.max() > self.filtros.max_acertos_historico:
+                    continue
+            yield from self._percorrer(
+                rng, i + 1, escolhidos + (numero,), pares + (numero % 2 == 0), soma + numero,
+                dezenas[:dezena] + (dezenas[dezena] + 1,) + dezenas[dezena + 1:], nova_sequencia, novos_acertos
+            )
+
+    # Todos os bilhetes que satisfazem os filtros, em ordem lexicográfica
+    def enumerar(self):
+        return self._percorrer(None)
+
+    # Um bilhete aleatório que satisfaz os filtros; None se nenhum satisfizer
+    def sortear(self, rng):
+        return next(self._percorrer(rng), None)
+
+
+# Busca equivalente para loterias posicionais (Super Sete): cada coluna recebe um número, com
+# repetição entre colunas. Pares, soma, excluídos e fixos (que precisam aparecer em alguma coluna)
+# valem como na BuscaFiltrada; consecutivos são colunas vizinhas com números seguidos (ex.: 3, 4, 5)
+# e os acertos com o histórico contam as colunas iguais às do concurso. O filtro por dezena não se
+# aplica, já que todos os números estão na mesma dezena.
+class BuscaPosicional(_BuscaComPrazo):
+    def __init__(self, filtros, qtd_nums, max_num, numero_inicial=0, sorteios=None):
+        fora = [n for n in filtros.excluidos | filtros.fixos if not numero_inicial <= n < numero_inicial + max_num]
+        if fora:
+            raise ValueError(f"Números fora da faixa da loteria: {sorted(fora)}.")
+        if filtros.excluidos & filtros.fixos:
+            raise ValueError("Um número não pode ser fixo e excluído ao mesmo tempo.")
+        if len(filtros.fixos) > qtd_nums:
+            raise ValueError(f"No máximo {qtd_nums} números fixos.")
+
+        self.filtros = filtros
+        self.qtd_nums = qtd_nums
+        self.candidatos = [n for n in range(numero_inicial, numero_inicial + max_num) if n not in filtros.excluidos]
+        self.fixos = filtros.fixos
+        self.pares_min, self.pares_max = filtros.pares or (0, qtd_nums)
+        self.soma_min, self.soma_max = filtros.soma or (-np.inf, np.inf)
+        self.max_consecutivos = filtros.max_consecutivos or qtd_nums
+        self.tem_par = any(n % 2 == 0 for n in self.candidatos)
+        self.tem_impar = any(n % 2 for n in self.candidatos)
+        self.menor = min(self.candidatos, default=0)
+        self.maior = max(self.candidatos, default=0)
+
+        # Acertos de cada (coluna, número) com todo o histórico: concursos em que ele saiu na coluna
+        self.acertos = None
+        if filtros.max_acertos_historico is not None and sorteios is not None and len(sorteios):
+            sorteios = np.asarray(sorteios)[:, :qtd_nums]
+            self.acertos = {
+                (coluna, n): (sorteios[:, coluna] == n).astype(np.int16)
+                for coluna in range(qtd_nums) for n in self.candidatos
+            }
+
+    # Pares, soma e fixos ainda alcançáveis preenchendo as `k` colunas restantes
+    def _viavel(self, k, escolhidos, pares, soma):
+        if len(self.fixos.difference(escolhidos)) > k:
+            return False
+        if pares + (k if self.tem_par else 0) < self.pares_min or pares + (0 if self.tem_impar else k) > self.pares_max:
+            return False
+        return soma + k * self.menor <= self.soma_max and soma + k * self.maior >= self.soma_min
+
+    # Percorre as colunas em ordem; sem rng os números de cada coluna são tentados em ordem
+    # crescente, com rng numa ordem aleatória
+    def _percorrer(self, rng, escolhidos=(), pares=0, soma=0, sequencia=0, acertos=None):
+        k = self.qtd_nums - len(escolhidos)
+        if self._esgotada() or not self.candidatos or not self._viavel(k, escolhidos, pares, soma):
+            return
+        if k == 0:
+            yield escolhidos
+            return
+
+        coluna = len(escolhidos)
+        ordem = self.candidatos if rng is None else rng.permutation(self.candidatos).tolist()
+        for numero in ordem:
+            nova_sequencia = sequencia + 1 if escolhidos and escolhidos[-1] == numero - 1 else 1
+            if nova_sequencia > self.max_consecutivos:
+                continue
+            novos_acertos = acertos
+            if self.acertos is not None:
+                novos_acertos = self.acertos[coluna, numero] + (0 if acertos is None else acertos)
+                if novos_acertos.max() > self.filtros.max_acertos_historico:
+                    continue
+            yield from self._percorrer(
+                rng, escolhidos + (numero,), pares + (numero % 2 == 0), soma + numero, nova_sequencia, novos_acertos
+            )
+
+    def enumerar(self):
+        return self._percorrer(None)
+
+    def sortear(self, rng):
+        return next(self._percorrer(rng), None)
+
+
+def _criar_busca(loteria, filtros, matriz=None):
+    especificacao = ESPECIFICACOES.get(loteria)
+    if especificacao is None or not especificacao.tem_dezenas:
+        return None
+    if especificacao.posicional:
+        return BuscaPosicional(
+            filtros, especificacao.qtd_nums, especificacao.max_num, especificacao.numero_inicial,
+            matriz.dezenas if matriz is not None else None
+        )
+    incidencia = matriz.incidencia if matriz is not None else None
+    return BuscaFiltrada(
+        filtros, especificacao.qtd_nums, especificacao.max_num, especificacao.numero_inicial, incidencia
+    )
+
+
+# Bilhetes que satisfazem os filtros, em ordem lexicográfica (no máximo `limite`)
+def enumerar_filtrados(loteria, filtros, matriz=None, limite=None):
+    busca = _criar_busca(loteria, filtros, matriz)
+    if busca is None:
+        return
+    yield from islice(busca.enumerar(), limite)
+
+
+# Gera até `quantidade` bilhetes distintos que satisfazem os filtros. Retorna (dezenas, trevos,
+# completa): dezenas e trevos no mesmo formato de gerar_lote, com trevos/mês sorteados
+# uniformemente, e completa=False se a busca parou em `tempo_limite` segundos, caso em que os
+# bilhetes são só os encontrados até ali. `matriz` (MatrizSorteios das dezenas) só é necessária
+# para o filtro de acertos com o histórico.
+def gerar_filtrados(loteria, quantidade, filtros, matriz=None, semente=None, tempo_limite=TEMPO_LIMITE):
+    busca = _criar_busca(loteria, filtros, matriz)
+    if busca is None:
+        return np.zeros((0, 0), dtype=np.uint8), None, True
+    especificacao = ESPECIFICACOES[loteria]
+    rng = np.random.default_rng(semente)
+    inicio = time.monotonic()
+    if tempo_limite is not None:
+        busca.prazo = inicio + tempo_limite / 2
+
+    # Espaço filtrado pequeno: enumera tudo e escolhe sem repetição, de forma uniforme
+    limite = quantidade + LIMITE_ENUMERACAO
+    bilhetes = list(islice(busca.enumerar(), limite + 1))
+    if len(bilhetes) <= limite and not busca.interrompida:
+        bilhetes = [bilhetes[i] for i in rng.permutation(len(bilhetes))[:quantidade]]
+    else:
+        # Espaço grande (ou enumeração lenta demais): sorteia caminhos na busca até completar o
+        # lote sem repetidos, com o restante do tempo
+        if tempo_limite is not None:
+            busca.prazo, busca.interrompida = inicio + tempo_limite, False
+        bilhetes, vistos, repetidos = [], set(), 0
+        while len(bilhetes) < quantidade and repetidos < MAX_REPETIDOS:
+            bilhete = busca.sortear(rng)
+            if bilhete is None:
+                break
+            if bilhete in vistos:
+                repetidos += 1
+                continue
+            vistos.add(bilhete)
+            bilhetes.append(bilhete)
+            repetidos = 0
+
+    dezenas = np.array(bilhetes, dtype=np.uint8).reshape(len(bilhetes), especificacao.qtd_nums)
+    completa = not busca.interrompida or len(bilhetes) == quantidade
+    if not especificacao.tem_trevos:
+        return dezenas, None, completa
+    max_trevo = especificacao.max_trevo
+    escolhidos = amostrar(
+        rng, np.ones(max_trevo), especificacao.qtd_trevos, np.zeros((len(dezenas), max_trevo), dtype=bool)
+    )
+    return dezenas, escolhidos_para_numeros(escolhidos), completa
@@ -0,0 +1,102 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from armazem import ArmazemSorteios
+from benchmarks.sinteticos import gerar_registros
+
+LOTERIA = "megasena"
+
+
+# API mínima servindo `registros` nas rotas /<loteria>, /<loteria>/latest e /<loteria>/<n>,
+# registrando os caminhos pedidos
+class ApiStub:
+    def __init__(self, registros):
+        self.registros = list(registros)
+        self.caminhos = []
+        stub = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.caminhos.append(self.path)
+                partes = self.path.strip("/").split("/")
+                if partes == [LOTERIA]:
+                    corpo = stub.registros
+                elif partes == [LOTERIA, "latest"]:
+                    corpo = stub.registros[-1]
+                else:
+                    encontrados = [r for r in stub.registros if str(r["concurso"]) == partes[-1]]
+                    if not encontrados:
+                        self.send_error(404)
+                        return
+                    corpo = encontrados[0]
+                dados = json.dumps(corpo).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self.url = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def fechar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+@pytest.fixture
+def registros():
+    return gerar_registros(LOTERIA, 60, semente=1)
+
+
+@pytest.fixture
+def api(registros):
+    stub = ApiStub(registros[:50])
+    yield stub
+    stub.fechar()
+
+
+def abrir(api, diretorio):
+    return ArmazemSorteios(LOTERIA, api.url, diretorio_cache=str(diretorio), compacto=False, compartilhado=False)
+
+
+def test_sincronizacao_incremental_busca_so_os_concursos_novos(api, registros, tmp_path):
+    armazem = abrir(api, tmp_path / "incremental")
+    assert armazem.sincronizar() == 50
+    assert api.caminhos == [f"/{LOTERIA}"]
+
+    api.registros = registros
+    api.caminhos.clear()
+    assert armazem.sincronizar() == 10
+    assert api.caminhos == [f"/{LOTERIA}/latest"] + [f"/{LOTERIA}/{n}" for n in range(51, 60)]
+
+    completo = abrir(api, tmp_path / "completo")
+    completo.sincronizar()
+    assert armazem.ultimo_concurso == completo.ultimo_concurso == 60
+    assert armazem.tabela.equals(completo.tabela)
+    assert armazem.metadados == completo.metadados
+
+
+def test_sem_concursos_novos_so_consulta_o_ultimo(api, tmp_path):
+    armazem = abrir(api, tmp_path)
+    armazem.sincronizar()
+    api.caminhos.clear()
+    assert armazem.sincronizar() == 0
+    assert api.caminhos == [f"/{LOTERIA}/latest"]
+
+
+def test_cache_em_disco_retoma_a_sincronizacao(api, registros, tmp_path):
+    abrir(api, tmp_path).sincronizar()
+    api.registros = registros
+    api.caminhos.clear()
+    reaberto = abrir(api, tmp_path)
+    assert reaberto.ultimo_concurso == 50
+    assert reaberto.sincronizar() == 10
+    assert f"/{LOTERIA}" not in api.caminhos
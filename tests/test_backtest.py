@@ -0,0 +1,34 @@
+import numpy as np
+
+from backtest import backtest, distribuicao_acertos, meses_sorteados, resumo_faixas, walk_forward
+from benchmarks.sinteticos import gerar_registros, sortear_distintos
+from matrizes import MatrizSorteios
+from mascaras import codificar
+from processamento import processar_registros
+
+
+def test_distribuicao_confere_com_a_contagem_direta():
+    rng = np.random.default_rng(0)
+    sorteios = sortear_distintos(rng, 200, 60, 6)
+    bilhetes = sortear_distintos(rng, 300, 60, 6)
+    distribuicao = distribuicao_acertos(codificar(bilhetes, 60), codificar(sorteios, 60), 6)
+    acertos = (bilhetes[:, None, :, None] == sorteios[None, :, None, :]).sum(axis=(2, 3))
+    assert distribuicao.tolist() == np.bincount(acertos.ravel(), minlength=7).tolist()
+
+
+def test_dia_de_sorte_pontua_o_mes():
+    tabela, metadados = processar_registros("diadesorte", gerar_registros("diadesorte", 120, semente=3))
+    dezenas = tabela[[f"dezenas_{j:02d}" for j in range(1, 8)]].to_numpy(dtype=np.uint8)
+    matrizes = {"dezenas": MatrizSorteios(tabela["concurso"].to_numpy(), dezenas, 31)}
+    meses = meses_sorteados(tabela, matrizes["dezenas"].concursos)
+    assert meses.min() >= 1
+
+    bilhetes = dezenas[:10]
+    trevos = np.arange(1, 11, dtype=np.uint8)[:, None]
+    distribuicao = backtest("diadesorte", matrizes, bilhetes, trevos, meses)
+    faixas = dict(resumo_faixas("diadesorte", distribuicao))
+    assert faixas["mes"] == int((trevos[:, 0][:, None] == meses[None, :]).sum())
+    assert faixas[7] >= 10
+
+    total, passos = walk_forward("diadesorte", matrizes, 100, passo=5, quantidade=50, meses=meses)
+    assert total.shape == (8, 2) and total.sum() == 50 * 20 and len(passos) == 4
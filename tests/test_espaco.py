@@ -0,0 +1,25 @@
+import pytest
+
+from espaco import EspacoCombinacoes
+
+
+@pytest.mark.parametrize("numeros", [
+    [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 26],
+    [0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15],
+    [1, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15],
+    [1, 2, 3],
+])
+def test_indice_recusa_combinacoes_invalidas(numeros):
+    with pytest.raises(ValueError):
+        EspacoCombinacoes("lotofacil").indice(numeros)
+
+
+def test_indice_das_combinacoes_validas():
+    espaco = EspacoCombinacoes("lotofacil")
+    assert espaco.indice(range(1, 16)) == 0
+    assert espaco.indice(range(11, 26)) == len(espaco) - 1
+
+    supersete = EspacoCombinacoes("supersete")
+    assert supersete.indice([0, 0, 0, 0, 0, 0, 9]) == 9
+    with pytest.raises(ValueError):
+        supersete.indice([0, 0, 0, 0, 0, 0, 10])
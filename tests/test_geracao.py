@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from estatisticas import IndiceEstatisticas
+from geracao import gerar_lote
+from matrizes import MatrizSorteios
+
+
+@pytest.fixture
+def supersete():
+    dezenas = np.random.default_rng(0).integers(0, 10, (300, 7)).astype(np.uint8)
+    matriz = MatrizSorteios(np.arange(1, 301), dezenas, 10, 0)
+    indice = IndiceEstatisticas(10, 0, 7)
+    indice.atualizar(matriz)
+    return indice
+
+
+def test_super_sete_sorteia_cada_coluna_com_repeticao(supersete):
+    dezenas, trevos = gerar_lote({"dezenas": supersete}, "supersete", 5000, semente=1)
+    assert trevos is None
+    assert dezenas.shape == (5000, 7)
+    assert len(np.unique(dezenas, axis=0)) == 5000
+    assert dezenas.max() <= 9
+    # Com colunas independentes quase todo bilhete tem algum número repetido ou fora de ordem
+    assert (np.diff(dezenas.astype(int), axis=1) <= 0).any(axis=1).mean() > 0.99
+
@@ -0,0 +1,28 @@
+import socket
+from urllib.request import urlopen
+
+from instrumentacao import servir_metricas
+
+
+def test_porta_ocupada_nao_impede_o_app(capsys):
+    ocupada = socket.socket()
+    ocupada.bind(("127.0.0.1", 0))
+    ocupada.listen()
+    try:
+        assert servir_metricas(ocupada.getsockname()[1]) is None
+    finally:
+        ocupada.close()
+    assert "/metrics" in capsys.readouterr().err
+
+
+def test_serve_metricas():
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        porta = livre.getsockname()[1]
+    servidor = servir_metricas(porta)
+    try:
+        with urlopen(f"http://127.0.0.1:{porta}/metrics") as resposta:
+            assert resposta.status == 200
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
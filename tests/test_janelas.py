@@ -0,0 +1,57 @@
+import numpy as np
+
+from benchmarks.sinteticos import sortear_distintos
+from janelas import FrequenciasJanela
+from matrizes import MatrizSorteios
+
+
+def matriz(dezenas):
+    return MatrizSorteios(np.arange(1, len(dezenas) + 1), dezenas, 60)
+
+
+def completo(dezenas):
+    janelas = FrequenciasJanela(60)
+    janelas.atualizar(matriz(dezenas))
+    return janelas
+
+
+def test_atualizacao_incremental_igual_a_completa():
+    dezenas = sortear_distintos(np.random.default_rng(0), 300, 60, 6).astype(np.uint8)
+    janelas = FrequenciasJanela(60)
+    janelas.pontuacao(20)
+    buffers = set()
+    for fim in range(1, 301):
+        janelas.atualizar(matriz(dezenas[:fim]))
+        buffers.add(id(janelas._buffer))
+    esperado = completo(dezenas)
+    assert np.array_equal(janelas.acumulado, esperado.acumulado)
+    assert np.allclose(janelas.pontuacao(20), esperado.pontuacao(20))
+    # O buffer cresce em blocos, não a cada concurso
+    assert len(buffers) < 20
+
+
+def test_reescrever_concursos_parte_da_linha_de_inicio():
+    rng = np.random.default_rng(1)
+    dezenas = sortear_distintos(rng, 50, 60, 6).astype(np.uint8)
+    janelas = completo(dezenas)
+    janelas.pontuacao(10)
+    dezenas[30:] = sortear_distintos(rng, 20, 60, 6)
+    janelas.atualizar(matriz(dezenas), 30)
+    esperado = completo(dezenas)
+    assert np.array_equal(janelas.acumulado, esperado.acumulado)
+    assert np.allclose(janelas.pontuacao(10), esperado.pontuacao(10))
+
+
+def test_copia_nao_altera_a_original():
+    dezenas = sortear_distintos(np.random.default_rng(2), 80, 60, 6).astype(np.uint8)
+    original = completo(dezenas[:60])
+    antes = original.acumulado.copy()
+    copia = original.copia()
+    copia.atualizar(matriz(dezenas[:70]))
+    # A original, estendida de outro jeito, não pode sobrescrever as linhas da cópia
+    outra = dezenas.copy()
+    outra[60:] = dezenas[:20]
+    original.atualizar(matriz(outra))
+    assert np.array_equal(original.acumulado[:61], antes)
+    assert np.array_equal(copia.acumulado, completo(dezenas[:70]).acumulado)
+    assert np.array_equal(original.acumulado, completo(outra).acumulado)
@@ -0,0 +1,82 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from benchmarks.sinteticos import sortear_distintos
+from matrizes import MatrizSorteios
+from restricoes import BuscaFiltrada, FiltrosBilhete, gerar_filtrados
+
+
+def matriz_aleatoria(concursos, max_num, qtd_nums, semente=0):
+    dezenas = sortear_distintos(np.random.default_rng(semente), concursos, max_num, qtd_nums).astype(np.uint8)
+    return MatrizSorteios(np.arange(1, concursos + 1), dezenas, max_num)
+
+
+@pytest.mark.parametrize("limite", [1, 2, 3])
+def test_poda_por_acertos_encontra_todos_os_bilhetes(limite):
+    matriz = matriz_aleatoria(300, 20, 5)
+    busca = BuscaFiltrada(FiltrosBilhete(max_acertos_historico=limite), 5, 20, incidencia=matriz.incidencia)
+    esperados = [
+        bilhete for bilhete in combinations(range(1, 21), 5)
+        if matriz.incidencia[:, np.array(bilhete) - 1].sum(axis=1).max() <= limite
+    ]
+    assert list(busca.enumerar()) == esperados
+
+
+@pytest.mark.parametrize("pares, soma", [((0, 1), None), ((2, 3), None), (None, (40, 55)), ((1, 2), (30, 45))])
+def test_pares_e_soma_encontram_todos_os_bilhetes(pares, soma):
+    busca = BuscaFiltrada(FiltrosBilhete(pares=pares, soma=soma), 5, 20)
+    pares_min, pares_max = pares or (0, 5)
+    soma_min, soma_max = soma or (0, 100)
+    esperados = [
+        bilhete for bilhete in combinations(range(1, 21), 5)
+        if pares_min <= sum(n % 2 == 0 for n in bilhete) <= pares_max and soma_min <= sum(bilhete) <= soma_max
+    ]
+    assert list(busca.enumerar()) == esperados
+
+
+def test_lotofacil_com_poucos_pares():
+    dezenas, _, _ = gerar_filtrados("lotofacil", 1000, FiltrosBilhete(pares=(0, 2)), semente=0)
+    # 13 ímpares e 2 dos 12 pares: C(12, 2) bilhetes
+    assert len(dezenas) == 66
+    assert ((dezenas % 2 == 0).sum(axis=1) == 2).all()
+
+
+def test_bilhetes_gerados_respeitam_pares_e_soma():
+    filtros = FiltrosBilhete(pares=(3, 3), soma=(150, 200))
+    dezenas, _, completa = gerar_filtrados("megasena", 500, filtros, semente=0)
+    assert completa and len(dezenas) == 500
+    assert ((dezenas % 2 == 0).sum(axis=1) == 3).all()
+    somas = dezenas.astype(int).sum(axis=1)
+    assert ((somas >= 150) & (somas <= 200)).all()
+
+
+def test_filtro_de_acertos_recusa_bilhetes_grandes():
+    matriz = matriz_aleatoria(100, 25, 15)
+    with pytest.raises(ValueError):
+        gerar_filtrados("lotofacil", 10, FiltrosBilhete(max_acertos_historico=12), matriz)
+
+
+def test_busca_sem_tempo_retorna_resultado_parcial():
+    matriz = matriz_aleatoria(2000, 60, 6)
+    filtros = FiltrosBilhete(max_acertos_historico=3)
+    dezenas, _, completa = gerar_filtrados("megasena", 100000, filtros, matriz, semente=0, tempo_limite=0)
+    assert not completa
+    assert len(dezenas) < 100000
+    dezenas, _, completa = gerar_filtrados("megasena", 10, filtros, matriz, semente=0)
+    assert completa and len(dezenas) == 10
+
+
+def test_super_sete_filtrado_conta_acertos_por_coluna():
+    dezenas_sorteadas = np.random.default_rng(0).integers(0, 10, (300, 7)).astype(np.uint8)
+    matriz = MatrizSorteios(np.arange(1, 301), dezenas_sorteadas, 10, 0)
+    filtros = FiltrosBilhete(pares=(3, 4), fixos=[7], excluidos=[0], max_acertos_historico=3)
+    dezenas, _, completa = gerar_filtrados("supersete", 50, filtros, matriz, semente=2)
+    assert completa
+    assert len(dezenas) == 50
+    pares = (dezenas % 2 == 0).sum(axis=1)
+    assert ((pares >= 3) & (pares <= 4)).all()
+    assert (dezenas == 7).any(axis=1).all() and not (dezenas == 0).any()
+    acertos = (dezenas[:, None, :] == matriz.dezenas[None, :, :]).sum(axis=2)
+    assert acertos.max() <= 3
@@ -0,0 +1,7 @@
+from benchmarks.tempo_importacao import verificar
+
+
+def test_imports_dentro_do_orcamento():
+    _, resultados = verificar()
+    assert [(modulo, proibidos) for modulo, _, _, proibidos in resultados if proibidos] == []
+    assert [(modulo, tempo, orcamento) for modulo, tempo, orcamento, _ in resultados if tempo > orcamento] == []